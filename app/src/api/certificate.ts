@@ -1,5 +1,6 @@
 import { Request, Response } from 'express';
 import { Logger } from '@utils/logger';
+import { publishEvent } from '@utils/events';
 import {
 	certificateGenerate as nodeCertificateGenerate,
 	certificateRemove as nodeCertificateRemove,
@@ -22,6 +23,7 @@ export async function certificateRenew(req: Request, res: Response): Promise<voi
 		
 		// Return the certificate renewal status
 		Logger.info('Certificate renewal completed successfully');
+		publishEvent('certificate', { action: 'renew', success: certRenew });
 		res.json({
 			renew: certRenew,
 		});
@@ -52,6 +54,7 @@ export async function certificateRemove(req: Request, res: Response): Promise<vo
 		
 		// Return the certificate removal status
 		Logger.info('Certificate removal completed successfully');
+		publishEvent('certificate', { action: 'remove', success: certRemove });
 		res.json({
 			remove: certRemove,
 		});
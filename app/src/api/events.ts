@@ -0,0 +1,110 @@
+import { Request, Response } from 'express';
+import { Logger } from '@utils/logger';
+import { getNodeStatus } from '@utils/node';
+import { watchContainerEvents } from '@utils/docker';
+import {
+	publishEvent,
+	subscribeEvents,
+	subscriberCount,
+	type ApiEvent,
+} from '@utils/events';
+
+// Comment line sent when idle, so that clients can detect a dead connection
+const KEEPALIVE_INTERVAL = 15000;
+// Interval between two reads of the peer count while clients are connected
+const PEERS_INTERVAL = 10000;
+// Container actions that change the node status
+const CONTAINER_ACTIONS = ['create', 'start', 'restart', 'die', 'stop', 'kill', 'destroy', 'pause', 'unpause'];
+
+let stopContainerWatch: (() => void) | null = null;
+let peersTimer: NodeJS.Timeout | null = null;
+let lastPeers: number | null = null;
+
+/**
+ * Start watching the sources of events that are not published by the API
+ * handlers (container lifecycle and peer count)
+ * @returns void
+ */
+function startWatchers(): void
+{
+	if (stopContainerWatch === null)
+	{
+		stopContainerWatch = watchContainerEvents((action: string) =>
+		{
+			if (CONTAINER_ACTIONS.includes(action))
+				publishEvent('node.status', { action: action });
+		});
+	}
+
+	// The dVPN node does not push its peers: read them here, once for all clients
+	if (peersTimer === null)
+	{
+		peersTimer = setInterval(async () =>
+		{
+			const status = await getNodeStatus();
+			const peers = status?.peers ?? 0;
+			if (lastPeers !== null && peers !== lastPeers)
+				publishEvent('node.peers', { peers: peers });
+			lastPeers = peers;
+		}, PEERS_INTERVAL);
+	}
+}
+
+/**
+ * Stop the watchers once the last client is gone
+ * @returns void
+ */
+function stopWatchers(): void
+{
+	if (subscriberCount() > 0)
+		return;
+
+	if (stopContainerWatch !== null)
+	{
+		stopContainerWatch();
+		stopContainerWatch = null;
+	}
+	if (peersTimer !== null)
+	{
+		clearInterval(peersTimer);
+		peersTimer = null;
+		lastPeers = null;
+	}
+}
+
+/**
+ * GET /api/v1/events
+ * Stream of state change events (Server-Sent Events)
+ * @param req Request
+ * @param res Response
+ * @returns void
+ */
+export function events(req: Request, res: Response): void
+{
+	res.status(200);
+	res.setHeader('Content-Type', 'text/event-stream');
+	res.setHeader('Cache-Control', 'no-cache');
+	res.setHeader('Connection', 'keep-alive');
+	res.flushHeaders();
+
+	const send = (event: ApiEvent) =>
+	{
+		res.write(`id: ${event.id}\nevent: ${event.type}\ndata: ${JSON.stringify(event)}\n\n`);
+	};
+
+	const unsubscribe = subscribeEvents(send);
+	const keepalive = setInterval(() => res.write(': keepalive\n\n'), KEEPALIVE_INTERVAL);
+	startWatchers();
+	Logger.info(`Event stream opened (${subscriberCount()} subscriber(s))`);
+
+	// Tell the client that it is subscribed: anything it cached before may be outdated
+	res.write(`event: hello\ndata: ${JSON.stringify({ type: 'hello', time: Date.now() })}\n\n`);
+
+	req.on('close', () =>
+	{
+		clearInterval(keepalive);
+		unsubscribe();
+		stopWatchers();
+		Logger.info(`Event stream closed (${subscriberCount()} subscriber(s))`);
+	});
+}
@@ -7,6 +7,7 @@ import {
 } from '@utils/node';
 import { certificateGenerate } from '@utils/certificate';
 import { imagePull } from '@utils/docker';
+import { publishEvent } from '@utils/events';
 
 /**
  * Install the configuration
@@ -37,6 +38,7 @@ export async function installConfiguration(req: Request, res: Response): Promise
 		statusSummary.certificate = await certificateGenerate();
 		
 		Logger.info('Configuration installation completed successfully');
+		publishEvent('install.configuration', statusSummary);
 		// Return the status summary in a well-structured JSON response
 		res.json(statusSummary);
 	}
@@ -83,3 +85,99 @@ export async function dockerImage(req: Request, res: Response): Promise<void>
 		});
 	}
 }
+
+/**
+ * Install the docker image, streaming the pull progress
+ * The response is a stream of JSON lines (application/x-ndjson):
+ * - {"type":"progress","layers":n,"layersDone":n,"current":bytes,"total":bytes}, at most every 500 ms
+ * - {"type":"done","imagePull":boolean} as the last line
+ * @param req Request
+ * @param res Response
+ */
+export async function dockerImageStream(req: Request, res: Response): Promise<void>
+{
+	// Download progress of each layer, by layer id
+	const layers = new Map<string, { current: number; total: number; done: boolean }>();
+	let lastSent = 0;
+	let closed = false;
+	
+	// The pull goes on if the client disconnects
+	res.on('close', () =>
+	{
+		closed = true;
+	});
+	
+	const send = (line: object) =>
+	{
+		if (!closed)
+			res.write(`${JSON.stringify(line)}\n`);
+	};
+	
+	const sendProgress = () =>
+	{
+		let current = 0;
+		let total = 0;
+		let layersDone = 0;
+		layers.forEach((layer) =>
+		{
+			current += layer.done ? layer.total : layer.current;
+			total += layer.total;
+			if (layer.done)
+				layersDone++;
+		});
+		send({
+			type: 'progress',
+			layers: layers.size,
+			layersDone: layersDone,
+			current: current,
+			total: total,
+		});
+		lastSent = Date.now();
+	};
+	
+	const onProgress = (event: any) =>
+	{
+		if (!event?.id)
+			return;
+		const layer = layers.get(event.id) || { current: 0, total: 0, done: false };
+		if (event.status === 'Downloading' && event.progressDetail?.total)
+		{
+			layer.current = event.progressDetail.current || 0;
+			layer.total = event.progressDetail.total;
+		}
+		else if (event.status === 'Download complete' || event.status === 'Pull complete' || event.status === 'Already exists')
+		{
+			layer.done = true;
+		}
+		layers.set(event.id, layer);
+		
+		if (Date.now() - lastSent >= 500)
+			sendProgress();
+	};
+	
+	res.status(200);
+	res.setHeader('Content-Type', 'application/x-ndjson');
+	res.setHeader('Cache-Control', 'no-cache');
+	res.flushHeaders();
+	
+	try
+	{
+		Logger.info('Starting Docker image installation (streamed)');
+		const pullStatus = await imagePull(onProgress);
+		sendProgress();
+		send({
+			type: 'done',
+			imagePull: pullStatus,
+		});
+		Logger.info(`Docker image installation completed, status: ${pullStatus}`);
+	}
+	catch (error)
+	{
+		Logger.error(`Error while installing Docker image: ${error}`);
+		send({
+			type: 'done',
+			imagePull: false,
+		});
+	}
+	res.end();
+}
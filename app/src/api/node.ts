@@ -1,5 +1,6 @@
 import { Request, Response } from 'express';
 import { Logger } from '@utils/logger';
+import { publishEvent } from '@utils/events';
 import config from '@utils/configuration';
 import nodeManager, { isWalletAvailable } from '@utils/node';
 import {
@@ -225,6 +226,7 @@ export async function nodeConfigurationSetValues(req: Request, res: Response): P
 		
 		// Return the node configuration
 		Logger.info('Node configuration updated successfully');
+		publishEvent('node.configuration');
 		res.json({
 			success: true,
 		});
@@ -257,6 +259,7 @@ export async function nodeConfigurationApply(req: Request, res: Response): Promi
 		
 		// Return the node configuration
 		Logger.info('Node configuration updated successfully');
+		publishEvent('node.configuration');
 		res.json({
 			success: true,
 		});
@@ -542,6 +545,7 @@ export async function nodePassphrase(req: Request, res: Response): Promise<void>
 		// Set the passphrase in the configuration
 		nodeManager.setPassphrase(passphrase);
 		Logger.info('Passphrase updated successfully via API.');
+		publishEvent('node.passphrase');
 		
 		// Return a success response
 		res.json({
@@ -1,5 +1,6 @@
 import { Request, Response } from 'express';
 import { Logger } from '@utils/logger';
+import { publishEvent } from '@utils/events';
 import nodeManager from '@utils/node';
 import { walletLoadAddresses } from '@utils/node';
 import {
@@ -108,6 +109,7 @@ export async function walletCreate(req: Request, res: Response): Promise<void>
 		
 		// Return the mnemonic as part of the response
 		Logger.info('Wallet created successfully');
+		publishEvent('wallet', { action: 'create' });
 		res.json({
 			success: true,
 			mnemonic: mnemonic,
@@ -170,6 +172,7 @@ export async function walletRestore(req: Request, res: Response): Promise<void>
 		
 		// Return the wallet address
 		Logger.info('Wallet recovered successfully');
+		publishEvent('wallet', { action: 'restore' });
 		res.json({
 			success: true,
 		});
@@ -228,6 +231,7 @@ export async function walletRemove(req: Request, res: Response): Promise<void>
 		
 		// Return the wallet address
 		Logger.info('Wallet removed successfully');
+		publishEvent('wallet', { action: 'remove' });
 		res.json({
 			success: true,
 		});
@@ -4,6 +4,7 @@ import { nodeConfig, type NodeConfigData } from '@utils/node';
 import config from './configuration';
 import { getDockerDefaultSocketPath } from './configuration';
 import { Logger } from './logger';
+import { publishEvent } from './events';
 
 class DockerManager
 {
@@ -77,9 +78,10 @@ class DockerManager
 	
 	/**
 	 * Pull Docker image
+	 * @param onProgress Optional callback receiving each progress event of the pull
 	 * @returns boolean
 	 */
-	public async imagePull(): Promise<boolean>
+	public async imagePull(onProgress?: (event: any) => void): Promise<boolean>
 	{
 		try
 		{
@@ -101,7 +103,7 @@ class DockerManager
 							return reject(err);
 						
 						resolve();
-					});
+					}, onProgress);
 				});
 			});
 			Logger.info(`Docker image ${imageName} pulled successfully`);
@@ -111,6 +113,7 @@ class DockerManager
 			await image.tag({ repo: containerName });
 			
 			Logger.info(`Docker image ${imageName} tagged as ${containerName} successfully`);
+			publishEvent('install.docker-image', { imagePull: true });
 			
 			return true;
 		}
@@ -556,6 +559,71 @@ class DockerManager
 		return false;
 	}
 	
+	/**
+	 * Watch the lifecycle events (create, start, die, stop, destroy...) of the
+	 * dVPN node container, as reported by the Docker daemon
+	 * @param onEvent - Called with the action and the event
+	 * @returns Function stopping the watch
+	 */
+	public watchContainerEvents(onEvent: (action: string, event: any) => void): () => void
+	{
+		let stream: any = null;
+		let stopped = false;
+		
+		this.docker.getEvents({
+			filters: {
+				type: ['container'],
+				container: [config.DOCKER_CONTAINER_NAME],
+			},
+		}, (err: any, result: any) =>
+		{
+			if (err)
+			{
+				Logger.error(`Failed to watch the dVPN node container events: ${err?.toString()}`);
+				return;
+			}
+			stream = result;
+			if (stopped)
+			{
+				stream.destroy();
+				return;
+			}
+			
+			// One JSON object per line
+			let buffer = '';
+			stream.on('data', (chunk: Buffer) =>
+			{
+				buffer += chunk.toString();
+				let newline = buffer.indexOf('\n');
+				while (newline !== -1)
+				{
+					const line = buffer.slice(0, newline).trim();
+					buffer = buffer.slice(newline + 1);
+					newline = buffer.indexOf('\n');
+					if (!line)
+						continue;
+					try
+					{
+						const event = JSON.parse(line);
+						onEvent(event.Action || event.status || '', event);
+					}
+					catch (error)
+					{
+						Logger.error(`Invalid Docker event: ${error}`);
+					}
+				}
+			});
+			stream.on('error', (error: any) => Logger.error(`Docker event stream error: ${error?.toString()}`));
+		});
+		
+		return () =>
+		{
+			stopped = true;
+			if (stream)
+				stream.destroy();
+		};
+	}
+	
 	/**
 	 * Convert buffer to stream
 	 * @param buffer
@@ -801,7 +869,7 @@ export default dockerManager;
 export const isPassphraseError = (output: string) => dockerManager.isPassphraseError(output);
 export const checkImageAvailability = (): Promise<boolean> => dockerManager.checkImageAvailability();
 export const inspectDockerContainer = (): Promise<Docker.ContainerInspectInfo | null> => dockerManager.inspectDockerContainer();
-export const imagePull = (): Promise<boolean> => dockerManager.imagePull();
+export const imagePull = (onProgress?: (event: any) => void): Promise<boolean> => dockerManager.imagePull(onProgress);
 export const imagesRemove = (): Promise<boolean> => dockerManager.imagesRemove();
 export const containerStart = (): Promise<boolean> => dockerManager.containerStart();
 export const containerStop = (): Promise<boolean> => dockerManager.containerStop();
@@ -810,5 +878,6 @@ export const containerRunning = (): Promise<boolean> => dockerManager.containerR
 export const containerExists = (): Promise<boolean> => dockerManager.containerExists();
 export const containerRemove = (): Promise<boolean> => dockerManager.containerRemove();
 export const containerStatus = (): Promise<string> => dockerManager.containerStatus();
+export const watchContainerEvents = (onEvent: (action: string, event: any) => void): () => void => dockerManager.watchContainerEvents(onEvent);
 export const containerLogs = (): Promise<string | null> => dockerManager.containerLogs();
 export const containerCommand = (argv: string[], stdin: string[] | null = null): Promise<string | null> => dockerManager.containerCommand(argv, stdin);
@@ -0,0 +1,86 @@
+import { EventEmitter } from 'events';
+
+/**
+ * Event published on a state change
+ */
+export interface ApiEvent
+{
+	id: number;
+	type: string;
+	time: number;
+	data: any;
+}
+
+export type ApiEventListener = (event: ApiEvent) => void;
+
+class EventBus
+{
+	private static instance: EventBus;
+	private emitter: EventEmitter;
+	private lastId: number = 0;
+
+	private constructor()
+	{
+		this.emitter = new EventEmitter();
+		// One listener per connected event stream
+		this.emitter.setMaxListeners(0);
+	}
+
+	/**
+	 * Get instance of EventBus
+	 * @returns EventBus
+	 */
+	public static getInstance(): EventBus
+	{
+		if (!EventBus.instance)
+			EventBus.instance = new EventBus();
+
+		return EventBus.instance;
+	}
+
+	/**
+	 * Publish an event to all subscribers
+	 * @param type - Event type (e.g. "node.status")
+	 * @param data - Event payload
+	 * @returns ApiEvent
+	 */
+	public publish(type: string, data: any = {}): ApiEvent
+	{
+		const event: ApiEvent = {
+			id: ++this.lastId,
+			type: type,
+			time: Date.now(),
+			data: data,
+		};
+		this.emitter.emit('event', event);
+		return event;
+	}
+
+	/**
+	 * Subscribe to all events
+	 * @param listener - Called with each published event
+	 * @returns Function removing the subscription
+	 */
+	public subscribe(listener: ApiEventListener): () => void
+	{
+		this.emitter.on('event', listener);
+		return () => { this.emitter.off('event', listener); };
+	}
+
+	/**
+	 * Get the number of subscribers
+	 * @returns number
+	 */
+	public subscriberCount(): number
+	{
+		return this.emitter.listenerCount('event');
+	}
+}
+
+const eventBus = EventBus.getInstance();
+export default eventBus;
+
+// Export utility functions
+export const publishEvent = (type: string, data: any = {}): ApiEvent => eventBus.publish(type, data);
+export const subscribeEvents = (listener: ApiEventListener): () => void => eventBus.subscribe(listener);
+export const subscriberCount = (): number => eventBus.subscriberCount();
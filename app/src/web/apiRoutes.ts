@@ -21,6 +21,7 @@ import {
 import {
 	installConfiguration,
 	dockerImage,
+	dockerImageStream,
 } from '@api/installation';
 import {
 	systemUpdate,
@@ -34,6 +35,7 @@ import {
 	walletRestore,
 	walletRemove,
 } from '@api/wallet';
+import { events } from '@api/events';
 import { authenticateToken } from './authMiddleware';
 
 // Create a new router
@@ -41,6 +43,8 @@ const apiRouter = Router();
 
 // GET /api/v1/status
 apiRouter.get('/status', authenticateToken, getStatus);
+// GET /api/v1/events
+apiRouter.get('/events', authenticateToken, events);
 // GET /api/v1/check/installation
 apiRouter.get('/check/installation', authenticateToken, checkInstallation);
 // GET /api/v1/check/port/:port
@@ -78,6 +82,8 @@ apiRouter.get('/node/passphrase', authenticateToken, nodePassphraseAvailable);
 apiRouter.post('/install/configuration', authenticateToken, installConfiguration);
 // POST /api/v1/install/docker-image
 apiRouter.post('/install/docker-image', authenticateToken, dockerImage);
+// POST /api/v1/install/docker-image/stream
+apiRouter.post('/install/docker-image/stream', authenticateToken, dockerImageStream);
 
 // POST /api/v1/system/update
 apiRouter.post('/system/update', authenticateToken, systemUpdate);
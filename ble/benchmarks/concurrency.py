@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Concurrent-read throughput: thread model vs asyncio engine.
+
+Serves GET api/v1/status from a local HTTP server answering after
+--latency ms (the Node API on a Raspberry Pi takes 50-300 ms), then
+issues --reads reads, --concurrency at a time, three ways:
+
+- serial: one read at a time, each on a new connection, as the ReadValue
+  handlers did on the GLib loop before utils/aio.py;
+- serial pooled: one read at a time on the pooled session;
+- asyncio: coroutine reads (APIClient.get_async) on the asyncio loop.
+
+With --api, the reads go to the Node API of this node instead
+(casanode.service running, /etc/casanode.conf readable).
+
+    cd /opt/casanode/ble && python3 benchmarks/concurrency.py --reads 200 --concurrency 8
+"""
+import argparse
+import asyncio
+import http.server
+import json
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils import aio
+from utils.api import APIClient
+
+PATH = "api/v1/status"
+
+def start_server(latency):
+    body = json.dumps({"status": {"peers": 3}, "bandwidth": {"download": 1, "upload": 2}}).encode()
+
+    class Handler(http.server.BaseHTTPRequestHandler):
+        # Keep-alive, like the Node API
+        protocol_version = "HTTP/1.1"
+        disable_nagle_algorithm = True
+
+        def do_GET(self):
+            time.sleep(latency)
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+def run_serial(client, reads, pooled):
+    import requests
+    url = client._build_url(PATH)
+    start = time.perf_counter()
+    for _ in range(reads):
+        if pooled:
+            response = client.get(PATH)
+        else:
+            response = requests.get(url, headers=client.headers, verify=client.ca_cert, timeout=10)
+        assert response is not None and response.status_code == 200
+    return time.perf_counter() - start
+
+def run_asyncio(client, reads, concurrency):
+    async def worker(count):
+        for _ in range(count):
+            response = await client.get_async(PATH)
+            assert response is not None and response.status_code == 200
+
+    async def main():
+        shares = [reads // concurrency + (1 if i < reads % concurrency else 0) for i in range(concurrency)]
+        await asyncio.gather(*(worker(share) for share in shares))
+
+    start = time.perf_counter()
+    aio.submit(main()).result()
+    return time.perf_counter() - start
+
+def report(label, reads, elapsed):
+    print(f"{label:<16} {reads / elapsed:>8.1f} reads/s  ({elapsed * 1000 / reads:.1f} ms/read)")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--reads", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--latency", type=float, default=50, help="Latency of the local server, in ms")
+    parser.add_argument("--api", action="store_true", help="Read from the Node API instead of the local server")
+    args = parser.parse_args()
+
+    client = APIClient()
+    if not args.api:
+        server = start_server(args.latency / 1000)
+        client._build_url = lambda path="": f"http://127.0.0.1:{server.server_port}/{path.lstrip('/')}"
+    elif client.get(PATH) is None:
+        print("API unreachable")
+        return 1
+
+    report("serial", args.reads, run_serial(client, args.reads, pooled=False))
+    report("serial pooled", args.reads, run_serial(client, args.reads, pooled=True))
+    report("asyncio", args.reads, run_asyncio(client, args.reads, args.concurrency))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
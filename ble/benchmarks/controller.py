@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Controller configuration check: which backend applies each setting.
+
+Runs the settings of configure_ble_controller() (bondable off, connection
+parameters 24 40 0 1000) and the shutdown ones (advertising off, reset)
+through a ControllerConfigurator with the management socket as primary
+backend, and reports the backend that applied each one. Any operation
+that fell back to the subprocess backend fails the check (exit status 1).
+
+By default the management socket talks to an emulated kernel that checks
+opcodes and parameter lengths like net/bluetooth/mgmt.c, with a recording
+fake as fallback: no controller needed. With --hardware, the real hci0 is
+configured (mgmt socket, then btmgmt fallback; needs CAP_NET_ADMIN, stop
+casanode-ble.service first):
+
+    cd /opt/casanode/ble && python3 benchmarks/controller.py
+    cd /opt/casanode/ble && sudo python3 benchmarks/controller.py --hardware
+"""
+import argparse
+import os
+import socket
+import struct
+import sys
+import threading
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils import btmgmt
+
+MGMT_STATUS_UNKNOWN_COMMAND = 0x01
+MGMT_STATUS_INVALID_PARAMS = 0x0D
+
+TLV_TYPES = (
+    btmgmt.MGMT_TLV_LE_MIN_CONN_INTERVAL,
+    btmgmt.MGMT_TLV_LE_MAX_CONN_INTERVAL,
+    btmgmt.MGMT_TLV_LE_CONN_LATENCY,
+    btmgmt.MGMT_TLV_LE_SUPERVISION_TIMEOUT,
+)
+
+def _valid_tlvs(params):
+    offset = 0
+    while offset < len(params):
+        if offset + 3 > len(params):
+            return False
+        tlv_type, length = struct.unpack_from("<HB", params, offset)
+        if tlv_type not in TLV_TYPES or length != 2 or offset + 3 + length > len(params):
+            return False
+        offset += 3 + length
+    return offset > 0
+
+# opcode -> parameter check, as the kernel validates them. The opcodes are
+# those of lib/mgmt.h, not the btmgmt constants, which this script checks.
+COMMANDS = {
+    0x0005: lambda params: len(params) == 1,    # Set Powered
+    0x0009: lambda params: len(params) == 1,    # Set Bondable
+    0x0029: lambda params: len(params) == 1,    # Set Advertising
+    0x004B: lambda params: len(params) == 0,    # Read Default System Configuration
+    0x004C: _valid_tlvs,                        # Set Default System Configuration
+}
+
+def emulate_kernel(sock):
+    """
+    Answers each command with Command Complete, or Command Status with the
+    error the kernel would return.
+    """
+    while True:
+        try:
+            packet = sock.recv(512)
+        except OSError:
+            return
+        if not packet:
+            return
+        opcode, index, length = btmgmt.MGMT_HEADER.unpack_from(packet)
+        params = packet[btmgmt.MGMT_HEADER.size:btmgmt.MGMT_HEADER.size + length]
+        check = COMMANDS.get(opcode)
+        if check is None:
+            event, status = btmgmt.MGMT_EV_CMD_STATUS, MGMT_STATUS_UNKNOWN_COMMAND
+        elif not check(params):
+            event, status = btmgmt.MGMT_EV_CMD_STATUS, MGMT_STATUS_INVALID_PARAMS
+        else:
+            event, status = btmgmt.MGMT_EV_CMD_COMPLETE, 0
+        body = struct.pack("<HB", opcode, status)
+        sock.send(btmgmt.MGMT_HEADER.pack(event, index, len(body)) + body)
+
+def emulated_controller():
+    primary = btmgmt.MgmtSocketBackend("hci0")
+    kernel_side, primary._sock = socket.socketpair(socket.AF_UNIX, socket.SOCK_SEQPACKET)
+    threading.Thread(target=emulate_kernel, args=(kernel_side,), daemon=True).start()
+    return btmgmt.ControllerConfigurator(primary, btmgmt.FakeControllerBackend("hci0"))
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--hardware", action="store_true", help="Configure the real hci0 instead of the emulated kernel")
+    args = parser.parse_args()
+
+    controller = btmgmt.get_controller("hci0", "auto") if args.hardware else emulated_controller()
+    operations = (
+        ("set_bondable", (False,)),
+        ("set_connection_parameters", (24, 40, 0, 1000)),
+        ("set_advertising", (False,)),
+        ("reset", ()),
+    )
+    failed = False
+    try:
+        for operation, operation_args in operations:
+            try:
+                backend = getattr(controller, operation)(*operation_args)
+            except btmgmt.ControllerError as e:
+                backend = f"error: {e}"
+            ok = backend == controller.primary.name
+            failed = failed or not ok
+            print(f"{operation:<28} {backend:<10} {'ok' if ok else 'FAIL'}")
+    finally:
+        controller.close()
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
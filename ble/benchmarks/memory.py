@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+Memory footprint of the daemon (RSS budget for 512 MB boards).
+
+Builds the application as register_app() does (without a bus), with the
+Node API answered by a local HTTP server running in a child process so that
+it does not count in the RSS, then reads the resident set size
+(/proc/self/status VmRSS, and the peak VmHWM):
+
+- after the imports;
+- after startup (application built);
+- after --reads ReadValue() calls spread over READS, the coroutine
+  handlers served by the asyncio engine and replied on a GLib loop.
+
+Exits with status 1 when the RSS after startup exceeds --max-startup-mb or
+the RSS after the reads exceeds --max-after-mb.
+
+    cd /opt/casanode/ble && python3 benchmarks/memory.py --reads 10000 --max-startup-mb 48 --max-after-mb 56
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Characteristics read in turn, each backed by the Node API or a local fact
+READS = [
+    "NodeStatusCharacteristic",
+    "OnlineUsersCharacteristic",
+    "NodeAddressCharacteristic",
+    "SystemUptimeCharacteristic",
+    "SystemOsCharacteristic",
+    "CasanodeVersionCharacteristic",
+]
+
+def rss_mb(field="VmRSS"):
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith(field + ":"):
+                return int(line.split()[1]) / 1024
+    return 0.0
+
+def serve():
+    """
+    Child process: answers every GET with a status document, prints the port.
+    """
+    import http.server
+    body = json.dumps({
+        "status": "running",
+        "uptime": 3600,
+        "address": "sentnode1benchmark",
+        "version": "benchmark",
+        "os": "Linux",
+    }).encode()
+
+    class Handler(http.server.BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        disable_nagle_algorithm = True
+
+        def do_GET(self):
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.daemon_threads = True
+    print(server.server_port, flush=True)
+    server.serve_forever()
+
+def start_server():
+    child = subprocess.Popen([sys.executable, os.path.abspath(__file__), "--serve"], stdout=subprocess.PIPE, text=True)
+    return child, int(child.stdout.readline())
+
+def read_all(characteristics, reads):
+    """
+    Issues `reads` ReadValue() calls in turn over `characteristics`. Coroutine
+    handlers reply through the GLib loop, which is iterated until they have.
+    """
+    from gi.repository import GLib
+    context = GLib.MainContext.default()
+    state = {"pending": 0, "errors": 0}
+
+    def replied(_):
+        state["pending"] -= 1
+
+    def failed(e):
+        state["pending"] -= 1
+        state["errors"] += 1
+
+    for i in range(reads):
+        characteristic = characteristics[i % len(characteristics)]
+        if getattr(characteristic.ReadValue, "_dbus_async_callbacks", None):
+            state["pending"] += 1
+            characteristic.ReadValue({}, reply_handler=replied, error_handler=failed)
+            # One coroutine in flight at a time, as BlueZ queues reads per device
+            while state["pending"]:
+                context.iteration(True)
+        else:
+            characteristic.ReadValue({})
+    return state["errors"]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--reads", type=int, default=10000)
+    parser.add_argument("--max-startup-mb", type=float, default=48, help="RSS ceiling after startup, in MB")
+    parser.add_argument("--max-after-mb", type=float, default=56, help="RSS ceiling after the reads, in MB")
+    parser.add_argument("--serve", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.serve:
+        serve()
+        return 0
+
+    child, port = start_server()
+    try:
+        import dbus.mainloop.glib
+        from gatt_server import Application, CasanodeService, load_characteristics, generate_uuid_from_seed
+        from utils.api import APIClient
+        from utils.config import get_config
+        imported = rss_mb()
+
+        dbus.mainloop.glib.DBusGMainLoop(set_as_default=True)
+        cfg = get_config()
+        app = Application(None)
+        service = CasanodeService(None, 0, cfg['BLE_UUID'], True)
+        for index, seed_id, char_class in load_characteristics():
+            char_uuid = cfg['BLE_DISCOVERY_UUID'] if seed_id is None else generate_uuid_from_seed(seed_id)
+            service.add_characteristic(char_class(None, index, char_uuid))
+        app.add_service(service)
+        app.GetManagedObjects()
+        APIClient()._build_url = lambda path="": f"http://127.0.0.1:{port}/{path.lstrip('/')}"
+        startup = rss_mb()
+
+        characteristics = [c for c in service.characteristics if type(c).__name__ in READS]
+        start = time.perf_counter()
+        errors = read_all(characteristics, args.reads)
+        elapsed = time.perf_counter() - start
+        after = rss_mb()
+    finally:
+        child.terminate()
+        child.wait()
+
+    print(f"{'after imports':<24} {imported:>8.1f} MB")
+    print(f"{'after startup':<24} {startup:>8.1f} MB  (ceiling {args.max_startup_mb:.0f} MB)")
+    print(f"{f'after {args.reads} reads':<24} {after:>8.1f} MB  (ceiling {args.max_after_mb:.0f} MB, "
+        f"{args.reads / elapsed:.0f} reads/s, {errors} errors)")
+    print(f"{'peak':<24} {rss_mb('VmHWM'):>8.1f} MB")
+
+    exceeded = []
+    if startup > args.max_startup_mb:
+        exceeded.append(f"startup RSS {startup:.1f} MB > {args.max_startup_mb:.0f} MB")
+    if after > args.max_after_mb:
+        exceeded.append(f"RSS after reads {after:.1f} MB > {args.max_after_mb:.0f} MB")
+    for message in exceeded:
+        print(f"FAIL: {message}")
+    return 1 if exceeded else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
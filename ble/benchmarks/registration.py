@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Registration cost of the GATT application.
+
+Builds the application as register_app() does and times:
+
+- the construction of the service and its characteristics;
+- GetManagedObjects() and GetAll() called in-process, with the tree rebuilt
+  on every call (the behaviour before caching) and served from the cache;
+- with --bus, the GetManagedObjects() D-Bus round trip on the session bus,
+  marshalling included, rebuilt and cached;
+- with --bluez, RegisterApplication() on hci0, i.e. what BlueZ does at
+  startup and after each controller reset (stop casanode-ble.service first).
+
+    cd /opt/casanode/ble && python3 benchmarks/registration.py --runs 200 --bus
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import dbus
+import dbus.mainloop.glib
+from gi.repository import GLib
+import gatt_server
+from gatt_server import Application, CasanodeService, load_characteristics, generate_uuid_from_seed
+from utils.config import get_config
+
+OBJECT_MANAGER_IFACE = "org.freedesktop.DBus.ObjectManager"
+
+def build_application(bus):
+    cfg = get_config()
+    app = Application(bus)
+    service = CasanodeService(bus, 0, cfg['BLE_UUID'], True)
+    for index, seed_id, char_class in load_characteristics():
+        char_uuid = cfg['BLE_DISCOVERY_UUID'] if seed_id is None else generate_uuid_from_seed(seed_id)
+        service.add_characteristic(char_class(bus, index, char_uuid))
+    app.add_service(service)
+    return app
+
+def rebuild(app):
+    """
+    Drops every cached structure, as if nothing was cached.
+    """
+    for service in app.services:
+        for characteristic in service.characteristics:
+            characteristic.invalidate_properties()
+
+def measure(function, runs, before=None):
+    samples = []
+    for _ in range(runs):
+        if before is not None:
+            before()
+        start = time.perf_counter()
+        function()
+        samples.append((time.perf_counter() - start) * 1_000_000)
+    return samples
+
+def report(label, samples):
+    samples = sorted(samples)
+    p95 = samples[min(len(samples) - 1, int(len(samples) * 0.95))]
+    print(f"{label:<34} median={statistics.median(samples):>10.1f} us  p95={p95:>10.1f} us")
+
+def get_all(app):
+    for service in app.services:
+        for characteristic in service.characteristics:
+            characteristic.GetAll("org.bluez.GattCharacteristic1")
+
+def measure_bus(app, runs, before=None):
+    """
+    Sequential GetManagedObjects() calls from a second connection, served by
+    the GLib loop like BlueZ's.
+    """
+    client = dbus.SessionBus(private=True)
+    proxy = client.get_object(app.connection.get_unique_name(), Application.PATH)
+    loop = GLib.MainLoop()
+    samples = []
+
+    def call():
+        if before is not None:
+            before()
+        start = time.perf_counter()
+        proxy.GetManagedObjects(
+            dbus_interface=OBJECT_MANAGER_IFACE,
+            reply_handler=lambda _: done(start),
+            error_handler=lambda e: (print(f"GetManagedObjects failed: {e}"), loop.quit()),
+        )
+        return False
+
+    def done(start):
+        samples.append((time.perf_counter() - start) * 1_000_000)
+        if len(samples) < runs:
+            GLib.idle_add(call)
+        else:
+            loop.quit()
+
+    GLib.idle_add(call)
+    loop.run()
+    client.close()
+    return samples
+
+def measure_bluez(runs):
+    bus = dbus.SystemBus()
+    app = build_application(bus)
+    manager = dbus.Interface(bus.get_object("org.bluez", "/org/bluez/hci0"), gatt_server.GATT_MANAGER_IFACE)
+    loop = GLib.MainLoop()
+    samples = []
+
+    def register():
+        start = time.perf_counter()
+        manager.RegisterApplication(
+            app.path, dbus.Dictionary({}, signature="sv"),
+            reply_handler=lambda: registered(start),
+            error_handler=lambda e: (print(f"RegisterApplication failed: {e}"), loop.quit()),
+        )
+        return False
+
+    def registered(start):
+        samples.append((time.perf_counter() - start) * 1_000_000)
+        manager.UnregisterApplication(app.path)
+        if len(samples) < runs:
+            GLib.idle_add(register)
+        else:
+            loop.quit()
+
+    GLib.idle_add(register)
+    loop.run()
+    return samples
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=200)
+    parser.add_argument("--bus", action="store_true", help="Also time GetManagedObjects() over the session bus")
+    parser.add_argument("--bluez", action="store_true", help="Also time RegisterApplication() with BlueZ")
+    args = parser.parse_args()
+
+    dbus.mainloop.glib.DBusGMainLoop(set_as_default=True)
+
+    start = time.perf_counter()
+    app = build_application(None)
+    print(f"{'build application':<34} {(time.perf_counter() - start) * 1000:>10.1f} ms")
+
+    report("GetManagedObjects() rebuilt", measure(app.GetManagedObjects, args.runs, before=lambda: rebuild(app)))
+    report("GetManagedObjects() cached", measure(app.GetManagedObjects, args.runs))
+    report("GetAll() x all, rebuilt", measure(lambda: get_all(app), args.runs, before=lambda: rebuild(app)))
+    report("GetAll() x all, cached", measure(lambda: get_all(app), args.runs))
+
+    if args.bus:
+        bus_app = build_application(dbus.SessionBus())
+        report("D-Bus GetManagedObjects() rebuilt", measure_bus(bus_app, args.runs, before=lambda: rebuild(bus_app)))
+        report("D-Bus GetManagedObjects() cached", measure_bus(bus_app, args.runs))
+
+    if args.bluez:
+        report("RegisterApplication()", measure_bluez(min(args.runs, 20)))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
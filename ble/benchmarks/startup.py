@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Startup benchmark for the BLE daemon.
+
+Starts `main.py` several times and measures the cold-start time until the
+daemon logs "Startup: BLE advertising active after N ms", then stops it with
+SIGINT. Requires BlueZ and a powered adapter, so run it on the target board
+with casanode-ble.service stopped:
+
+    cd /opt/casanode/ble && python3 benchmarks/startup.py --runs 5
+
+With --imports-only it measures the import of the GATT server modules in a
+fresh interpreter instead, which does not need BlueZ.
+"""
+import argparse
+import os
+import re
+import signal
+import statistics
+import subprocess
+import sys
+import time
+
+BLE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MARKER = re.compile(r"Startup: BLE advertising active after (\d+) ms")
+
+def run_daemon_once(timeout):
+    """
+    Start the daemon and return the advertising-active time in ms reported by it,
+    or None if the marker was not seen before `timeout` seconds.
+    """
+    process = subprocess.Popen(
+        [sys.executable, "main.py"],
+        cwd=BLE_DIR,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        text=True,
+    )
+    deadline = time.monotonic() + timeout
+    result = None
+    try:
+        for line in process.stdout:
+            match = MARKER.search(line)
+            if match:
+                result = int(match.group(1))
+                break
+            if time.monotonic() > deadline:
+                break
+    finally:
+        process.send_signal(signal.SIGINT)
+        try:
+            process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            process.kill()
+            process.wait()
+    return result
+
+def run_imports_once():
+    """
+    Return the wall-clock time in ms to import the GATT server and all characteristics.
+    """
+    start = time.perf_counter()
+    subprocess.run(
+        [sys.executable, "-c", "import gatt_server; gatt_server.load_characteristics()"],
+        cwd=BLE_DIR,
+        check=True,
+    )
+    return (time.perf_counter() - start) * 1000
+
+def report(label, samples):
+    print(f"{label}: runs={len(samples)} min={min(samples):.0f} ms "
+          f"median={statistics.median(samples):.0f} ms max={max(samples):.0f} ms")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--timeout", type=float, default=60.0, help="Seconds to wait for advertising")
+    parser.add_argument("--imports-only", action="store_true")
+    parser.add_argument("--pause", type=float, default=2.0, help="Seconds between runs (matches RestartSec)")
+    args = parser.parse_args()
+
+    samples = []
+    for run in range(args.runs):
+        if args.imports_only:
+            value = run_imports_once()
+        else:
+            value = run_daemon_once(args.timeout)
+        if value is None:
+            print(f"run {run + 1}: advertising not active within {args.timeout}s")
+        else:
+            print(f"run {run + 1}: {value:.0f} ms")
+            samples.append(value)
+        time.sleep(args.pause)
+
+    if not samples:
+        return 1
+    report("import time" if args.imports_only else "cold start to advertising active", samples)
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
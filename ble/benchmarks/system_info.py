@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Latency of the system characteristics: local provider vs Node API.
+
+Times the values read by SystemArch, SystemKernel, SystemOs and SystemUptime
+through utils.system_info, and the same values through GET api/v1/status.
+The API part needs casanode.service running and /etc/casanode.conf readable,
+so run it on the node:
+
+    cd /opt/casanode/ble && python3 benchmarks/system_info.py --runs 200
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils import system_info
+
+def measure(function, runs):
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        function()
+        samples.append((time.perf_counter() - start) * 1_000_000)
+    return samples
+
+def report(label, samples):
+    samples = sorted(samples)
+    p95 = samples[min(len(samples) - 1, int(len(samples) * 0.95))]
+    print(f"{label:<28} median={statistics.median(samples):>10.1f} us  p95={p95:>10.1f} us  max={samples[-1]:>10.1f} us")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=200)
+    parser.add_argument("--local-only", action="store_true", help="Skip the API measurements")
+    args = parser.parse_args()
+
+    # The first call reads uname, os-release and /proc/uptime
+    first = measure(lambda: (system_info.arch(), system_info.kernel(), system_info.os_name(), system_info.boot_time()), 1)
+    report("local (first read)", first)
+    report("local arch", measure(system_info.arch, args.runs))
+    report("local kernel", measure(system_info.kernel, args.runs))
+    report("local os", measure(system_info.os_name, args.runs))
+    report("local boot time", measure(system_info.boot_time, args.runs))
+
+    if args.local_only:
+        return 0
+
+    from utils.api import APIClient
+    client = APIClient()
+    if client.get("api/v1/status") is None:
+        print("API unreachable, skipping the API measurements")
+        return 1
+    # One status request serves the four characteristics
+    report("api GET api/v1/status", measure(lambda: client.get("api/v1/status"), args.runs))
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
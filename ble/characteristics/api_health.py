@@ -0,0 +1,25 @@
+#!/usr/bin/env python3
+import dbus
+import dbus.service
+import json
+from characteristics.base import BaseCharacteristic
+from utils import logger
+
+class ApiHealthCharacteristic(BaseCharacteristic):
+    """
+    Reports the state of the Node API circuit breaker as JSON:
+    {"state": "closed|open|half_open", "failures": <n>, "retry_in": <seconds>}
+    """
+    DEADLINE = 5.0
+
+    def __init__(self, bus, index, uuid):
+        flags = ['read']
+        super().__init__(bus, index, uuid, flags)
+        self.service_path = '/org/bluez/example/service0'
+    
+    @dbus.service.method("org.bluez.GattCharacteristic1", in_signature="a{sv}", out_signature="ay")
+    def ReadValue(self, options):
+        status = self.api_client.breaker.status()
+        value = json.dumps(status, separators=(",", ":"))
+        logger.info(f"ApiHealthCharacteristic: read {value}")
+        return self.value_at_offset(value.encode("utf-8"), options)
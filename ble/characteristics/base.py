@@ -1,9 +1,51 @@
 #!/usr/bin/env python3
+import struct
+import threading
+import time
 import dbus
 import dbus.service
+from gi.repository import GLib
+from utils import config, deadline, jobs, logger, metrics, watchdog
+from utils.api import APIClient
+
+# Shared by the notification buckets of all the characteristics
+_notify_lock = threading.Lock()
+# Header of the frames sent by stream_frames()
+FRAME_HEADER = struct.Struct("<HH")
+
+class _NotifyBucket:
+	"""
+	Token bucket of the notifications of one characteristic.
+	"""
+	__slots__ = ("tokens", "stamp", "pending", "scheduled")
+	
+	def __init__(self, burst):
+		self.tokens = burst
+		self.stamp = time.monotonic()
+		# Latest value held back by the rate limit per key (see notify_value()),
+		# oldest key first, sent by _flush_notify()
+		self.pending = {}
+		self.scheduled = False
 
 class BaseCharacteristic(dbus.service.Object):
 	PATH_BASE = '/org/bluez/example/characteristic'
+	# Time budget (seconds) of each D-Bus call handled by this characteristic,
+	# kept below the ~30 s ATT transaction timeout of BLE centrals.
+	DEADLINE = deadline.DEFAULT_BUDGET
+	# Notification rate limit: NOTIFY_RATE notifications per second on average,
+	# with bursts of NOTIFY_BURST. None uses the configured NOTIFY_RATE / NOTIFY_BURST.
+	NOTIFY_RATE = None
+	NOTIFY_BURST = None
+	notifying = False
+	_properties = None
+	# Created on the first notification (see notify_value())
+	_notify_bucket = None
+	# (stream number, frames) of the stream_frames() in progress
+	_stream = None
+	FRAME_INTERVAL_MS = 15
+	# ATT header of a notification
+	ATT_OVERHEAD = 3
+	DEFAULT_MTU = 23
 	
 	def __init__(self, bus, index, uuid, flags):
 		self.path = self.PATH_BASE + str(index)
@@ -11,18 +53,69 @@ class BaseCharacteristic(dbus.service.Object):
 		self.flags = flags
 		dbus.service.Object.__init__(self, bus, self.path)
 	
+	@property
+	def api_client(self):
+		# The client is a singleton: no per-characteristic reference
+		return APIClient()
+	
+	def _message_cb(self, connection, message):
+		# Every method call (ReadValue, WriteValue, ...) runs inside the deadline budget
+		# and is reported by the loop-lag probe when it holds the GLib loop
+		name = f"{type(self).__name__}.{message.get_member()}"
+		with watchdog.handler(name), deadline.budget(self.DEADLINE, owner=name):
+			return super()._message_cb(connection, message)
+	
 	def get_properties(self):
-		return {
-			'org.bluez.GattCharacteristic1': {
-				'UUID': self.uuid,
-				'Service': dbus.ObjectPath(self.service_path),
-				'Flags': dbus.Array(self.flags, signature='s'),
+		# Built on first use: subclasses set service_path after __init__()
+		if self._properties is None:
+			self._properties = {
+				'org.bluez.GattCharacteristic1': dbus.Dictionary({
+					'UUID': self.uuid,
+					'Service': dbus.ObjectPath(self.service_path),
+					'Flags': dbus.Array(self.flags, signature='s'),
+				}, signature='sv')
 			}
-		}
+		return self._properties
+	
+	def invalidate_properties(self):
+		"""
+		Drops the cached properties after a change of uuid, flags or service.
+		"""
+		self._properties = None
+		service = getattr(self, 'service', None)
+		if service is not None:
+			service.invalidate()
 	
 	def get_path(self):
 		return dbus.ObjectPath(self.path)
 	
+	def start_job(self, kind, target, *args, before=None):
+		"""
+		Starts `target(job, *args)` as a job of `kind` (see utils/jobs.py) and
+		returns it. Raises org.bluez.Error.InProgress, without calling `before`,
+		if a job of that kind is already running; otherwise `before()` (e.g.
+		setting and notifying the "in progress" status) is called first.
+		"""
+		# Jobs are started from D-Bus handlers only, i.e. one at a time on the GLib loop
+		if jobs.running(kind) is None:
+			if before is not None:
+				before()
+			job = jobs.start(kind, target, *args)
+			if job is not None:
+				return job
+		logger.error(f"{type(self).__name__}: {kind} job already running")
+		raise dbus.DBusException("org.bluez.Error.InProgress")
+	
+	def value_at_offset(self, data, options):
+		"""
+		Returns the part of `data` requested by a long read.
+		BlueZ passes the offset of each follow-up read in the options.
+		"""
+		offset = int(options.get("offset", 0))
+		if offset > len(data):
+			raise dbus.DBusException("org.bluez.Error.InvalidOffset")
+		return [dbus.Byte(b) for b in data[offset:]]
+	
 	@dbus.service.method("org.freedesktop.DBus.Properties", in_signature="s", out_signature="a{sv}")
 	def GetAll(self, interface):
 		if interface != "org.bluez.GattCharacteristic1":
@@ -33,10 +126,131 @@ class BaseCharacteristic(dbus.service.Object):
 	def PropertiesChanged(self, interface, changed, invalidated):
 		pass
 	
-	# @dbus.service.method("org.bluez.GattCharacteristic1", in_signature="", out_signature="")
-	# def StartNotify(self):
-	# 	pass
+	@dbus.service.method("org.bluez.GattCharacteristic1", in_signature="", out_signature="")
+	def StartNotify(self):
+		self.notifying = True
+	
+	@dbus.service.method("org.bluez.GattCharacteristic1", in_signature="", out_signature="")
+	def StopNotify(self):
+		self.notifying = False
+	
+	def notify_value(self, data: bytes, key=None):
+		"""
+		Sends `data` to the subscribed clients, within the notification rate limit.
+		Over the limit the value is held back; a newer value with the same `key`
+		replaces the held one and only the latest is sent once the limit allows it.
+		Values with different keys (e.g. the frames of different jobs) are held
+		side by side and sent in order.
+		Counted in notify.sent/suppressed/dropped.<class> metrics.
+		"""
+		if not self.notifying:
+			return
+		name = type(self).__name__
+		with _notify_lock:
+			bucket = self._notify_bucket
+			if bucket is None:
+				bucket = self._notify_bucket = _NotifyBucket(self._notify_limits()[1])
+			if not bucket.pending:
+				wait = self._take_notify_token(bucket)
+				if wait == 0:
+					send = True
+				else:
+					send = False
+					bucket.pending[key] = data
+			else:
+				# Keep the order: this value goes out after the held ones, in the place
+				# of the held value with the same key if any
+				send = False
+				wait = None
+				if key in bucket.pending:
+					metrics.increment(f"notify.dropped.{name}")
+				bucket.pending[key] = data
+			if not send:
+				metrics.increment(f"notify.suppressed.{name}")
+				if not bucket.scheduled:
+					bucket.scheduled = True
+					GLib.timeout_add(self._delay_ms(wait), self._flush_notify)
+		if send:
+			self._emit_value(data)
+	
+	def _notify_limits(self):
+		cfg = config.get_config()
+		rate = self.NOTIFY_RATE if self.NOTIFY_RATE is not None else float(cfg.get("NOTIFY_RATE", 10))
+		burst = self.NOTIFY_BURST if self.NOTIFY_BURST is not None else float(cfg.get("NOTIFY_BURST", 5))
+		return max(rate, 0.01), max(burst, 1)
+	
+	def _take_notify_token(self, bucket):
+		"""
+		Takes a token from the bucket (lock held). Returns 0 on success,
+		otherwise the number of seconds until a token is available.
+		"""
+		rate, burst = self._notify_limits()
+		now = time.monotonic()
+		tokens = min(burst, bucket.tokens + (now - bucket.stamp) * rate)
+		bucket.stamp = now
+		if tokens >= 1:
+			bucket.tokens = tokens - 1
+			return 0
+		bucket.tokens = tokens
+		return (1 - tokens) / rate
+	
+	@staticmethod
+	def _delay_ms(wait):
+		return max(1, int((wait or 0) * 1000) + 1)
+	
+	def _flush_notify(self):
+		with _notify_lock:
+			bucket = self._notify_bucket
+			if not bucket.pending:
+				bucket.scheduled = False
+				return False
+			wait = self._take_notify_token(bucket)
+			if wait > 0:
+				GLib.timeout_add(self._delay_ms(wait), self._flush_notify)
+				return False
+			data = bucket.pending.pop(next(iter(bucket.pending)))
+			if bucket.pending:
+				# One value per token: the next one waits for its own
+				rate, _ = self._notify_limits()
+				GLib.timeout_add(self._delay_ms(max(0, 1 - bucket.tokens) / rate), self._flush_notify)
+			else:
+				bucket.scheduled = False
+		self._emit_value(data)
+		return False
+	
+	def _emit_value(self, data):
+		if not self.notifying:
+			return
+		metrics.increment(f"notify.sent.{type(self).__name__}")
+		self.PropertiesChanged(
+			"org.bluez.GattCharacteristic1",
+			{"Value": dbus.Array([dbus.Byte(b) for b in data], signature="y")},
+			[]
+		)
+	
+	def stream_frames(self, payload: bytes, mtu=None):
+		"""
+		Sends `payload` to the subscribed clients as a series of notifications
+		sized for the MTU (from the options of the request, ATT default 23):
+		
+			u16 frame index | u16 frame count | data (little-endian)
+		
+		Frames are paced every FRAME_INTERVAL_MS and bypass the notification
+		rate limit, which would coalesce them. A new stream cancels the one in
+		progress. Returns the number of frames.
+		"""
+		size = max(int(mtu or self.DEFAULT_MTU) - self.ATT_OVERHEAD - FRAME_HEADER.size, 1)
+		chunks = [payload[i:i + size] for i in range(0, len(payload), size)][:0xFFFF] or [b""]
+		frames = [FRAME_HEADER.pack(index, len(chunks)) + chunk for index, chunk in enumerate(chunks)]
+		self._stream = (self._stream[0] + 1, frames) if self._stream else (1, frames)
+		GLib.timeout_add(self.FRAME_INTERVAL_MS, self._send_frame, self._stream, 0)
+		return len(frames)
 	
-	# @dbus.service.method("org.bluez.GattCharacteristic1", in_signature="", out_signature="")
-	# def StopNotify(self):
-	# 	pass
+	def _send_frame(self, stream, index):
+		if stream is not self._stream or not self.notifying:
+			return False
+		self._emit_value(stream[1][index])
+		metrics.increment(f"notify.frames.{type(self).__name__}")
+		if index + 1 < len(stream[1]):
+			GLib.timeout_add(self.FRAME_INTERVAL_MS, self._send_frame, stream, index + 1)
+		return False
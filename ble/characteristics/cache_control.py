@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+import dbus
+import dbus.service
+import json
+from characteristics.base import BaseCharacteristic
+from utils import logger
+
+# Names accepted by WriteValue and the cached API path behind each one
+CACHED_RESOURCES = {
+    "configuration": "api/v1/node/configuration",
+    "status": "api/v1/status",
+    "node-address": "api/v1/node/address",
+    "wallet-address": "api/v1/wallet/address",
+}
+
+class CacheControlCharacteristic(BaseCharacteristic):
+    """
+    Controls the cache of the read-mostly characteristics (moniker, ports, version, ...).
+
+    Writing "all" or a resource name ("configuration", "status", "node-address",
+    "wallet-address") makes the next read of the matching characteristics query
+    the Node API instead of returning the cached value.
+    Reading returns the age in seconds of each cached resource as JSON.
+    """
+    DEADLINE = 5.0
+
+    def __init__(self, bus, index, uuid):
+        flags = ['read', 'write']
+        super().__init__(bus, index, uuid, flags)
+        self.service_path = '/org/bluez/example/service0'
+
+    @dbus.service.method("org.bluez.GattCharacteristic1", in_signature="a{sv}", out_signature="ay")
+    def ReadValue(self, options):
+        paths = {path: name for name, path in CACHED_RESOURCES.items()}
+        ages = {paths.get(path, path): age for path, age in self.api_client.cache.ages().items()}
+        value = json.dumps(ages, separators=(",", ":"), sort_keys=True)
+        return self.value_at_offset(value.encode("utf-8"), options)
+
+    @dbus.service.method("org.bluez.GattCharacteristic1", in_signature="aya{sv}", out_signature="")
+    def WriteValue(self, value, options):
+        name = bytes(value).decode("utf-8").strip().lower()
+        if name == "all":
+            self.api_client.expire()
+        elif name in CACHED_RESOURCES:
+            self.api_client.expire(CACHED_RESOURCES[name])
+        else:
+            logger.error(f"CacheControlCharacteristic: Unknown resource '{name}'")
+            raise dbus.DBusException("org.bluez.Error.InvalidValue")
+        logger.info(f"CacheControlCharacteristic: next read of '{name}' will query the API")
@@ -2,27 +2,28 @@
 import dbus
 import dbus.service
 from characteristics.base import BaseCharacteristic
-from utils import logger
-from utils.api import APIClient
+from utils import logger, facts
 
 class CasanodeVersionCharacteristic(BaseCharacteristic):
+    DEADLINE = 8.0
+
     def __init__(self, bus, index, uuid):
         flags = ['read']
         super().__init__(bus, index, uuid, flags)
         self.service_path = '/org/bluez/example/service0'
-        self.api_client = APIClient()
 
     @dbus.service.method("org.bluez.GattCharacteristic1", in_signature="a{sv}", out_signature="ay")
     def ReadValue(self, options):
-        response = self.api_client.get("api/v1/node/configuration")
-        if response is not None:
-            try:
-                data = response.json()
-                version = data.get("casanodeVersion", "unknown")
-                logger.info(f"CasanodeVersionCharacteristic: read version '{version}'")
-            except Exception as e:
-                logger.error(f"Error reading casanode version: {e}")
-                version = "error"
-        else:
-            version = "error"
+        version = facts.read("casanode-version", self._load_version) or "error"
+        logger.info(f"CasanodeVersionCharacteristic: read version '{version}'")
         return [dbus.Byte(b) for b in version.encode("utf-8")]
+    
+    def _load_version(self):
+        data = self.api_client.get_json_cached("api/v1/node/configuration")
+        if data is None:
+            return None
+        try:
+            return data.get("casanodeVersion") or "unknown"
+        except Exception as e:
+            logger.error(f"Error reading casanode version: {e}")
+            return None
@@ -3,19 +3,19 @@ import dbus
 import dbus.service
 import json
 from characteristics.base import BaseCharacteristic
-from utils import logger
-from utils.api import APIClient
+from utils import aio, logger
 
 class CertExpirityCharacteristic(BaseCharacteristic):
+    DEADLINE = 8.0
+
     def __init__(self, bus, index, uuid):
         flags = ['read']
         super().__init__(bus, index, uuid, flags)
         self.service_path = '/org/bluez/example/service0'
-        self.api_client = APIClient()
     
-    @dbus.service.method("org.bluez.GattCharacteristic1", in_signature="a{sv}", out_signature="ay")
-    def ReadValue(self, options):
-        response = self.api_client.get("api/v1/status")
+    @aio.method("org.bluez.GattCharacteristic1", in_signature="a{sv}", out_signature="ay")
+    async def ReadValue(self, options):
+        response = await self.api_client.get_async("api/v1/status")
         if response is not None:
             try:
                 data = json.loads(response.text)
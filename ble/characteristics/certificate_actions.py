@@ -3,16 +3,16 @@ import dbus
 import dbus.service
 import threading
 from characteristics.base import BaseCharacteristic
-from utils import logger
-from utils.api import APIClient
+from utils import logger, jobs, installation
 
 class CertificateActionsCharacteristic(BaseCharacteristic):
+    DEADLINE = 5.0
+
     def __init__(self, bus, index, uuid):
         flags = ['read', 'write', 'notify']
         super().__init__(bus, index, uuid, flags)
         self.service_path = '/org/bluez/example/service0'
         self.cert_status = "0"
-        self.api_client = APIClient()
         self.lock = threading.Lock()
         self.notifying = False
     
@@ -27,20 +27,20 @@ class CertificateActionsCharacteristic(BaseCharacteristic):
         if action != "renew":
             logger.error(f"CertificateActionsCharacteristic: unknown action '{action}'")
             raise dbus.DBusException("org.bluez.Error.InvalidValue")
-        if self.cert_status == "1":
-            logger.error("Certificate renewal already in progress")
-            raise dbus.DBusException("org.bluez.Error.UnlikelyError")
+        self.start_job("certificate", self._renew_certificate, before=self._set_in_progress)
+    
+    def _set_in_progress(self):
         with self.lock:
             self.cert_status = "1"
         self._notify_clients()
-        threading.Thread(target=self._renew_certificate, daemon=True).start()
     
-    def _renew_certificate(self):
+    def _renew_certificate(self, job):
         try:
             response = self.api_client.post("api/v1/certificate/renew")
             with self.lock:
                 if response and response.status_code == 200:
                     self.cert_status = "2"
+                    installation.update(certificateKey=True)
                     logger.info("Certificate renewed successfully")
                 else:
                     self.cert_status = "-1"
@@ -49,8 +49,12 @@ class CertificateActionsCharacteristic(BaseCharacteristic):
             with self.lock:
                 self.cert_status = "-1"
             logger.error(f"Certificate renewal exception: {e}")
-        finally:
-            self._notify_clients()
+        self._notify_clients()
+        with self.lock:
+            status = self.cert_status
+        if status == "-1":
+            raise jobs.JobFailed(status)
+        return status
 
     @dbus.service.method("org.bluez.GattCharacteristic1", in_signature="", out_signature="")
     def StartNotify(self):
@@ -63,13 +67,9 @@ class CertificateActionsCharacteristic(BaseCharacteristic):
         self.notifying = False
     
     def _notify_clients(self):
-        """Sends a PropertiesChanged signal if a client is subscribed."""
+        """Notifies the subscribed clients (rate-limited by notify_value)."""
         if not self.notifying:
             return
         with self.lock:
-            arr = [dbus.Byte(b) for b in self.cert_status.encode('utf-8')]
-        self.PropertiesChanged(
-            "org.bluez.GattCharacteristic1",
-            {"Value": dbus.Array(arr, signature='y')},
-            []
-        )
\ No newline at end of file
+            data = self.cert_status.encode('utf-8')
+        self.notify_value(data)
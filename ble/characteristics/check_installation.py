@@ -2,32 +2,37 @@
 import dbus
 import dbus.service
 from characteristics.base import BaseCharacteristic
-from utils import logger
-from utils.api import APIClient
+from utils import aio, installation, logger
 
 class CheckInstallationCharacteristic(BaseCharacteristic):
+    """
+    Returns the installation flags ("111101": image, container, node
+    configuration, VPN configuration, certificate, wallet) from the
+    installation state kept by utils/installation.py, and notifies when
+    they change.
+    """
+    DEADLINE = 8.0
+
     def __init__(self, bus, index, uuid):
-        flags = ['read']
+        flags = ['read', 'notify']
         super().__init__(bus, index, uuid, flags)
         self.service_path = '/org/bluez/example/service0'
-        self.api_client = APIClient()
+        installation.add_listener(self._on_installation_changed)
     
-    @dbus.service.method("org.bluez.GattCharacteristic1", in_signature="a{sv}", out_signature="ay")
-    def ReadValue(self, options):
-        response = self.api_client.get("api/v1/check/installation")
-        if response is not None:
-            json_data = response.json()
-            data = [
-                '1' if json_data.get('image', False) else '0',
-                '1' if json_data.get('containerExists', False) else '0',
-                '1' if json_data.get('nodeConfig', False) else '0',
-                '1' if json_data.get('vpnConfig', False) else '0',
-                '1' if json_data.get('certificateKey', False) else '0',
-                '1' if json_data.get('wallet', False) else '0',
-            ]
-            result = ''.join(data)
-            logger.info(f"CheckInstallationCharacteristic: received '{result}'")
+    @aio.method("org.bluez.GattCharacteristic1", in_signature="a{sv}", out_signature="ay")
+    async def ReadValue(self, options):
+        result = installation.flags()
+        if result is None:
+            # Not seeded yet (API unreachable so far): ask the API now
+            result = await aio.to_thread(installation.verify)
+        if result is not None:
+            logger.info(f"CheckInstallationCharacteristic: state '{result}'")
         else:
             result = "error"
             logger.error("CheckInstallationCharacteristic: error retrieving installation check")
         return [dbus.Byte(b) for b in result.encode('utf-8')]
+    
+    def _on_installation_changed(self, flags):
+        if not self.notifying:
+            return
+        self.notify_value(flags.encode('utf-8'))
@@ -1,56 +1,121 @@
 #!/usr/bin/env python3
 import dbus
 import dbus.service
+import json
 import threading
 from characteristics.base import BaseCharacteristic
-from utils import logger
-from utils.api import APIClient
+from utils import logger, jobs, port_check
 
 # Status: "0" = not started, "1" = in progress, "2" = open, "3" = closed, "-1" = error.
 class CheckPortCharacteristic(BaseCharacteristic):
+    """
+    Checks the reachability of a port: write "node" or "vpn", then read the status.
+    
+    Writing "both" checks the two ports concurrently; the value is then a
+    JSON object with the status and the latency of each port, updated as
+    each check completes:
+    {"node":{"status":"2","latency_ms":850},"vpn":{"status":"3","latency_ms":920}}
+    
+    Each port has its own status and job, so "node" then "vpn" run side by
+    side; the value (and the notifications) follow the last request.
+    Results are cached (see utils/port_check.py); append "fresh" ("node
+    fresh", "both fresh") to check again regardless.
+    """
+    DEADLINE = 5.0
+
     def __init__(self, bus, index, uuid):
         flags = ['read', 'write', 'notify']
         super().__init__(bus, index, uuid, flags)
         self.service_path = '/org/bluez/example/service0'
-        self.port_status = "0"
-        self.api_client = APIClient()
+        # port type -> (status, latency ms)
+        self.port_status = {port_type: ("0", 0) for port_type in port_check.PORT_TYPES}
+        # Port type of the last request, "both", or None before the first one
+        self.requested = None
         self.lock = threading.Lock()
         self.notifying = False
     
+    def _value(self):
+        with self.lock:
+            if self.requested is None:
+                return "0"
+            if self.requested == "both":
+                return json.dumps(
+                    {port_type: {"status": status, "latency_ms": latency_ms} for port_type, (status, latency_ms) in self.port_status.items()},
+                    separators=(",", ":"),
+                )
+            return self.port_status[self.requested][0]
+    
     @dbus.service.method("org.bluez.GattCharacteristic1", in_signature="a{sv}", out_signature="ay")
     def ReadValue(self, options):
-        logger.info(f"CheckPortCharacteristic: current status '{self.port_status}'")
-        return [dbus.Byte(b) for b in self.port_status.encode('utf-8')]
+        value = self._value()
+        logger.info(f"CheckPortCharacteristic: current status '{value}'")
+        # The combined result of "both" may need a long read
+        return self.value_at_offset(value.encode('utf-8'), options)
     
     @dbus.service.method("org.bluez.GattCharacteristic1", in_signature="aya{sv}", out_signature="")
     def WriteValue(self, value, options):
-        port_type = bytes(value).decode('utf-8').strip().lower()
-        if port_type not in ["node", "vpn"]:
+        parts = bytes(value).decode('utf-8').strip().lower().split()
+        port_type = parts[0] if parts else ""
+        fresh = parts[1:] == ["fresh"]
+        if (port_type not in port_check.PORT_TYPES and port_type != "both") or (len(parts) > 1 and not fresh):
             logger.error("CheckPortCharacteristic: invalid port type")
             raise dbus.DBusException("org.bluez.Error.InvalidValue")
+        
+        def set_in_progress():
+            self._set_in_progress(port_type)
+        
+        if port_type == "both":
+            self.start_job("port-check", self._check_both, fresh, before=set_in_progress)
+        else:
+            self.start_job(f"port-check-{port_type}", self._check_port, port_type, fresh, before=set_in_progress)
+    
+    def _set_in_progress(self, requested):
         with self.lock:
-            self.port_status = "1"
+            self.requested = requested
+            for port_type in (port_check.PORT_TYPES if requested == "both" else [requested]):
+                self.port_status[port_type] = ("1", 0)
         self._notify_clients()
-        threading.Thread(target=self._check_port, args=(port_type,), daemon=True).start()
     
-    def _check_port(self, port_type):
-        response = self.api_client.get(f"api/v1/check/port/{port_type}")
-        if response is not None:
-            try:
-                result = response.text.strip().lower()
-                with self.lock:
-                    self.port_status = "2" if result == "open" else "3"
-                self._notify_clients()
-                logger.info(f"CheckPortCharacteristic: port '{port_type}' status '{self.port_status}'")
-            except Exception as e:
-                logger.error(f"Error in CheckPortCharacteristic: {e}")
-                with self.lock:
-                    self.port_status = "-1"
-                self._notify_clients()
-        else:
-            with self.lock:
-                self.port_status = "-1"
+    def _record(self, port_type, status, latency_ms):
+        """
+        Stores the result of `port_type`; notifies it if the last request covers that port.
+        """
+        with self.lock:
+            self.port_status[port_type] = (status, latency_ms)
+            shown = self.requested in (port_type, "both")
+        logger.info(f"CheckPortCharacteristic: port '{port_type}' status '{status}'")
+        if shown:
             self._notify_clients()
+    
+    def _check_port(self, job, port_type, fresh):
+        status, latency_ms, _ = port_check.check(port_type, fresh)
+        self._record(port_type, status, latency_ms)
+        if status == port_check.ERROR:
+            raise jobs.JobFailed(status)
+        return status
+    
+    def _check_both(self, job, fresh):
+        results = {}
+        
+        def on_result(port_type, result):
+            results[port_type] = result
+            self._record(port_type, result[0], result[1])
+            job.progress(len(results) * 100 // len(port_check.PORT_TYPES), ",".join(results))
+        
+        try:
+            port_check.check_all(fresh, on_result=on_result)
+        except Exception as e:
+            logger.error(f"Error in CheckPortCharacteristic: {e}")
+        for port_type in port_check.PORT_TYPES:
+            if port_type not in results:
+                results[port_type] = (port_check.ERROR, 0, False)
+                self._record(port_type, port_check.ERROR, 0)
+        if all(status == port_check.ERROR for status, _, _ in results.values()):
+            raise jobs.JobFailed(port_check.ERROR)
+        return json.dumps(
+            {port_type: {"status": status, "latency_ms": latency_ms} for port_type, (status, latency_ms, _) in results.items()},
+            separators=(",", ":"),
+        )
 
     @dbus.service.method("org.bluez.GattCharacteristic1", in_signature="", out_signature="")
     def StartNotify(self):
@@ -63,13 +128,7 @@ class CheckPortCharacteristic(BaseCharacteristic):
         self.notifying = False
     
     def _notify_clients(self):
-        """Emits a PropertiesChanged signal if a client is subscribed."""
+        """Notifies the subscribed clients (rate-limited by notify_value)."""
         if not self.notifying:
             return
-        with self.lock:
-            arr = [dbus.Byte(b) for b in self.port_status.encode('utf-8')]
-        self.PropertiesChanged(
-            "org.bluez.GattCharacteristic1",
-            {"Value": dbus.Array(arr, signature='y')},
-            []
-        )
\ No newline at end of file
+        self.notify_value(self._value().encode('utf-8'))
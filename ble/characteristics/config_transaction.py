@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+import dbus
+import dbus.service
+import json
+import threading
+from gi.repository import GLib
+from characteristics.base import BaseCharacteristic
+from utils import logger, validators, config_writer, resolver
+
+class ConfigTransactionCharacteristic(BaseCharacteristic):
+    """
+    Stages several node configuration fields and applies them with a single
+    PUT api/v1/node/configuration.
+
+    Commands (one per write):
+    - "begin": starts a new transaction, dropping any staged field
+    - "<field>=<value>": stages a field (moniker, nodeType, nodeIp, nodePort,
+      vpnType, vpnPort, maximumPeers, backend); invalid values are rejected,
+      nodeIp host names once resolved off the GLib loop
+    - "commit": sends the staged fields at once
+    - "abort": drops the staged fields
+
+    Reading returns {"status": "idle|staging|committing|success|error",
+    "fields": {...}, "message": "..."}; the final status of a commit is notified.
+    """
+    DEADLINE = 10.0
+
+    def __init__(self, bus, index, uuid):
+        flags = ['read', 'write', 'notify']
+        super().__init__(bus, index, uuid, flags)
+        self.service_path = '/org/bluez/example/service0'
+        self.lock = threading.Lock()
+        self.notifying = False
+        self.status = "idle"
+        self.staged = {}
+        self.message = ""
+
+    @dbus.service.method("org.bluez.GattCharacteristic1", in_signature="a{sv}", out_signature="ay")
+    def ReadValue(self, options):
+        return self.value_at_offset(self._state().encode("utf-8"), options)
+
+    @dbus.service.method("org.bluez.GattCharacteristic1", in_signature="aya{sv}", out_signature="",
+                         async_callbacks=("reply_handler", "error_handler"))
+    def WriteValue(self, value, options, reply_handler, error_handler):
+        command = bytes(value).decode("utf-8").strip()
+        if "=" in command:
+            self._stage(*command.split("=", 1), reply_handler, error_handler)
+            return
+        try:
+            self._run(command)
+        except dbus.DBusException as e:
+            error_handler(e)
+            return
+        reply_handler()
+
+    def _run(self, command):
+        if command.lower() == "begin":
+            self._begin()
+        elif command.lower() == "abort":
+            with self.lock:
+                self.staged = {}
+                self.status = "idle"
+                self.message = ""
+            logger.info("ConfigTransactionCharacteristic: transaction aborted")
+        elif command.lower() == "commit":
+            self._commit()
+        else:
+            logger.error(f"ConfigTransactionCharacteristic: Unknown command '{command}'")
+            raise dbus.DBusException("org.bluez.Error.InvalidValue")
+
+    def _begin(self):
+        with self.lock:
+            if self.status == "committing":
+                raise dbus.DBusException("org.bluez.Error.InProgress")
+            self.staged = {}
+            self.status = "staging"
+            self.message = ""
+        logger.info("ConfigTransactionCharacteristic: transaction started")
+
+    def _stage(self, field, raw_value, reply_handler, error_handler):
+        field = field.strip()
+        try:
+            value = validators.validate_config_field(field, raw_value)
+        except ValueError as e:
+            logger.error(f"ConfigTransactionCharacteristic: {field} rejected: {e}")
+            error_handler(dbus.DBusException("org.bluez.Error.InvalidValue"))
+            return
+        if not validators.needs_lookup(field, value):
+            self._finish_stage(field, value, True, reply_handler, error_handler)
+            return
+
+        # The DNS lookup runs off the GLib loop; the reply is sent from the loop once it completes
+        def resolved(resolvable):
+            GLib.idle_add(self._finish_stage, field, value, resolvable, reply_handler, error_handler)
+        resolver.resolve_async(value, resolved)
+
+    def _finish_stage(self, field, value, resolvable, reply_handler, error_handler):
+        if not resolvable:
+            logger.error(f"ConfigTransactionCharacteristic: {field} rejected: {value} does not resolve")
+            error_handler(dbus.DBusException("org.bluez.Error.InvalidValue"))
+            return False
+        try:
+            self._store(field, value)
+        except dbus.DBusException as e:
+            error_handler(e)
+            return False
+        reply_handler()
+        return False
+
+    def _store(self, field, value):
+        with self.lock:
+            # After a failed commit the staged fields can be corrected and committed again
+            if self.status not in ("staging", "error"):
+                logger.error("ConfigTransactionCharacteristic: No transaction started")
+                raise dbus.DBusException("org.bluez.Error.NotPermitted")
+            self.staged[field] = value
+            self.status = "staging"
+        logger.info(f"ConfigTransactionCharacteristic: staged {field}")
+
+    def _commit(self):
+        with self.lock:
+            if self.status not in ("staging", "error") or not self.staged:
+                logger.error("ConfigTransactionCharacteristic: Nothing to commit")
+                raise dbus.DBusException("org.bluez.Error.NotPermitted")
+            self.status = "committing"
+            payload = dict(self.staged)
+        self._notify_clients()
+        # Sent at once in a PUT of its own, after any pending write of the other config characteristics
+        config_writer.commit(payload, self._on_commit_done)
+
+    def _on_commit_done(self, success, fields):
+        if success:
+            logger.info(f"ConfigTransactionCharacteristic: committed {', '.join(fields)}")
+        else:
+            logger.error("ConfigTransactionCharacteristic: Failed to commit the configuration")
+        with self.lock:
+            self.status = "success" if success else "error"
+            self.message = "" if success else "API request failed"
+            if success:
+                self.staged = {}
+        self._notify_clients()
+
+    def _state(self):
+        with self.lock:
+            return json.dumps({
+                "status": self.status,
+                "fields": self.staged,
+                "message": self.message,
+            }, separators=(",", ":"))
+
+    @dbus.service.method("org.bluez.GattCharacteristic1", in_signature="", out_signature="")
+    def StartNotify(self):
+        logger.info("[ConfigTransaction] StartNotify")
+        self.notifying = True
+
+    @dbus.service.method("org.bluez.GattCharacteristic1", in_signature="", out_signature="")
+    def StopNotify(self):
+        logger.info("[ConfigTransaction] StopNotify")
+        self.notifying = False
+
+    def _notify_clients(self):
+        """Notifies the subscribed clients (rate-limited by notify_value)."""
+        if not self.notifying:
+            return
+        data = self._state().encode("utf-8")
+        self.notify_value(data)
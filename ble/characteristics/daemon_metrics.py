@@ -0,0 +1,26 @@
+#!/usr/bin/env python3
+import dbus
+import dbus.service
+import json
+from characteristics.base import BaseCharacteristic
+from utils import logger, metrics
+
+class DaemonMetricsCharacteristic(BaseCharacteristic):
+    """
+    Returns a JSON snapshot of the daemon metrics ({"counters": {...}, "gauges": {...}, "histograms": {...}}).
+    The snapshot is taken on the first read (offset 0) and long reads continue from it.
+    """
+    DEADLINE = 5.0
+
+    def __init__(self, bus, index, uuid):
+        flags = ['read']
+        super().__init__(bus, index, uuid, flags)
+        self.service_path = '/org/bluez/example/service0'
+        self._snapshot = b""
+    
+    @dbus.service.method("org.bluez.GattCharacteristic1", in_signature="a{sv}", out_signature="ay")
+    def ReadValue(self, options):
+        if int(options.get("offset", 0)) == 0:
+            self._snapshot = json.dumps(metrics.snapshot(), separators=(",", ":"), sort_keys=True).encode("utf-8")
+            logger.info(f"DaemonMetricsCharacteristic: snapshot of {len(self._snapshot)} bytes")
+        return self.value_at_offset(self._snapshot, options)
@@ -5,6 +5,8 @@ from characteristics.base import BaseCharacteristic
 from utils import logger, config, network
 
 class DiscoveryCharacteristic(BaseCharacteristic):
+    DEADLINE = 5.0
+
     def __init__(self, bus, index, uuid):
         # Set the "read" flag because this characteristic is read-only
         flags = ['read']
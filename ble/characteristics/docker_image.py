@@ -1,24 +1,23 @@
 #!/usr/bin/env python3
 import dbus
 import dbus.service
-import requests
 from characteristics.base import BaseCharacteristic
-from utils import logger, config
-from utils.api import APIClient
+from utils import aio, logger, config
 
 class DockerImageCharacteristic(BaseCharacteristic):
+    # Writing pulls the image synchronously
+    DEADLINE = 25.0
+
     def __init__(self, bus, index, uuid):
         flags = ['read', 'write']
         super().__init__(bus, index, uuid, flags)
         self.service_path = '/org/bluez/example/service0'
-        self.api_client = APIClient()
     
-    @dbus.service.method("org.bluez.GattCharacteristic1", in_signature="a{sv}", out_signature="ay")
-    def ReadValue(self, options):
-        response = self.api_client.get("api/v1/node/configuration")
-        if response is not None:
+    @aio.method("org.bluez.GattCharacteristic1", in_signature="a{sv}", out_signature="ay")
+    async def ReadValue(self, options):
+        data = await self.api_client.get_json_cached_async("api/v1/node/configuration")
+        if data is not None:
             try:
-                data = response.json()
                 docker_image = data.get("dockerImage", "unknown")
                 logger.info(f"DockerImageCharacteristic: Read dockerImage '{docker_image}' via REST API")
             except Exception as e:
@@ -3,18 +3,18 @@ import dbus
 import dbus.service
 import threading
 from characteristics.base import BaseCharacteristic
-from utils import logger
-from utils.api import APIClient
+from utils import logger, jobs, installation
 import json
 
 class InstallConfigsCharacteristic(BaseCharacteristic):
+    DEADLINE = 5.0
+
     def __init__(self, bus, index, uuid):
         flags = ['read', 'write', 'notify']
         super().__init__(bus, index, uuid, flags)
         self.service_path = '/org/bluez/example/service0'
         # Status values: "0" = not started, "1" = in progress, "2"/"111" = success, "-1" = error
         self.config_status = "0"
-        self.api_client = APIClient()
         # Lock for thread-safety when reading/writing the config_status
         self.lock = threading.Lock()
         # Initialize the notifying flag.
@@ -41,12 +41,14 @@ class InstallConfigsCharacteristic(BaseCharacteristic):
         if command != "create":
             logger.error("InstallConfigsCharacteristic: Invalid command")
             raise dbus.DBusException("org.bluez.Error.InvalidValue")
+        self.start_job("configs", self._install_configs, before=self._set_in_progress)
+    
+    def _set_in_progress(self):
         with self.lock:
             self.config_status = "1"
         self._notify_clients()
-        threading.Thread(target=self._install_configs, daemon=True).start()
     
-    def _install_configs(self):
+    def _install_configs(self, job):
         """
         Calls the API to install the configuration and updates the status accordingly.
         """
@@ -61,6 +63,11 @@ class InstallConfigsCharacteristic(BaseCharacteristic):
                         vpn_status = "1" if config.get("vpnConfig", False) else "0"
                         certificate_status = "1" if config.get("certificate", False) else "0"
                         self.config_status = node_status + vpn_status + certificate_status
+                    installation.update(
+                        nodeConfig=config.get("nodeConfig", False),
+                        vpnConfig=config.get("vpnConfig", False),
+                        certificateKey=config.get("certificate", False),
+                    )
                     logger.info(f"InstallConfigsCharacteristic: Installation completed, status '{result}'")
                 else:
                     with self.lock:
@@ -70,12 +77,16 @@ class InstallConfigsCharacteristic(BaseCharacteristic):
                 with self.lock:
                     self.config_status = "-1"
                 logger.error("InstallConfigsCharacteristic: Installation failed (no response)")
-            self._notify_clients()
         except Exception as e:
             with self.lock:
                 self.config_status = "-1"
             logger.error(f"InstallConfigsCharacteristic: Exception during installation: {e}")
-            self._notify_clients()
+        self._notify_clients()
+        with self.lock:
+            status = self.config_status
+        if status == "-1":
+            raise jobs.JobFailed(status)
+        return status
     
     @dbus.service.method("org.bluez.GattCharacteristic1", in_signature="", out_signature="")
     def StartNotify(self):
@@ -88,13 +99,9 @@ class InstallConfigsCharacteristic(BaseCharacteristic):
         self.notifying = False
 
     def _notify_clients(self):
-        """Sends a PropertiesChanged if at least one client is subscribed."""
+        """Notifies the subscribed clients (rate-limited by notify_value)."""
         if not self.notifying:
             return
         with self.lock:
-            arr = [dbus.Byte(b) for b in self.config_status.encode('utf-8')]
-        self.PropertiesChanged(
-            "org.bluez.GattCharacteristic1",
-            {"Value": dbus.Array(arr, signature='y')},
-            []
-        )
\ No newline at end of file
+            data = self.config_status.encode('utf-8')
+        self.notify_value(data)
@@ -4,8 +4,7 @@ import dbus.service
 import threading
 from enum import Enum
 from characteristics.base import BaseCharacteristic
-from utils import logger
-from utils.api import APIClient
+from utils import logger, jobs, installation
 
 class InstallStatus(Enum):
 	NOT_STARTED = "0"
@@ -14,12 +13,13 @@ class InstallStatus(Enum):
 	ERROR = "-1"
 
 class InstallDockerImageCharacteristic(BaseCharacteristic):
+	DEADLINE = 5.0
+
 	def __init__(self, bus, index, uuid):
 		# This characteristic supports read write, and notify.
 		flags = ['read', 'write', 'notify']
 		super().__init__(bus, index, uuid, flags)
 		self.service_path = '/org/bluez/example/service0'
-		self.api_client = APIClient()
 		# Initialize the installation status.
 		self.install_status = InstallStatus.NOT_STARTED
 		# Lock for thread-safety when modifying install_status.
@@ -47,41 +47,58 @@ class InstallDockerImageCharacteristic(BaseCharacteristic):
 		action = bytes(value).decode("utf-8").strip().lower()
 		logger.info(f"InstallDockerImageCharacteristic: WriteValue called with action '{action}'")
 		if action == "install":
-			with self.lock:
-				# Check if an installation is already in progress.
-				if self.install_status == InstallStatus.IN_PROGRESS:
-					logger.error("InstallDockerImageCharacteristic: Installation already in progress")
-					return
-				self.install_status = InstallStatus.IN_PROGRESS
-			# Start the installation in a separate thread.
-			self._notify_clients()
-			threading.Thread(target=self._install_docker_image, daemon=True).start()
+			# Start the installation as a background job.
+			self.start_job("docker-image", self._install_docker_image, before=self._set_in_progress)
 		else:
 			logger.error(f"InstallDockerImageCharacteristic: Unknown action '{action}'")
 			with self.lock:
 				self.install_status = InstallStatus.ERROR
 			self._notify_clients()
 
-	def _install_docker_image(self):
+	def _set_in_progress(self):
+		with self.lock:
+			self.install_status = InstallStatus.IN_PROGRESS
+		self._notify_clients()
+
+	def _install_docker_image(self, job):
 		"""
-		Calls the API to install the Docker image and updates the installation status accordingly.
-		The API call uses a timeout of 60 seconds.
+		Calls the streaming API to install the Docker image and updates the installation status accordingly.
+		The pull progress is reported through the job; there is no overall timeout,
+		only a pause of more than 120 seconds in the stream aborts it.
 		"""
+		result = {}
+		
+		def on_event(event):
+			if event.get("type") == "progress":
+				current = event.get("current") or 0
+				total = event.get("total") or 0
+				percent = current * 100 // total if total else None
+				detail = f"{event.get('layersDone', 0)}/{event.get('layers', 0)} {current / 1e6:.1f}/{total / 1e6:.1f}MB"
+				job.progress(percent, detail)
+			elif event.get("type") == "done":
+				result["imagePull"] = bool(event.get("imagePull"))
+		
 		try:
-			response = self.api_client.post("api/v1/install/docker-image", timeout=60)
+			streamed = self.api_client.stream_json("POST", "api/v1/install/docker-image/stream", on_event, idle_timeout=120)
 			with self.lock:
-				if response is not None:
+				if streamed and result.get("imagePull"):
 					self.install_status = InstallStatus.COMPLETED
 					logger.info("InstallDockerImageCharacteristic: Installation succeeded")
 				else:
 					self.install_status = InstallStatus.ERROR
-					logger.error("InstallDockerImageCharacteristic: Installation failed (no response)")
-			self._notify_clients()
+					logger.error("InstallDockerImageCharacteristic: Installation failed")
+			if streamed and result.get("imagePull"):
+				installation.update(image=True)
 		except Exception as e:
 			with self.lock:
 				self.install_status = InstallStatus.ERROR
 			logger.error(f"InstallDockerImageCharacteristic: Error installing docker image: {e}")
-			self._notify_clients()
+		self._notify_clients()
+		with self.lock:
+			status = self.install_status.value
+		if status == InstallStatus.ERROR.value:
+			raise jobs.JobFailed(status)
+		return status
 
 	@dbus.service.method("org.bluez.GattCharacteristic1", in_signature="", out_signature="")
 	def StartNotify(self):
@@ -94,13 +111,9 @@ class InstallDockerImageCharacteristic(BaseCharacteristic):
 		self.notifying = False
 
 	def _notify_clients(self):
-		"""Emits a PropertiesChanged signal if a client is subscribed."""
+		"""Notifies the subscribed clients (rate-limited by notify_value)."""
 		if not getattr(self, 'notifying', False):
 			return
 		with self.lock:
-			val = [dbus.Byte(b) for b in self.install_status.value.encode()]
-		self.PropertiesChanged(
-			"org.bluez.GattCharacteristic1",
-			{"Value": dbus.Array(val, signature="y")},
-			[]
-		)
+			data = self.install_status.value.encode()
+		self.notify_value(data)
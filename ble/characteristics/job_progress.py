@@ -0,0 +1,40 @@
+#!/usr/bin/env python3
+import dbus
+import dbus.service
+from characteristics.base import BaseCharacteristic
+from utils import logger, jobs
+
+class JobProgressCharacteristic(BaseCharacteristic):
+    """
+    Notifies the progress of the long-running jobs (see utils/jobs.py for the
+    binary frame layout). Reading returns the frame of the most recently
+    updated job, or an empty value if no job ran yet.
+    """
+    DEADLINE = 5.0
+
+    def __init__(self, bus, index, uuid):
+        flags = ['read', 'notify']
+        super().__init__(bus, index, uuid, flags)
+        self.service_path = '/org/bluez/example/service0'
+        jobs.add_listener(self._on_job_update)
+
+    @dbus.service.method("org.bluez.GattCharacteristic1", in_signature="a{sv}", out_signature="ay")
+    def ReadValue(self, options):
+        job = jobs.latest()
+        frame = job.frame() if job is not None else b""
+        return self.value_at_offset(frame, options)
+
+    def _on_job_update(self, job):
+        # Coalesced per job: a frame only replaces an older one of the same job,
+        # so a job's final frame is never lost behind another job's progress
+        self.notify_value(job.frame(), key=job.id)
+
+    @dbus.service.method("org.bluez.GattCharacteristic1", in_signature="", out_signature="")
+    def StartNotify(self):
+        logger.info("JobProgressCharacteristic: StartNotify")
+        self.notifying = True
+
+    @dbus.service.method("org.bluez.GattCharacteristic1", in_signature="", out_signature="")
+    def StopNotify(self):
+        logger.info("JobProgressCharacteristic: StopNotify")
+        self.notifying = False
@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+import dbus
+import dbus.service
+import json
+import logging
+import zlib
+from characteristics.base import BaseCharacteristic
+from utils import config, logger, metrics
+
+LEVELS = {"error": logging.ERROR, "warning": logging.WARNING, "info": logging.INFO}
+
+class LogTailCharacteristic(BaseCharacteristic):
+    """
+    Streams the recent daemon logs (in-memory buffer of utils/logger.py).
+
+    Writing a level ("error", "warning" or "info"), optionally followed by a
+    maximum number of bytes ("warning 8192"), sends the newest matching lines,
+    zlib-compressed, in MTU-sized frames (see BaseCharacteristic.stream_frames()).
+    Reading returns the buffer usage as JSON.
+
+    Credentials (bearer tokens, mnemonics, passphrases) are censored in the
+    buffer (logger.RedactFilter).
+    """
+    DEADLINE = 5.0
+
+    def __init__(self, bus, index, uuid):
+        flags = ['read', 'write', 'notify']
+        super().__init__(bus, index, uuid, flags)
+        self.service_path = '/org/bluez/example/service0'
+
+    @dbus.service.method("org.bluez.GattCharacteristic1", in_signature="a{sv}", out_signature="ay")
+    def ReadValue(self, options):
+        records, size, capacity = logger.buffer_usage()
+        data = json.dumps({"records": records, "bytes": size, "capacity": capacity}, separators=(",", ":"))
+        return self.value_at_offset(data.encode("utf-8"), options)
+
+    @dbus.service.method("org.bluez.GattCharacteristic1", in_signature="aya{sv}", out_signature="")
+    def WriteValue(self, value, options):
+        parts = bytes(value).decode("utf-8").strip().lower().split()
+        max_bytes = int(config.get_config().get("LOG_TAIL_MAX_BYTES", 65536))
+        try:
+            level = LEVELS[parts[0]] if parts else logging.INFO
+            if len(parts) > 1:
+                max_bytes = min(max_bytes, int(parts[1]))
+        except (KeyError, ValueError):
+            logger.error(f"LogTailCharacteristic: invalid request '{' '.join(parts)}'")
+            raise dbus.DBusException("org.bluez.Error.InvalidValue")
+        if not self.notifying:
+            logger.error("LogTailCharacteristic: write without a subscription")
+            raise dbus.DBusException("org.bluez.Error.NotPermitted")
+
+        lines = logger.tail(level, max_bytes)
+        payload = zlib.compress(b"\n".join(lines), 9)
+        frames = self.stream_frames(payload, options.get("mtu"))
+        metrics.increment("log_tail.streams")
+        logger.info(f"LogTailCharacteristic: streaming {len(lines)} lines, {len(payload)} bytes in {frames} frames")
@@ -2,22 +2,24 @@
 import dbus
 import dbus.service
 from characteristics.base import BaseCharacteristic
-from utils import logger
-from utils.api import APIClient
+from utils import logger, config_writer
 
 class MaxPeersCharacteristic(BaseCharacteristic):
+    DEADLINE = 10.0
+
     def __init__(self, bus, index, uuid):
-        flags = ['read', 'write']
+        flags = ['read', 'write', 'notify']
         super().__init__(bus, index, uuid, flags)
         self.service_path = '/org/bluez/example/service0'
-        self.api_client = APIClient()
         
     @dbus.service.method("org.bluez.GattCharacteristic1", in_signature="a{sv}", out_signature="ay")
     def ReadValue(self, options):
-        response = self.api_client.get("api/v1/node/configuration")
-        if response is not None:
+        return [dbus.Byte(b) for b in self._read_value().encode("utf-8")]
+    
+    def _read_value(self):
+        data = config_writer.read_configuration()
+        if data is not None:
             try:
-                data = response.json()
                 max_peers = str(data.get("maximumPeers", "0"))
                 logger.info(f"MaxPeersCharacteristic: read value '{max_peers}'")
             except Exception as e:
@@ -25,7 +27,7 @@ class MaxPeersCharacteristic(BaseCharacteristic):
                 max_peers = "0"
         else:
             max_peers = "0"
-        return [dbus.Byte(b) for b in max_peers.encode('utf-8')]
+        return max_peers
         
     @dbus.service.method("org.bluez.GattCharacteristic1", in_signature="aya{sv}", out_signature="")
     def WriteValue(self, value, options):
@@ -35,12 +37,12 @@ class MaxPeersCharacteristic(BaseCharacteristic):
                 logger.error("MaxPeersCharacteristic: Invalid maximumPeers value")
                 raise dbus.DBusException("org.bluez.Error.InvalidValue")
             payload = {"maximumPeers": new_value}
-            response = self.api_client.put("api/v1/node/configuration", json=payload)
-            if response is not None:
-                logger.info(f"MaxPeersCharacteristic: maximumPeers updated to {new_value}")
-            else:
-                logger.error("MaxPeersCharacteristic: Failed to update maximumPeers")
-                raise dbus.DBusException("org.bluez.Error.UnlikelyError")
+            config_writer.submit(payload, on_done=self._on_write_done)
+            logger.info(f"MaxPeersCharacteristic: maximumPeers update to {new_value} queued")
         except Exception as e:
             logger.error(f"MaxPeersCharacteristic: Error updating maximumPeers: {e}")
             raise dbus.DBusException("org.bluez.Error.UnlikelyError")
+    
+    def _on_write_done(self, success, fields):
+        if not success:
+            self.notify_value(self._read_value().encode("utf-8"))
@@ -3,15 +3,15 @@ import dbus
 import dbus.service
 import threading
 from characteristics.base import BaseCharacteristic
-from utils import logger
-from utils.api import APIClient
+from utils import logger, installation
 
 class NodeActionsCharacteristic(BaseCharacteristic):
+    DEADLINE = 5.0
+
     def __init__(self, bus, index, uuid):
         flags = ['write']
         super().__init__(bus, index, uuid, flags)
         self.service_path = '/org/bluez/example/service0'
-        self.api_client = APIClient()
     
     @dbus.service.method("org.bluez.GattCharacteristic1", in_signature="aya{sv}", out_signature="")
     def WriteValue(self, value, options):
@@ -33,6 +33,11 @@ class NodeActionsCharacteristic(BaseCharacteristic):
                 return
             if response is not None and response.status_code == 200:
                 logger.info(f"Node action '{action}' succeeded")
+                if action == "remove":
+                    installation.update(containerExists=False)
+                else:
+                    # Starting the node may create its container
+                    installation.verify_later()
             else:
                 logger.error(f"Node action '{action}' failed")
         except Exception as e:
@@ -2,27 +2,28 @@
 import dbus
 import dbus.service
 from characteristics.base import BaseCharacteristic
-from utils import logger
-from utils.api import APIClient
+from utils import logger, facts
 
 class NodeAddressCharacteristic(BaseCharacteristic):
+    DEADLINE = 8.0
+
     def __init__(self, bus, index, uuid):
         flags = ['read']
         super().__init__(bus, index, uuid, flags)
         self.service_path = '/org/bluez/example/service0'
-        self.api_client = APIClient()
     
     @dbus.service.method("org.bluez.GattCharacteristic1", in_signature="a{sv}", out_signature="ay")
     def ReadValue(self, options):
-        response = self.api_client.get("api/v1/node/address")
-        if response is not None:
-            try:
-                data = response.json()
-                address = data.get("address", "error")
-                logger.info(f"NodeAddressCharacteristic: received '{address}'")
-            except Exception as e:
-                logger.error(f"Error reading node address: {e}")
-                address = "error"
-        else:
-            address = "error"
+        address = facts.read("node-address", self._load_address) or "error"
+        logger.info(f"NodeAddressCharacteristic: read '{address}'")
         return [dbus.Byte(b) for b in address.encode("utf-8")]
+    
+    def _load_address(self):
+        data = self.api_client.get_json_cached("api/v1/node/address")
+        if data is None:
+            return None
+        try:
+            return data.get("address")
+        except Exception as e:
+            logger.error(f"Error reading node address: {e}")
+            return None
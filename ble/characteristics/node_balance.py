@@ -3,8 +3,7 @@ import dbus
 import dbus.service
 import threading
 from characteristics.base import BaseCharacteristic
-from utils import logger
-from utils.api import APIClient
+from utils import config, logger, jobs
 
 class NodeBalanceCharacteristic(BaseCharacteristic):
     """
@@ -16,13 +15,19 @@ class NodeBalanceCharacteristic(BaseCharacteristic):
     ReadValue will return a status code ("1" for in progress, "0" for not started,
     "-1" for error). Once the balance is successfully fetched, ReadValue
     returns the balance in the format "<amount> <currency>".
+    
+    The balance is cached for BALANCE_CACHE_TTL seconds: after a write, reads
+    return the cached balance (if any) while the fresh query runs. While
+    clients are subscribed, the balance is refreshed in the background every
+    BALANCE_REFRESH_INTERVAL seconds and notified only when it changes.
     """
+    DEADLINE = 5.0
+    BALANCE_PATH = "api/v1/node/balance"
     
     def __init__(self, bus, index, uuid):
         flags = ['read', 'write', 'notify']
         super().__init__(bus, index, uuid, flags)
         self.service_path = '/org/bluez/example/service0'
-        self.api_client = APIClient()
         
         # balance_state holds the current state:
         # "0" = not started,
@@ -32,6 +37,12 @@ class NodeBalanceCharacteristic(BaseCharacteristic):
         self.balance_state = "0"
         self.notifying = False
         self.lock = threading.Lock()
+        # Set to stop the background refresh (see StartNotify())
+        self._refresh_stop = None
+        cfg = config.get_config()
+        self.refresh_interval = float(cfg.get("BALANCE_REFRESH_INTERVAL", 60))
+        # walletBalance() queries a remote chain endpoint: keep it longer than the default TTL
+        self.api_client.cache.set_ttl(self.BALANCE_PATH, float(cfg.get("BALANCE_CACHE_TTL", 60)))
     
     @dbus.service.method("org.bluez.GattCharacteristic1", in_signature="aya{sv}", out_signature="")
     def WriteValue(self, value, options):
@@ -44,37 +55,70 @@ class NodeBalanceCharacteristic(BaseCharacteristic):
         
         # Check for the expected command; adjust the command string if needed.
         if command == "udvpn":
-            with self.lock:
-                # Set status to "1" (in progress) and start the API call in a new thread.
-                self.balance_state = "1"
-            self._notify_clients()
-            threading.Thread(target=self._fetch_balance, daemon=True).start()
+            self.start_job("balance", self._fetch_balance, before=self._set_in_progress)
         else:
             logger.error(f"NodeBalanceCharacteristic: Unknown command '{command}'")
             with self.lock:
                 self.balance_state = "-1"
             self._notify_clients()
     
-    def _fetch_balance(self):
+    def _set_in_progress(self):
+        with self.lock:
+            # Serve the cached balance while the fresh query runs, "1" (in progress) without one
+            cached = self._balance_from(self.api_client.cache.peek(self.BALANCE_PATH))
+            self.balance_state = cached or "1"
+        self._notify_clients()
+    
+    @staticmethod
+    def _balance_from(data):
+        if not isinstance(data, dict):
+            return None
+        return data.get("balance") or None
+    
+    def _fetch_balance(self, job):
         """
-        Fetch the node's balance from the API.
+        Fetch the node's balance from the API (an explicit request: never served from the cache).
         """
         try:
-            resp = self.api_client.get("api/v1/node/balance")
+            balance = self._balance_from(self.api_client.get_json_cached(self.BALANCE_PATH, fresh=True))
             with self.lock:
-                if resp and resp.ok:
-                    bal = resp.json().get("balance")
-                    self.balance_state = bal or "-1"
-                else:
-                    self.balance_state = "-1"
+                self.balance_state = balance or "-1"
             logger.info(f"NodeBalanceCharacteristic: fetched '{self.balance_state}'")
         except Exception as e:
             with self.lock:
                 self.balance_state = "-1"
             logger.error(f"NodeBalanceCharacteristic: Exception during fetch: {e}")
-        finally:
+        self._notify_clients()
+        with self.lock:
+            state = self.balance_state
+        if state == "-1":
+            raise jobs.JobFailed(state)
+        return state
+    
+    def _refresh_balance(self):
+        """
+        Background refresh: updates the balance and notifies only if it changed.
+        """
+        try:
+            balance = self._balance_from(self.api_client.get_json_cached(self.BALANCE_PATH, fresh=True))
+        except Exception as e:
+            logger.error(f"NodeBalanceCharacteristic: Exception during refresh: {e}")
+            return
+        if balance is None:
+            return
+        with self.lock:
+            # Leave an explicit fetch in progress to report its own result
+            changed = self.balance_state not in ("1", balance)
+            if changed:
+                self.balance_state = balance
+        if changed:
+            logger.info(f"NodeBalanceCharacteristic: balance changed to '{balance}'")
             self._notify_clients()
     
+    def _refresh_loop(self, stop):
+        while not stop.wait(self.refresh_interval):
+            self._refresh_balance()
+    
     @dbus.service.method("org.bluez.GattCharacteristic1", in_signature="a{sv}", out_signature="ay")
     def ReadValue(self, options):
         """
@@ -83,27 +127,36 @@ class NodeBalanceCharacteristic(BaseCharacteristic):
             - A status code ("0", "1", or "-1") if the balance is not yet available or on error,
             - The balance string (e.g., "123.45 USD") if the fetch was successful.
         """
-        logger.info(f"NodeBalanceCharacteristic: Current balance state '{self.balance_state}'")
-        return [dbus.Byte(b) for b in self.balance_state.encode("utf-8")]
+        with self.lock:
+            state = self.balance_state
+        if state == "0":
+            # Not requested yet: a balance cached by an earlier request or refresh will do
+            state = self._balance_from(self.api_client.cache.peek(self.BALANCE_PATH)) or state
+        logger.info(f"NodeBalanceCharacteristic: Current balance state '{state}'")
+        return [dbus.Byte(b) for b in state.encode("utf-8")]
 
     @dbus.service.method("org.bluez.GattCharacteristic1", in_signature="", out_signature="")
     def StartNotify(self):
         logger.info("NodeBalanceCharacteristic: StartNotify")
         self.notifying = True
+        with self.lock:
+            if self._refresh_stop is None:
+                self._refresh_stop = threading.Event()
+                threading.Thread(target=self._refresh_loop, args=(self._refresh_stop,), daemon=True).start()
     
     @dbus.service.method("org.bluez.GattCharacteristic1", in_signature="", out_signature="")
     def StopNotify(self):
         logger.info("NodeBalanceCharacteristic: StopNotify")
         self.notifying = False
+        with self.lock:
+            if self._refresh_stop is not None:
+                self._refresh_stop.set()
+                self._refresh_stop = None
     
     def _notify_clients(self):
-        """Sends a PropertiesChanged signal if a client is subscribed."""
+        """Notifies the subscribed clients (rate-limited by notify_value)."""
         if not self.notifying:
             return
         with self.lock:
-            arr = [dbus.Byte(b) for b in self.balance_state.encode()]
-        self.PropertiesChanged(
-            "org.bluez.GattCharacteristic1",
-            {"Value": dbus.Array(arr, signature='y')},
-            []
-        )
+            data = self.balance_state.encode()
+        self.notify_value(data)
@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+import dbus
+import dbus.service
+import json
+from characteristics.base import BaseCharacteristic
+from utils import logger, metrics, node_history
+
+class NodeHistoryCharacteristic(BaseCharacteristic):
+    """
+    Streams the traffic history of the node (see utils/node_history.py).
+    
+    Write "<series> <step> <span>", e.g. "download 60 86400" for the last day
+    at a one-minute resolution, to receive the window packed as described in
+    utils/timeseries.py, in MTU-sized frames (see
+    BaseCharacteristic.stream_frames()). Series: download, upload, peers;
+    steps: 10, 60, 3600 seconds; at most MAX_POINTS buckets, the most recent.
+    Reading returns the available series and steps as JSON.
+    """
+    DEADLINE = 5.0
+    MAX_POINTS = 1440
+
+    def __init__(self, bus, index, uuid):
+        flags = ['read', 'write', 'notify']
+        super().__init__(bus, index, uuid, flags)
+        self.service_path = '/org/bluez/example/service0'
+    
+    @dbus.service.method("org.bluez.GattCharacteristic1", in_signature="a{sv}", out_signature="ay")
+    def ReadValue(self, options):
+        data = json.dumps({
+            "series": {name: series_id for series_id, name in node_history.SERIES.items()},
+            "steps": [step for step, _ in node_history.LEVELS],
+        }, separators=(",", ":"))
+        return self.value_at_offset(data.encode("utf-8"), options)
+    
+    @dbus.service.method("org.bluez.GattCharacteristic1", in_signature="aya{sv}", out_signature="")
+    def WriteValue(self, value, options):
+        try:
+            name, step, span = bytes(value).decode("utf-8").strip().lower().split()
+            step, span = int(step), int(span)
+            series = node_history.series(name)
+            if series is None or span <= 0:
+                raise ValueError(f"unknown series '{name}'")
+            packed = series.pack(step, span, max_points=self.MAX_POINTS)
+        except ValueError as e:
+            logger.error(f"NodeHistoryCharacteristic: invalid request: {e}")
+            raise dbus.DBusException("org.bluez.Error.InvalidValue")
+        if not self.notifying:
+            logger.error("NodeHistoryCharacteristic: write without a subscription")
+            raise dbus.DBusException("org.bluez.Error.NotPermitted")
+        frames = self.stream_frames(packed, options.get("mtu"))
+        metrics.increment("node_history.streams")
+        logger.info(f"NodeHistoryCharacteristic: '{name}' step {step}s span {span}s, {len(packed)} bytes in {frames} frames")
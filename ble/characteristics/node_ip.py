@@ -2,23 +2,26 @@
 import dbus
 import dbus.service
 import json
+from gi.repository import GLib
 from characteristics.base import BaseCharacteristic
-from utils import logger, config, validators
-from utils.api import APIClient
+from utils import logger, config, validators, config_writer, resolver
 
 class NodeIpCharacteristic(BaseCharacteristic):
+    DEADLINE = 10.0
+
     def __init__(self, bus, index, uuid):
-        flags = ['read', 'write']
+        flags = ['read', 'write', 'notify']
         super().__init__(bus, index, uuid, flags)
         self.service_path = '/org/bluez/example/service0'
-        self.api_client = APIClient()
     
     @dbus.service.method("org.bluez.GattCharacteristic1", in_signature="a{sv}", out_signature="ay")
     def ReadValue(self, options):
-        response = self.api_client.get("api/v1/node/configuration")
-        if response is not None:
+        return [dbus.Byte(b) for b in self._read_value().encode("utf-8")]
+    
+    def _read_value(self):
+        data = config_writer.read_configuration()
+        if data is not None:
             try:
-                data = response.json()  # Expect "nodeIp" in the response
                 nodeIp = data.get("nodeIp", "")
                 logger.info(f"NodeIpCharacteristic: read nodeIp '{nodeIp}'")
             except Exception as e:
@@ -26,18 +29,40 @@ class NodeIpCharacteristic(BaseCharacteristic):
                 nodeIp = "error"
         else:
             nodeIp = "error"
-        return [dbus.Byte(b) for b in nodeIp.encode("utf-8")]
+        return nodeIp
     
-    @dbus.service.method("org.bluez.GattCharacteristic1", in_signature="aya{sv}", out_signature="")
-    def WriteValue(self, value, options):
+    @dbus.service.method("org.bluez.GattCharacteristic1", in_signature="aya{sv}", out_signature="",
+                         async_callbacks=("reply_handler", "error_handler"))
+    def WriteValue(self, value, options, reply_handler, error_handler):
         new_ip = bytes(value).decode("utf-8").strip()
-        if not validators.is_valid_ip(new_ip) and not validators.is_valid_dns(new_ip):
+        if validators.is_valid_ip(new_ip):
+            self._submit(new_ip)
+            reply_handler()
+            return
+        if not validators.is_valid_hostname(new_ip):
             logger.error("Invalid nodeIp value")
-            raise dbus.DBusException("org.bluez.Error.InvalidValue")
-        payload = {"nodeIp": new_ip}
-        response = self.api_client.put("api/v1/node/configuration", json=payload)
-        if response is not None and response.status_code == 200:
-            logger.info(f"NodeIpCharacteristic: nodeIp updated to {new_ip}")
+            error_handler(dbus.DBusException("org.bluez.Error.InvalidValue"))
+            return
+        
+        # The DNS lookup runs off the GLib loop; the reply is sent from the loop once it completes
+        def resolved(resolvable):
+            GLib.idle_add(self._finish_write, new_ip, resolvable, reply_handler, error_handler)
+        resolver.resolve_async(new_ip, resolved)
+    
+    def _finish_write(self, new_ip, resolvable, reply_handler, error_handler):
+        if resolvable:
+            self._submit(new_ip)
+            reply_handler()
         else:
-            logger.error("Failed to update nodeIp")
-            raise dbus.DBusException("org.bluez.Error.UnlikelyError")
+            logger.error(f"Invalid nodeIp value, {new_ip} does not resolve")
+            error_handler(dbus.DBusException("org.bluez.Error.InvalidValue"))
+        return False
+    
+    def _submit(self, new_ip):
+        payload = {"nodeIp": new_ip}
+        config_writer.submit(payload, on_done=self._on_write_done)
+        logger.info(f"NodeIpCharacteristic: nodeIp update to {new_ip} queued")
+    
+    def _on_write_done(self, success, fields):
+        if not success:
+            self.notify_value(self._read_value().encode("utf-8"))
@@ -2,22 +2,24 @@
 import dbus
 import dbus.service
 from characteristics.base import BaseCharacteristic
-from utils import logger
-from utils.api import APIClient
+from utils import logger, config_writer
 
 class NodeKeyringBackendCharacteristic(BaseCharacteristic):
+    DEADLINE = 10.0
+
     def __init__(self, bus, index, uuid):
-        flags = ['read', 'write']
+        flags = ['read', 'write', 'notify']
         super().__init__(bus, index, uuid, flags)
         self.service_path = '/org/bluez/example/service0'
-        self.api_client = APIClient()
     
     @dbus.service.method("org.bluez.GattCharacteristic1", in_signature="a{sv}", out_signature="ay")
     def ReadValue(self, options):
-        response = self.api_client.get("api/v1/node/configuration")
-        if response is not None:
+        return [dbus.Byte(b) for b in self._read_value().encode("utf-8")]
+    
+    def _read_value(self):
+        data = config_writer.read_configuration()
+        if data is not None:
             try:
-                data = response.json()
                 backend = data.get("backend", "unknown")
                 logger.info(f"NodeKeyringBackendCharacteristic: Read backend '{backend}' via REST API")
             except Exception as e:
@@ -25,7 +27,7 @@ class NodeKeyringBackendCharacteristic(BaseCharacteristic):
                 backend = "error"
         else:
             backend = "error"
-        return [dbus.Byte(b) for b in backend.encode("utf-8")]
+        return backend
     
     @dbus.service.method("org.bluez.GattCharacteristic1", in_signature="aya{sv}", out_signature="")
     def WriteValue(self, value, options):
@@ -34,9 +36,9 @@ class NodeKeyringBackendCharacteristic(BaseCharacteristic):
             logger.error("NodeKeyringBackendCharacteristic: Invalid node keyring backend value")
             raise dbus.DBusException("org.bluez.Error.InvalidValue")
         payload = {"backend": new_backend}
-        response = self.api_client.put("api/v1/node/configuration", json=payload)
-        if response is not None and response.status_code == 200:
-            logger.info(f"NodeKeyringBackendCharacteristic: Backend updated to '{new_backend}' via REST API")
-        else:
-            logger.error("NodeKeyringBackendCharacteristic: Error updating backend via REST API")
-            raise dbus.DBusException("org.bluez.Error.UnlikelyError")
+        config_writer.submit(payload, on_done=self._on_write_done)
+        logger.info(f"NodeKeyringBackendCharacteristic: Backend update to '{new_backend}' queued")
+    
+    def _on_write_done(self, success, fields):
+        if not success:
+            self.notify_value(self._read_value().encode("utf-8"))
@@ -2,22 +2,24 @@
 import dbus
 import dbus.service
 from characteristics.base import BaseCharacteristic
-from utils import logger
-from utils.api import APIClient
+from utils import logger, config_writer
 
 class NodePortCharacteristic(BaseCharacteristic):
+    DEADLINE = 10.0
+
     def __init__(self, bus, index, uuid):
-        flags = ['read', 'write']
+        flags = ['read', 'write', 'notify']
         super().__init__(bus, index, uuid, flags)
         self.service_path = '/org/bluez/example/service0'
-        self.api_client = APIClient()
     
     @dbus.service.method("org.bluez.GattCharacteristic1", in_signature="a{sv}", out_signature="ay")
     def ReadValue(self, options):
-        response = self.api_client.get("api/v1/node/configuration")
-        if response is not None:
+        return [dbus.Byte(b) for b in self._read_value().encode("utf-8")]
+    
+    def _read_value(self):
+        data = config_writer.read_configuration()
+        if data is not None:
             try:
-                data = response.json()
                 node_port = str(data.get("nodePort", "0"))
                 logger.info(f"NodePortCharacteristic: read node_port '{node_port}'")
             except Exception as e:
@@ -25,7 +27,7 @@ class NodePortCharacteristic(BaseCharacteristic):
                 node_port = "error"
         else:
             node_port = "error"
-        return [dbus.Byte(b) for b in node_port.encode("utf-8")]
+        return node_port
     
     @dbus.service.method("org.bluez.GattCharacteristic1", in_signature="aya{sv}", out_signature="")
     def WriteValue(self, value, options):
@@ -35,12 +37,12 @@ class NodePortCharacteristic(BaseCharacteristic):
                 logger.error("Invalid node_port value")
                 raise dbus.DBusException("org.bluez.Error.InvalidValue")
             payload = {"nodePort": new_port}
-            response = self.api_client.put("api/v1/node/configuration", json=payload)
-            if response is not None and response.status_code == 200:
-                logger.info(f"NodePortCharacteristic: updated node_port to {new_port}")
-            else:
-                logger.error("Failed to update node_port")
-                raise dbus.DBusException("org.bluez.Error.UnlikelyError")
+            config_writer.submit(payload, on_done=self._on_write_done)
+            logger.info(f"NodePortCharacteristic: node_port update to {new_port} queued")
         except Exception as e:
             logger.error(f"Error updating node port: {e}")
             raise dbus.DBusException("org.bluez.Error.UnlikelyError")
+    
+    def _on_write_done(self, success, fields):
+        if not success:
+            self.notify_value(self._read_value().encode("utf-8"))
@@ -2,27 +2,36 @@
 import dbus
 import dbus.service
 from characteristics.base import BaseCharacteristic
-from utils import logger
-from utils.api import APIClient
+from utils import aio, logger, events
 
 class NodeStatusCharacteristic(BaseCharacteristic):
+    DEADLINE = 8.0
+
     def __init__(self, bus, index, uuid):
-        flags = ['read']
+        flags = ['read', 'notify']
         super().__init__(bus, index, uuid, flags)
         self.service_path = '/org/bluez/example/service0'
-        self.api_client = APIClient()
+        # The container was started/stopped or the wallet unlocked
+        events.add_listener("node.status", self._on_status_event)
+        events.add_listener("node.passphrase", self._on_status_event)
+    
+    @staticmethod
+    def _status_from(data):
+        if data is None:
+            return "error"
+        return data.get("status", "error")
     
     def get_api_status(self):
-        response = self.api_client.get("api/v1/node/status")
-        if response is not None:
-            try:
-                data = response.json()
-                return data.get("status", "error")
-            except ValueError:
-                return "error"
-        return "error"
+        return self._status_from(self.api_client.get_json_cached("api/v1/node/status"))
     
-    @dbus.service.method("org.bluez.GattCharacteristic1", in_signature="a{sv}", out_signature="ay")
-    def ReadValue(self, options):
-        status = self.get_api_status()
+    @aio.method("org.bluez.GattCharacteristic1", in_signature="a{sv}", out_signature="ay")
+    async def ReadValue(self, options):
+        status = self._status_from(await self.api_client.get_json_cached_async("api/v1/node/status"))
         return [dbus.Byte(b) for b in status.encode('utf-8')]
+
+    def _on_status_event(self, event):
+        if not self.notifying:
+            return
+        status = self.get_api_status()
+        logger.info(f"NodeStatusCharacteristic: status changed to '{status}'")
+        self.notify_value(status.encode('utf-8'))
@@ -3,22 +3,24 @@ import dbus
 import dbus.service
 import json
 from characteristics.base import BaseCharacteristic
-from utils import logger
-from utils.api import APIClient
+from utils import logger, config_writer
 
 class NodeTypeCharacteristic(BaseCharacteristic):
+    DEADLINE = 10.0
+
     def __init__(self, bus, index, uuid):
-        flags = ['read', 'write']
+        flags = ['read', 'write', 'notify']
         super().__init__(bus, index, uuid, flags)
         self.service_path = '/org/bluez/example/service0'
-        self.api_client = APIClient()
     
     @dbus.service.method("org.bluez.GattCharacteristic1", in_signature="a{sv}", out_signature="ay")
     def ReadValue(self, options):
-        response = self.api_client.get("api/v1/node/configuration")
-        if response is not None:
+        return [dbus.Byte(b) for b in self._read_value().encode("utf-8")]
+    
+    def _read_value(self):
+        data = config_writer.read_configuration()
+        if data is not None:
             try:
-                data = response.json()
                 node_type = data.get("nodeType", "")
                 logger.info(f"NodeTypeCharacteristic: read node_type '{node_type}'")
             except Exception as e:
@@ -26,7 +28,7 @@ class NodeTypeCharacteristic(BaseCharacteristic):
                 node_type = "error"
         else:
             node_type = "error"
-        return [dbus.Byte(b) for b in node_type.encode("utf-8")]
+        return node_type
     
     @dbus.service.method("org.bluez.GattCharacteristic1", in_signature="aya{sv}", out_signature="")
     def WriteValue(self, value, options):
@@ -35,9 +37,9 @@ class NodeTypeCharacteristic(BaseCharacteristic):
             logger.error("Invalid node_type value")
             raise dbus.DBusException("org.bluez.Error.InvalidValue")
         payload = {"nodeType": new_type}
-        response = self.api_client.put("api/v1/node/configuration", json=payload)
-        if response is not None and response.status_code == 200:
-            logger.info(f"NodeTypeCharacteristic: updated node_type to {new_type}")
-        else:
-            logger.error("Failed to update node_type")
-            raise dbus.DBusException("org.bluez.Error.UnlikelyError")
+        config_writer.submit(payload, on_done=self._on_write_done)
+        logger.info(f"NodeTypeCharacteristic: node_type update to {new_type} queued")
+    
+    def _on_write_done(self, success, fields):
+        if not success:
+            self.notify_value(self._read_value().encode("utf-8"))
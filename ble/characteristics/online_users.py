@@ -2,22 +2,22 @@
 import dbus
 import dbus.service
 from characteristics.base import BaseCharacteristic
-from utils import logger
-from utils.api import APIClient
+from utils import aio, logger, events
 
 class OnlineUsersCharacteristic(BaseCharacteristic):
+    DEADLINE = 8.0
+
     def __init__(self, bus, index, uuid):
-        flags = ['read']
+        flags = ['read', 'notify']
         super().__init__(bus, index, uuid, flags)
         self.service_path = '/org/bluez/example/service0'
-        self.api_client = APIClient()
+        events.add_listener("node.peers", self._on_peers_event)
     
-    @dbus.service.method("org.bluez.GattCharacteristic1", in_signature="a{sv}", out_signature="ay")
-    def ReadValue(self, options):
-        response = self.api_client.get("api/v1/status")
-        if response is not None:
+    @aio.method("org.bluez.GattCharacteristic1", in_signature="a{sv}", out_signature="ay")
+    async def ReadValue(self, options):
+        data = await self.api_client.get_json_cached_async("api/v1/status")
+        if data is not None:
             try:
-                data = response.json()
                 # Extract the number of online users from the "peers" attribute
                 peers = data.get("status", {}).get("peers", -1)
                 logger.info(f"OnlineUsersCharacteristic: received '{peers}'")
@@ -28,3 +28,8 @@ class OnlineUsersCharacteristic(BaseCharacteristic):
             peers = 0
         peers_str = str(peers)
         return [dbus.Byte(b) for b in peers_str.encode("utf-8")]
+
+    def _on_peers_event(self, event):
+        peers = event.get("data", {}).get("peers")
+        if peers is not None:
+            self.notify_value(str(peers).encode("utf-8"))
@@ -3,18 +3,18 @@ import dbus
 import dbus.service
 import threading
 from characteristics.base import BaseCharacteristic
-from utils import logger
-from utils.api import APIClient
+from utils import logger, jobs
 
 class SystemActionsCharacteristic(BaseCharacteristic):
 	# This characteristic supports system actions like update, reboot, halt, etc.
+	DEADLINE = 5.0
+	
 	def __init__(self, bus, index, uuid):
 		flags = ['read', 'write', 'notify']
 		super().__init__(bus, index, uuid, flags)
 		self.service_path = '/org/bluez/example/service0'
 		# Status values: "0" = not started, "1" = in progress, "2" = completed, "-1" = error
 		self.action_status = "0"
-		self.api_client = APIClient()
 		# Lock for thread-safety when modifying action_status
 		self.lock = threading.Lock()
 		self.notifying = False
@@ -37,13 +37,15 @@ class SystemActionsCharacteristic(BaseCharacteristic):
 		The command is expected to be one of: update-system, update-sentinel, reboot, halt, reset.
 		"""
 		action = bytes(value).decode("utf-8").strip().lower()
+		# Start the system action as a background job.
+		self.start_job("system", self._perform_action, action, before=self._set_in_progress)
+	
+	def _set_in_progress(self):
 		with self.lock:
 			self.action_status = "1"  # in progress
 		self._notify_clients()
-		# Start the system action in a separate thread.
-		threading.Thread(target=self._perform_action, args=(action,), daemon=True).start()
 	
-	def _perform_action(self, action):
+	def _perform_action(self, job, action):
 		"""
 		Performs the specified system action via an API call and updates the action status accordingly.
 		"""
@@ -62,28 +64,28 @@ class SystemActionsCharacteristic(BaseCharacteristic):
 				response = self.api_client.post("api/v1/system/reset")
 			else:
 				logger.error(f"Unknown system action: {action}")
-				with self.lock:
-					self.action_status = "-1"
-					self._notify_clients()
-				return
+				response = None
 
 			# If a response is received, check its status code
 			if response is not None:
 				response.raise_for_status()
 				with self.lock:
 					self.action_status = "2"
-				self._notify_clients()
 				logger.info(f"System action '{action}' succeeded")
 			else:
 				with self.lock:
 					self.action_status = "-1"
-				self._notify_clients()
 				logger.error(f"System action '{action}' failed: no response")
 		except Exception as e:
 			logger.error(f"Error performing system action '{action}': {e}")
 			with self.lock:
 				self.action_status = "-1"
-			self._notify_clients()
+		self._notify_clients()
+		with self.lock:
+			status = self.action_status
+		if status == "-1":
+			raise jobs.JobFailed(status)
+		return status
 	
 	@dbus.service.method("org.bluez.GattCharacteristic1", in_signature="", out_signature="")
 	def StartNotify(self):
@@ -99,9 +101,5 @@ class SystemActionsCharacteristic(BaseCharacteristic):
 		if not self.notifying:
 			return
 		with self.lock:
-			arr = [dbus.Byte(b) for b in self.action_status.encode('utf-8')]
-		self.PropertiesChanged(
-			"org.bluez.GattCharacteristic1",
-			{"Value": dbus.Array(arr, signature='y')},
-			[]
-		)
\ No newline at end of file
+			data = self.action_status.encode('utf-8')
+		self.notify_value(data)
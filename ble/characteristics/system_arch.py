@@ -2,27 +2,29 @@
 import dbus
 import dbus.service
 from characteristics.base import BaseCharacteristic
-from utils import logger
-from utils.api import APIClient
+from utils import logger, facts, system_info
 
 class SystemArchCharacteristic(BaseCharacteristic):
+    DEADLINE = 8.0
+
     def __init__(self, bus, index, uuid):
         flags = ['read']
         super().__init__(bus, index, uuid, flags)
         self.service_path = '/org/bluez/example/service0'
-        self.api_client = APIClient()
         
     @dbus.service.method("org.bluez.GattCharacteristic1", in_signature="a{sv}", out_signature="ay")
     def ReadValue(self, options):
-        response = self.api_client.get("api/v1/status")
-        if response is not None:
-            try:
-                data = response.json()
-                arch = data.get("systemArch", "error")
-                logger.info(f"SystemArchCharacteristic: read arch '{arch}'")
-            except Exception as e:
-                logger.error(f"Error reading system arch: {e}")
-                arch = "error"
-        else:
-            arch = "error"
+        # The API is only queried if the value cannot be read locally
+        arch = system_info.arch() or facts.read("system-arch", self._load_arch) or "error"
+        logger.info(f"SystemArchCharacteristic: read arch '{arch}'")
         return [dbus.Byte(b) for b in arch.encode("utf-8")]
+    
+    def _load_arch(self):
+        data = self.api_client.get_json_cached("api/v1/status")
+        if data is None:
+            return None
+        try:
+            return data.get("systemArch")
+        except Exception as e:
+            logger.error(f"Error reading system arch: {e}")
+            return None
@@ -2,27 +2,28 @@
 import dbus
 import dbus.service
 from characteristics.base import BaseCharacteristic
-from utils import logger
-from utils.api import APIClient
+from utils import logger, facts, system_info
 
 class SystemKernelCharacteristic(BaseCharacteristic):
+    DEADLINE = 8.0
+
     def __init__(self, bus, index, uuid):
         flags = ['read']
         super().__init__(bus, index, uuid, flags)
         self.service_path = '/org/bluez/example/service0'
-        self.api_client = APIClient()
 
     @dbus.service.method("org.bluez.GattCharacteristic1", in_signature="a{sv}", out_signature="ay")
     def ReadValue(self, options):
-        response = self.api_client.get("api/v1/status")
-        if response is not None:
-            try:
-                data = response.json()
-                kernel = data.get("systemKernel", "error")
-                logger.info(f"SystemKernelCharacteristic: read kernel '{kernel}'")
-            except Exception as e:
-                logger.error(f"Error reading system kernel: {e}")
-                kernel = "error"
-        else:
-            kernel = "error"
+        kernel = system_info.kernel() or facts.read("system-kernel", self._load_kernel) or "error"
+        logger.info(f"SystemKernelCharacteristic: read kernel '{kernel}'")
         return [dbus.Byte(b) for b in kernel.encode("utf-8")]
+    
+    def _load_kernel(self):
+        data = self.api_client.get_json_cached("api/v1/status")
+        if data is None:
+            return None
+        try:
+            return data.get("systemKernel")
+        except Exception as e:
+            logger.error(f"Error reading system kernel: {e}")
+            return None
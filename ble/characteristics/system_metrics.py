@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+import dbus
+import dbus.service
+from characteristics.base import BaseCharacteristic
+from utils import logger, system_sampler
+
+class SystemMetricsCharacteristic(BaseCharacteristic):
+    """
+    Returns the history of a system metric as a packed window (see
+    utils/timeseries.py for the layout).
+    
+    Write "<series> <step> <span>" to select the window, e.g. "cpu 60 3600"
+    for the last hour at a one-minute resolution. Series: cpu, memory,
+    temperature, disk, net_rx, net_tx; steps: 1, 60, 3600 seconds. Windows
+    longer than timeseries.MAX_POINTS buckets are cut to the most recent ones.
+    The window is packed on the first read (offset 0) and long reads continue
+    from it.
+    """
+    DEADLINE = 5.0
+
+    def __init__(self, bus, index, uuid):
+        flags = ['read', 'write']
+        super().__init__(bus, index, uuid, flags)
+        self.service_path = '/org/bluez/example/service0'
+        self._request = ("cpu", 1, 60)
+        self._packed = b""
+    
+    @dbus.service.method("org.bluez.GattCharacteristic1", in_signature="aya{sv}", out_signature="")
+    def WriteValue(self, value, options):
+        try:
+            name, step, span = bytes(value).decode("utf-8").strip().lower().split()
+            step, span = int(step), int(span)
+            series = system_sampler.series(name)
+            if series is None or span <= 0:
+                raise ValueError(f"unknown series '{name}'")
+            series.level(step)
+        except ValueError as e:
+            logger.error(f"SystemMetricsCharacteristic: invalid request: {e}")
+            raise dbus.DBusException("org.bluez.Error.InvalidValue")
+        self._request = (name, step, span)
+        logger.info(f"SystemMetricsCharacteristic: window '{name}' step {step}s span {span}s")
+    
+    @dbus.service.method("org.bluez.GattCharacteristic1", in_signature="a{sv}", out_signature="ay")
+    def ReadValue(self, options):
+        if int(options.get("offset", 0)) == 0:
+            name, step, span = self._request
+            self._packed = system_sampler.series(name).pack(step, span)
+        return self.value_at_offset(self._packed, options)
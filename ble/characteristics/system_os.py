@@ -2,27 +2,28 @@
 import dbus
 import dbus.service
 from characteristics.base import BaseCharacteristic
-from utils import logger
-from utils.api import APIClient
+from utils import logger, facts, system_info
 
 class SystemOsCharacteristic(BaseCharacteristic):
+    DEADLINE = 8.0
+
     def __init__(self, bus, index, uuid):
         flags = ['read']
         super().__init__(bus, index, uuid, flags)
         self.service_path = '/org/bluez/example/service0'
-        self.api_client = APIClient()
         
     @dbus.service.method("org.bluez.GattCharacteristic1", in_signature="a{sv}", out_signature="ay")
     def ReadValue(self, options):
-        response = self.api_client.get("api/v1/status")
-        if response is not None:
-            try:
-                data = response.json()
-                os_value = data.get("systemOs", "error").strip()
-                logger.info(f"SystemOsCharacteristic: read OS '{os_value}'")
-            except Exception as e:
-                logger.error(f"Error reading system OS: {e}")
-                os_value = "error"
-        else:
-            os_value = "error"
+        os_value = system_info.os_name() or facts.read("system-os", self._load_os) or "error"
+        logger.info(f"SystemOsCharacteristic: read OS '{os_value}'")
         return [dbus.Byte(b) for b in os_value.encode("utf-8")]
+    
+    def _load_os(self):
+        data = self.api_client.get_json_cached("api/v1/status")
+        if data is None:
+            return None
+        try:
+            return (data.get("systemOs") or "").strip() or None
+        except Exception as e:
+            logger.error(f"Error reading system OS: {e}")
+            return None
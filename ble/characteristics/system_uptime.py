@@ -2,22 +2,26 @@
 import dbus
 import dbus.service
 from characteristics.base import BaseCharacteristic
-from utils import logger
-from utils.api import APIClient
+from utils import logger, system_info
 
 class SystemUptimeCharacteristic(BaseCharacteristic):
+    DEADLINE = 8.0
+
     def __init__(self, bus, index, uuid):
         flags = ['read']
         super().__init__(bus, index, uuid, flags)
         self.service_path = '/org/bluez/example/service0'
-        self.api_client = APIClient()
         
     @dbus.service.method("org.bluez.GattCharacteristic1", in_signature="a{sv}", out_signature="ay")
     def ReadValue(self, options):
-        response = self.api_client.get("api/v1/status")
-        if response is not None:
+        boot_time = system_info.boot_time()
+        if boot_time is not None:
+            uptime_str = str(boot_time)
+            logger.info(f"SystemUptimeCharacteristic: read boot time '{uptime_str}'")
+            return [dbus.Byte(b) for b in uptime_str.encode("utf-8")]
+        data = self.api_client.get_json_cached("api/v1/status")
+        if data is not None:
             try:
-                data = response.json()
                 uptime = data.get("uptime", "error")
                 uptime_str = str(uptime)
                 logger.info(f"SystemUptimeCharacteristic: read uptime '{uptime_str}'")
@@ -3,22 +3,24 @@ import dbus
 import dbus.service
 import json
 from characteristics.base import BaseCharacteristic
-from utils import logger
-from utils.api import APIClient
+from utils import logger, config_writer
 
 class VpnTypeCharacteristic(BaseCharacteristic):
+    DEADLINE = 10.0
+
     def __init__(self, bus, index, uuid):
-        flags = ['read', 'write']
+        flags = ['read', 'write', 'notify']
         super().__init__(bus, index, uuid, flags)
         self.service_path = '/org/bluez/example/service0'
-        self.api_client = APIClient()
     
     @dbus.service.method("org.bluez.GattCharacteristic1", in_signature="a{sv}", out_signature="ay")
     def ReadValue(self, options):
-        response = self.api_client.get("api/v1/node/configuration")
-        if response is not None:
+        return [dbus.Byte(b) for b in self._read_value().encode("utf-8")]
+    
+    def _read_value(self):
+        data = config_writer.read_configuration()
+        if data is not None:
             try:
-                data = response.json()
                 vpn_type = data.get("vpnType", "")
                 logger.info(f"VpnTypeCharacteristic: Read vpn_type '{vpn_type}' via REST API")
             except Exception as e:
@@ -26,7 +28,7 @@ class VpnTypeCharacteristic(BaseCharacteristic):
                 vpn_type = "error"
         else:
             vpn_type = "error"
-        return [dbus.Byte(b) for b in vpn_type.encode("utf-8")]
+        return vpn_type
     
     @dbus.service.method("org.bluez.GattCharacteristic1", in_signature="aya{sv}", out_signature="")
     def WriteValue(self, value, options):
@@ -35,9 +37,9 @@ class VpnTypeCharacteristic(BaseCharacteristic):
             logger.error("VpnTypeCharacteristic: Invalid vpn_type value")
             raise dbus.DBusException("org.bluez.Error.InvalidValue")
         payload = {"vpnType": new_type}
-        response = self.api_client.put("api/v1/node/configuration", json=payload)
-        if response is not None and response.status_code == 200:
-            logger.info(f"VpnTypeCharacteristic: vpn_type updated to {new_type} via REST API")
-        else:
-            logger.error(f"VpnTypeCharacteristic: Failed to update vpn_type, status code {response.status_code if response else 'None'}")
-            raise dbus.DBusException("org.bluez.Error.UnlikelyError")
+        config_writer.submit(payload, on_done=self._on_write_done)
+        logger.info(f"VpnTypeCharacteristic: vpn_type update to {new_type} queued")
+    
+    def _on_write_done(self, success, fields):
+        if not success:
+            self.notify_value(self._read_value().encode("utf-8"))
@@ -1,15 +1,15 @@
 #!/usr/bin/env python3
 import dbus, dbus.service, threading, json
 from characteristics.base import BaseCharacteristic
-from utils import logger
-from utils.api import APIClient
+from utils import logger, facts, installation
 
 class WalletActionsCharacteristic(BaseCharacteristic):
+	DEADLINE = 5.0
+
 	def __init__(self, bus, index, uuid):
 		flags = ['read', 'write', 'notify']
 		super().__init__(bus, index, uuid, flags)
 		self.service_path = '/org/bluez/example/service0'
-		self.api_client   = APIClient()
 		self.notifying    = False
 		self.result_json  = json.dumps({ 'status':'idle' })
 
@@ -32,12 +32,14 @@ class WalletActionsCharacteristic(BaseCharacteristic):
 	def _create_wallet(self):
 		try:
 			resp = self.api_client.post('api/v1/wallet/create')
+			facts.forget(*facts.WALLET_FACTS)
 			if resp is None:
 				raise RuntimeError('API unreachable')
 
 			resp.raise_for_status()
 			data = resp.json()
 			if data.get('success') and data.get('mnemonic'):
+				installation.update(wallet=True)
 				self.result_json = json.dumps({ 'status':'success', 'mnemonic':' '.join(data['mnemonic']) })
 			else:
 				self.result_json = json.dumps({ 'status':'error', 'message': data.get('message', 'unknown') })
@@ -50,9 +52,11 @@ class WalletActionsCharacteristic(BaseCharacteristic):
 	def _remove_wallet(self):
 		try:
 			resp = self.api_client.delete('api/v1/wallet/remove')
+			facts.forget(*facts.WALLET_FACTS)
 			if resp is None:
 				raise RuntimeError('API unreachable')
 			resp.raise_for_status()
+			installation.update(wallet=False)
 			logger.info('Wallet removed successfully')
 		except Exception as e:
 			logger.error(f"Wallet remove error: {e}")
@@ -60,8 +64,8 @@ class WalletActionsCharacteristic(BaseCharacteristic):
 	def _notify_clients(self):
 		if not self.notifying:
 			return
-		arr = [ dbus.Byte(b) for b in self.result_json.encode('utf-8') ]
-		self.PropertiesChanged('org.bluez.GattCharacteristic1', { 'Value': dbus.Array(arr, signature='y') }, [])
+		data = self.result_json.encode('utf-8')
+		self.notify_value(data)
 
 	@dbus.service.method('org.bluez.GattCharacteristic1', in_signature='', out_signature='')
 	def StartNotify(self):
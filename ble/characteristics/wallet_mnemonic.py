@@ -5,8 +5,7 @@ import struct
 import hashlib
 import json
 from characteristics.base import BaseCharacteristic
-from utils import logger
-from utils.api import APIClient
+from utils import logger, deadline, facts, installation
 
 class WalletMnemonicCharacteristic(BaseCharacteristic):
     """
@@ -18,13 +17,14 @@ class WalletMnemonicCharacteristic(BaseCharacteristic):
         1) First write => 4 bytes of length (little-endian).
         2) Subsequent writes => the actual data (mnemonic + space + hash).
     """
+    # Wallet creation and restore are slow: use most of the ATT transaction timeout
+    DEADLINE = 28.0
     CHUNK_SIZE = 20
 
     def __init__(self, bus, index, uuid):
         flags = ['read', 'write']
         super().__init__(bus, index, uuid, flags)
         self.service_path = '/org/bluez/example/service0'
-        self.api_client = APIClient()
         
         # For writing
         self._expected_length = None            # Number of bytes we expect to receive
@@ -89,6 +89,7 @@ class WalletMnemonicCharacteristic(BaseCharacteristic):
         """
         try:
             response = self.api_client.post("api/v1/wallet/create", timeout=30)
+            facts.forget(*facts.WALLET_FACTS)
             if response is None:
                 logger.error("NodeMnemonicCharacteristic: No response from /wallet/create")
                 self._mnemonic_data = b"error"
@@ -105,6 +106,7 @@ class WalletMnemonicCharacteristic(BaseCharacteristic):
                 logger.error("NodeMnemonicCharacteristic: API returned success=false")
                 self._mnemonic_data = b"error"
                 return
+            installation.update(wallet=True)
             
             mnemonic_list = data.get("mnemonic", [])
             if not isinstance(mnemonic_list, list) or not mnemonic_list:
@@ -120,6 +122,12 @@ class WalletMnemonicCharacteristic(BaseCharacteristic):
             data_str = f"{mnemonic_str} {hash_str}"
             self._mnemonic_data = data_str.encode("utf-8")
             logger.info("NodeMnemonicCharacteristic: Wallet created, mnemonic data prepared for reading.")
+        except deadline.DeadlineExceeded as e:
+            # The wallet may have been created all the same
+            facts.forget(*facts.WALLET_FACTS)
+            installation.verify_later()
+            logger.error(f"NodeMnemonicCharacteristic: /wallet/create: {e}")
+            self._mnemonic_data = b"timeout"
         except Exception as e:
             logger.error(f"NodeMnemonicCharacteristic: Exception calling /wallet/create: {e}")
             self._mnemonic_data = b"error"
@@ -154,10 +162,12 @@ class WalletMnemonicCharacteristic(BaseCharacteristic):
             # If we have all the data, parse and restore
             if len(self._write_buffer) >= self._expected_length:
                 logger.info("NodeMnemonicCharacteristic: All chunks received, verifying mnemonic + hash for restore")
-                self._handle_full_mnemonic_data()
-                # Reset for next time
-                self._expected_length = None
-                self._write_buffer = bytearray()
+                try:
+                    self._handle_full_mnemonic_data()
+                finally:
+                    # Reset for next time
+                    self._expected_length = None
+                    self._write_buffer = bytearray()
 
     def _handle_full_mnemonic_data(self):
         """
@@ -178,9 +188,14 @@ class WalletMnemonicCharacteristic(BaseCharacteristic):
                 # If valid, call the wallet restore API
                 logger.info("NodeMnemonicCharacteristic: Hash valid, restoring wallet...")
                 payload = {"mnemonic": mnemonic}
-                resp = self.api_client.post("api/v1/wallet/restore", json=payload, timeout=30)
+                try:
+                    resp = self.api_client.post("api/v1/wallet/restore", json=payload, timeout=30)
+                finally:
+                    # Also when the deadline runs out: the wallet may have been restored all the same
+                    facts.forget(*facts.WALLET_FACTS)
                 if resp is not None and resp.status_code == 200:
                     logger.info("NodeMnemonicCharacteristic: Wallet restore successful")
+                    installation.update(wallet=True)
                 else:
                     logger.error(f"NodeMnemonicCharacteristic: Wallet restore failed, status code="
                                 f" {resp.status_code if resp else 'None'}")
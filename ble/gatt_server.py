@@ -4,46 +4,15 @@ import dbus.mainloop.glib
 import dbus.service
 from dbus import String, Boolean, UInt32
 from dbus.exceptions import DBusException
+import importlib
 import signal
-import subprocess
 import uuid
 import time
 from gi.repository import GLib
 from utils.config import get_config
 from utils import logger
-from characteristics.moniker import MonikerCharacteristic
-from characteristics.cert_expirity import CertExpirityCharacteristic
-from characteristics.node_port import NodePortCharacteristic
-from characteristics.node_type import NodeTypeCharacteristic
-from characteristics.discovery import DiscoveryCharacteristic
-from characteristics.docker_image import DockerImageCharacteristic
-from characteristics.install_docker_image import InstallDockerImageCharacteristic
-from characteristics.install_configs import InstallConfigsCharacteristic
-from characteristics.vpn_port import VpnPortCharacteristic
-from characteristics.vpn_type import VpnTypeCharacteristic
-from characteristics.max_peers import MaxPeersCharacteristic
-from characteristics.wallet_actions import WalletActionsCharacteristic
-from characteristics.node_keyring_backend import NodeKeyringBackendCharacteristic
-from characteristics.online_users import OnlineUsersCharacteristic
-from characteristics.node_ip import NodeIpCharacteristic
-from characteristics.node_address import NodeAddressCharacteristic
-from characteristics.node_balance import NodeBalanceCharacteristic
-from characteristics.node_status import NodeStatusCharacteristic
-from characteristics.node_location import NodeLocationCharacteristic
-from characteristics.wallet_mnemonic import WalletMnemonicCharacteristic
-from characteristics.wallet_address import WalletAddressCharacteristic
-from characteristics.system_actions import SystemActionsCharacteristic
-from characteristics.system_uptime import SystemUptimeCharacteristic
-from characteristics.casanode_version import CasanodeVersionCharacteristic
-from characteristics.system_arch import SystemArchCharacteristic
-from characteristics.system_os import SystemOsCharacteristic
-from characteristics.system_kernel import SystemKernelCharacteristic
-from characteristics.bandwidth_speed import BandwidthSpeedCharacteristic
-from characteristics.wallet_passphrase import WalletPassphraseCharacteristic
-from characteristics.check_port import CheckPortCharacteristic
-from characteristics.certificate_actions import CertificateActionsCharacteristic
-from characteristics.node_actions import NodeActionsCharacteristic
-from characteristics.check_installation import CheckInstallationCharacteristic
+from utils.btmgmt import get_controller, ControllerError
+from utils import startup, events, installation, node_history, system_sampler, watchdog
 
 BLUEZ_SERVICE_NAME = 'org.bluez'
 LE_ADVERTISING_MANAGER_IFACE = 'org.bluez.LEAdvertisingManager1'
@@ -52,6 +21,53 @@ GATT_MANAGER_IFACE = "org.bluez.GattManager1"
 ADAPTER_IFACE = "org.bluez.Adapter1"
 SERVICE_PATH = '/org/bluez/example/service0'
 
+# Characteristics exposed by the service: (index, UUID seed id, module, class).
+# Modules are imported when the application is registered, not when this file is imported.
+# The discovery characteristic uses BLE_DISCOVERY_UUID instead of a seeded UUID.
+CHARACTERISTICS = [
+    (5, None, "discovery", "DiscoveryCharacteristic"),
+    (6, "node-status", "node_status", "NodeStatusCharacteristic"),
+    (7, "moniker", "moniker", "MonikerCharacteristic"),
+    (8, "node-type", "node_type", "NodeTypeCharacteristic"),
+    (9, "node-ip", "node_ip", "NodeIpCharacteristic"),
+    (10, "node-port", "node_port", "NodePortCharacteristic"),
+    (11, "vpn-type", "vpn_type", "VpnTypeCharacteristic"),
+    (12, "vpn-port", "vpn_port", "VpnPortCharacteristic"),
+    (13, "max-peers", "max_peers", "MaxPeersCharacteristic"),
+    (14, "node-location", "node_location", "NodeLocationCharacteristic"),
+    (15, "cert-expirity", "cert_expirity", "CertExpirityCharacteristic"),
+    (16, "online-users", "online_users", "OnlineUsersCharacteristic"),
+    (17, "bandwidth-speed", "bandwidth_speed", "BandwidthSpeedCharacteristic"),
+    (18, "system-uptime", "system_uptime", "SystemUptimeCharacteristic"),
+    (19, "casanode-version", "casanode_version", "CasanodeVersionCharacteristic"),
+    (20, "docker-image", "docker_image", "DockerImageCharacteristic"),
+    (21, "install-docker-image", "install_docker_image", "InstallDockerImageCharacteristic"),
+    (22, "system-os", "system_os", "SystemOsCharacteristic"),
+    (23, "system-arch", "system_arch", "SystemArchCharacteristic"),
+    (24, "system-kernel", "system_kernel", "SystemKernelCharacteristic"),
+    (25, "install-configs", "install_configs", "InstallConfigsCharacteristic"),
+    (26, "wallet-actions", "wallet_actions", "WalletActionsCharacteristic"),
+    (27, "node-keyring-backend", "node_keyring_backend", "NodeKeyringBackendCharacteristic"),
+    (28, "node-address", "node_address", "NodeAddressCharacteristic"),
+    (29, "node-balance", "node_balance", "NodeBalanceCharacteristic"),
+    (30, "wallet-mnemonic", "wallet_mnemonic", "WalletMnemonicCharacteristic"),
+    (31, "wallet-address", "wallet_address", "WalletAddressCharacteristic"),
+    (32, "system-actions", "system_actions", "SystemActionsCharacteristic"),
+    (33, "node-passphrase", "wallet_passphrase", "WalletPassphraseCharacteristic"),
+    (34, "check-port", "check_port", "CheckPortCharacteristic"),
+    (35, "certificate-actions", "certificate_actions", "CertificateActionsCharacteristic"),
+    (36, "node-actions", "node_actions", "NodeActionsCharacteristic"),
+    (37, "check-installation", "check_installation", "CheckInstallationCharacteristic"),
+    (38, "api-health", "api_health", "ApiHealthCharacteristic"),
+    (39, "daemon-metrics", "daemon_metrics", "DaemonMetricsCharacteristic"),
+    (40, "cache-control", "cache_control", "CacheControlCharacteristic"),
+    (41, "config-transaction", "config_transaction", "ConfigTransactionCharacteristic"),
+    (42, "job-progress", "job_progress", "JobProgressCharacteristic"),
+    (43, "log-tail", "log_tail", "LogTailCharacteristic"),
+    (44, "system-metrics", "system_metrics", "SystemMetricsCharacteristic"),
+    (45, "node-history", "node_history", "NodeHistoryCharacteristic"),
+]
+
 # To generate UUIDs based on a seed
 def generate_uuid_from_seed(characteristic_id: str) -> str:
     cfg = get_config()
@@ -60,30 +76,23 @@ def generate_uuid_from_seed(characteristic_id: str) -> str:
         raise ValueError("The key 'BLE_CHARACTERISTIC_SEED' must be set in the configuration.")
     return str(uuid.uuid5(uuid.NAMESPACE_URL, f"{seed}+{characteristic_id}"))
 
-def configure_ble_controller():
+def configure_ble_controller(controller):
     """
-    Run btmgmt in interactive mode to set:
+    Configure the controller through the management interface:
       - bondable off
       - connection-parameters 24 40 0 1000 (10 s supervision timeout)
     """
-    cmds = "\n".join([
-        "menu le",
-        "bondable off",
-        "connection-parameters 24 40 0 1000",
-        "back",
-        "exit"
-    ]) + "\n"
+    logger.info("Configuring BLE controller parameters…")
+    try:
+        backend = controller.set_bondable(False)
+        logger.info(f"BLE controller bondable off (via {backend})")
+    except ControllerError as e:
+        logger.error(f"Controller bondable configuration failed: {e}")
     try:
-        logger.info("Configuring BLE controller parameters via btmgmt…")
-        subprocess.run(
-            ["sudo", "btmgmt"],
-            input=cmds,
-            text=True,
-            check=True
-        )
-        logger.info("BLE controller configured")
-    except subprocess.CalledProcessError as e:
-        logger.error(f"btmgmt configuration failed: {e}")
+        backend = controller.set_connection_parameters(24, 40, 0, 1000)
+        logger.info(f"BLE controller connection parameters set (via {backend})")
+    except ControllerError as e:
+        logger.error(f"Controller connection parameters configuration failed: {e}")
 
 def disable_pairing_via_dbus(bus, adapter="hci0"):
     """
@@ -101,6 +110,16 @@ def disable_pairing_via_dbus(bus, adapter="hci0"):
     except Exception as e:
         logger.error(f"Failed to disable pairing via D-Bus: {e}")
 
+def load_characteristics():
+    """
+    Import the characteristic modules and return (index, seed id, class) tuples.
+    """
+    loaded = []
+    for index, seed_id, module_name, class_name in CHARACTERISTICS:
+        module = importlib.import_module(f"characteristics.{module_name}")
+        loaded.append((index, seed_id, getattr(module, class_name)))
+    return loaded
+
 # GATT Application Section
 class CasanodeService(dbus.service.Object):
     def __init__(self, bus, index, uuid_str, primary):
@@ -108,16 +127,31 @@ class CasanodeService(dbus.service.Object):
         self.uuid = uuid_str
         self.primary = primary
         self.characteristics = []
+        # Application to invalidate when the characteristic set changes
+        self.application = None
+        self._properties = None
         dbus.service.Object.__init__(self, bus, self.path)
 
+    def add_characteristic(self, characteristic):
+        characteristic.service = self
+        self.characteristics.append(characteristic)
+        self.invalidate()
+
+    def invalidate(self):
+        self._properties = None
+        if self.application is not None:
+            self.application.invalidate()
+
     def get_properties(self):
-        return {
-            "org.bluez.GattService1": {
-                "UUID": self.uuid,
-                "Primary": self.primary,
-                "Characteristics": dbus.Array([ch.get_path() for ch in self.characteristics], signature='o')
+        if self._properties is None:
+            self._properties = {
+                "org.bluez.GattService1": dbus.Dictionary({
+                    "UUID": self.uuid,
+                    "Primary": self.primary,
+                    "Characteristics": dbus.Array([ch.get_path() for ch in self.characteristics], signature='o')
+                }, signature="sv")
             }
-        }
+        return self._properties
 
     def get_path(self):
         return dbus.ObjectPath(self.path)
@@ -126,23 +160,38 @@ class Application(dbus.service.Object):
     """
     Implements org.freedesktop.DBus.ObjectManager so BlueZ
     can retrieve all GATT services and characteristics.
+    The object tree is built on the first GetManagedObjects() and kept
+    until a service or characteristic is added.
     """
     PATH = "/org/bluez/example"
     
     def __init__(self, bus):
         self.path = self.PATH
         self.services = []
+        self._managed_objects = None
         dbus.service.Object.__init__(self, bus, self.PATH)
 
-    @dbus.service.method("org.freedesktop.DBus.ObjectManager", out_signature="a{oa{sa{sv}}}")
-    def GetManagedObjects(self):
+    def add_service(self, service):
+        service.application = self
+        self.services.append(service)
+        self.invalidate()
+
+    def invalidate(self):
+        self._managed_objects = None
+
+    def build_managed_objects(self):
         response = {}
         for service in self.services:
             response[service.get_path()] = service.get_properties()
             for char in service.characteristics:
-                # Call get_properties() if defined in the characteristic
-                response[char.get_path()] = getattr(char, 'get_properties', lambda: {})()
-        return response
+                response[char.get_path()] = char.get_properties()
+        return dbus.Dictionary(response, signature="oa{sa{sv}}")
+
+    @dbus.service.method("org.freedesktop.DBus.ObjectManager", out_signature="a{oa{sa{sv}}}")
+    def GetManagedObjects(self):
+        if self._managed_objects is None:
+            self._managed_objects = self.build_managed_objects()
+        return self._managed_objects
 
 # --- Advertisement Section ---
 class Advertisement(dbus.service.Object):
@@ -225,7 +274,7 @@ def register_advertisement(bus, adapter):
     ad_manager.RegisterAdvertisement(
         advertisement.path,
         props,
-        reply_handler=lambda: logger.info("BLE advertising active."),
+        reply_handler=lambda: startup.mark("BLE advertising active"),
         error_handler=lambda error: logger.error(f"Advertising error: {error}")
     )
     return advertisement, ad_manager
@@ -292,146 +341,18 @@ def ensure_adapter_powered(
             raise RuntimeError("BlueZ plugins not ready in time")
         time.sleep(retry_delay)
 
-def register_app(bus, mainloop):
+def register_app(bus, mainloop, controller):
     # Create the main application
     app = Application(bus)
     cfg = get_config()
     service = CasanodeService(bus, 0, cfg['BLE_UUID'], True)
 
-    discovery = DiscoveryCharacteristic(bus, 5, cfg['BLE_DISCOVERY_UUID'])
-    discovery.service = service
-    service.characteristics.append(discovery)
-
-    nodeStatus = NodeStatusCharacteristic(bus, 6, generate_uuid_from_seed("node-status"))
-    nodeStatus.service = service
-    service.characteristics.append(nodeStatus)
-
-    moniker = MonikerCharacteristic(bus, 7, generate_uuid_from_seed("moniker"))
-    moniker.service = service
-    service.characteristics.append(moniker)
-
-    nodeType = NodeTypeCharacteristic(bus, 8, generate_uuid_from_seed("node-type"))
-    nodeType.service = service
-    service.characteristics.append(nodeType)
-
-    nodeIp = NodeIpCharacteristic(bus, 9, generate_uuid_from_seed("node-ip"))
-    nodeIp.service = service
-    service.characteristics.append(nodeIp)
-
-    nodePort = NodePortCharacteristic(bus, 10, generate_uuid_from_seed("node-port"))
-    nodePort.service = service
-    service.characteristics.append(nodePort)
-
-    vpnType = VpnTypeCharacteristic(bus, 11, generate_uuid_from_seed("vpn-type"))
-    vpnType.service = service
-    service.characteristics.append(vpnType)
-
-    vpnPort = VpnPortCharacteristic(bus, 12, generate_uuid_from_seed("vpn-port"))
-    vpnPort.service = service
-    service.characteristics.append(vpnPort)
-
-    maxPeers = MaxPeersCharacteristic(bus, 13, generate_uuid_from_seed("max-peers"))
-    maxPeers.service = service
-    service.characteristics.append(maxPeers)
-
-    nodeLocation = NodeLocationCharacteristic(bus, 14, generate_uuid_from_seed("node-location"))
-    nodeLocation.service = service
-    service.characteristics.append(nodeLocation)
-
-    certExpirity = CertExpirityCharacteristic(bus, 15, generate_uuid_from_seed("cert-expirity"))
-    certExpirity.service = service
-    service.characteristics.append(certExpirity)
-
-    onlineUsers = OnlineUsersCharacteristic(bus, 16, generate_uuid_from_seed("online-users"))
-    onlineUsers.service = service
-    service.characteristics.append(onlineUsers)
-
-    bandwidthSpeed = BandwidthSpeedCharacteristic(bus, 17, generate_uuid_from_seed("bandwidth-speed"))
-    bandwidthSpeed.service = service
-    service.characteristics.append(bandwidthSpeed)
-
-    systemUptime = SystemUptimeCharacteristic(bus, 18, generate_uuid_from_seed("system-uptime"))
-    systemUptime.service = service
-    service.characteristics.append(systemUptime)
-
-    casanodeVersion = CasanodeVersionCharacteristic(bus, 19, generate_uuid_from_seed("casanode-version"))
-    casanodeVersion.service = service
-    service.characteristics.append(casanodeVersion)
-
-    dockerImage = DockerImageCharacteristic(bus, 20, generate_uuid_from_seed("docker-image"))
-    dockerImage.service = service
-    service.characteristics.append(dockerImage)
-
-    installDockerImage = InstallDockerImageCharacteristic(bus, 21, generate_uuid_from_seed("install-docker-image"))
-    installDockerImage.service = service
-    service.characteristics.append(installDockerImage)
-
-    systemOs = SystemOsCharacteristic(bus, 22, generate_uuid_from_seed("system-os"))
-    systemOs.service = service
-    service.characteristics.append(systemOs)
-
-    systemArch = SystemArchCharacteristic(bus, 23, generate_uuid_from_seed("system-arch"))
-    systemArch.service = service
-    service.characteristics.append(systemArch)
-
-    systemKernel = SystemKernelCharacteristic(bus, 24, generate_uuid_from_seed("system-kernel"))
-    systemKernel.service = service
-    service.characteristics.append(systemKernel)
-
-    installConfigs = InstallConfigsCharacteristic(bus, 25, generate_uuid_from_seed("install-configs"))
-    installConfigs.service = service
-    service.characteristics.append(installConfigs)
-
-    walletActions = WalletActionsCharacteristic(bus, 26, generate_uuid_from_seed("wallet-actions"))
-    walletActions.service = service
-    service.characteristics.append(walletActions)
-    
-    nodeKeyringBackend = NodeKeyringBackendCharacteristic(bus, 27, generate_uuid_from_seed("node-keyring-backend"))
-    nodeKeyringBackend.service = service
-    service.characteristics.append(nodeKeyringBackend)
-
-    nodeAddress = NodeAddressCharacteristic(bus, 28, generate_uuid_from_seed("node-address"))
-    nodeAddress.service = service
-    service.characteristics.append(nodeAddress)
-    
-    nodeBalance = NodeBalanceCharacteristic(bus, 29, generate_uuid_from_seed("node-balance"))
-    nodeBalance.service = service
-    service.characteristics.append(nodeBalance)
-
-    nodeMnemonic = WalletMnemonicCharacteristic(bus, 30, generate_uuid_from_seed("wallet-mnemonic"))
-    nodeMnemonic.service = service
-    service.characteristics.append(nodeMnemonic)
-
-    publicAddress = WalletAddressCharacteristic(bus, 31, generate_uuid_from_seed("wallet-address"))
-    publicAddress.service = service
-    service.characteristics.append(publicAddress)
-
-    systemActions = SystemActionsCharacteristic(bus, 32, generate_uuid_from_seed("system-actions"))
-    systemActions.service = service
-    service.characteristics.append(systemActions)
-
-    nodePassphrase = WalletPassphraseCharacteristic(bus, 33, generate_uuid_from_seed("node-passphrase"))
-    nodePassphrase.service = service
-    service.characteristics.append(nodePassphrase)
-
-    checkPort = CheckPortCharacteristic(bus, 34, generate_uuid_from_seed("check-port"))
-    checkPort.service = service
-    service.characteristics.append(checkPort)
-
-    certificateActions = CertificateActionsCharacteristic(bus, 35, generate_uuid_from_seed("certificate-actions"))
-    certificateActions.service = service
-    service.characteristics.append(certificateActions)
-
-    nodeActions = NodeActionsCharacteristic(bus, 36, generate_uuid_from_seed("node-actions"))
-    nodeActions.service = service
-    service.characteristics.append(nodeActions)
-
-    checkInstallation = CheckInstallationCharacteristic(bus, 37, generate_uuid_from_seed("check-installation"))
-    checkInstallation.service = service
-    service.characteristics.append(checkInstallation)
+    for index, seed_id, char_class in load_characteristics():
+        char_uuid = cfg['BLE_DISCOVERY_UUID'] if seed_id is None else generate_uuid_from_seed(seed_id)
+        service.add_characteristic(char_class(bus, index, char_uuid))
 
     # Add the service to the application
-    app.services.append(service)
+    app.add_service(service)
     
     # Ensure the adapter is powered on
     ensure_adapter_powered(bus, "hci0")
@@ -441,29 +362,44 @@ def register_app(bus, mainloop):
     
     service_manager.RegisterApplication(
         app.path, dbus.Dictionary({}, signature="sv"),
-        reply_handler=lambda: logger.info("GATT application registered successfully"),
+        reply_handler=lambda: startup.mark("GATT application registered"),
         error_handler=lambda e: logger.error(f"GATT application registration error: {e}"),
     )
 
     # Register the BLE advertisement
     advertisement, ad_manager = register_advertisement(bus, "hci0")
 
-    # Handle CTRL+C signal for clean up
+    # Handle CTRL+C and systemd stop (SIGTERM) for clean up
     def signal_handler(sig, frame):
-        logger.info("Ctrl+C detected, unregistering BLE advertisement...")
+        logger.info(f"Signal {sig} received, unregistering BLE advertisement...")
         try:
             ad_manager.UnregisterAdvertisement(advertisement.path)
             logger.info("Advertisement unregistered.")
-            # You can disable system advertising and reset the interface if needed
-            subprocess.run(["sudo", "btmgmt", "advertising", "off"], check=False)
-            subprocess.run(["sudo", "hciconfig", "hci0", "reset"], check=False)
+            # Disable system advertising and reset the interface
+            for operation in (lambda: controller.set_advertising(False), controller.reset):
+                try:
+                    operation()
+                except ControllerError as e:
+                    logger.error(f"Controller cleanup failed: {e}")
             logger.info("Bluetooth interface reset.")
         except Exception as exc:
             logger.error(f"Error during cleanup: {exc}")
         finally:
+            node_history.save()
+            controller.close()
             mainloop.quit()
 
     signal.signal(signal.SIGINT, signal_handler)
+    signal.signal(signal.SIGTERM, signal_handler)
+
+    # Node API state changes are pushed from now on
+    events.start()
+    # Installation state: seeded once, then kept up to date in memory
+    installation.start()
+    # System load history (system-metrics characteristic)
+    system_sampler.start()
+    # Bandwidth and peer history (node-history characteristic), restored from STATE_DIR
+    node_history.start()
 
     logger.info("GATT server and BLE Advertisement active on Raspberry Pi.")
     mainloop.run()
@@ -472,15 +408,19 @@ def main():
     dbus.mainloop.glib.DBusGMainLoop(set_as_default=True)
     bus = dbus.SystemBus()
     
-    # configure controller (btmgmt)
-    configure_ble_controller()
+    # Loop-lag probe and systemd watchdog (fed during startup, then while the loop ticks)
+    watchdog.start()
+    
+    # configure controller (mgmt socket, btmgmt as fallback)
+    controller = get_controller("hci0", get_config().get("BLE_CONTROLLER_BACKEND", "auto"))
+    configure_ble_controller(controller)
     
     # disable pairing via D-Bus
     disable_pairing_via_dbus(bus, "hci0")
     
     # Then start the GATT server
     mainloop = GLib.MainLoop()
-    register_app(bus, mainloop)
+    register_app(bus, mainloop, controller)
 
 if __name__ == '__main__':
     main()
@@ -1,16 +1,21 @@
 #!/usr/bin/env python3
-import threading
+import argparse
+import sys
 from utils.config import get_config
-from utils import logger
-from gatt_server import main as run_gatt_server
+from utils import logger, startup
 
-def daemon_command():
+def daemon_command(profiling=False):
 	logger.info("Daemon process started.")
 	try:
 		# Load configuration
 		config = get_config()
 		logger.info(f"Configuration loaded: {config}")
 		
+		# Profiler and heap snapshots on SIGUSR1/SIGUSR2
+		if profiling or str(config.get('PROFILING', '')).lower() == 'true':
+			from utils import profiling as runtime_profiling
+			runtime_profiling.install()
+		
 		# Validate BLE configuration
 		ble_enabled_raw = config.get('BLE_ENABLED', '')
 		ble_enabled = str(ble_enabled_raw).lower() == 'true'
@@ -41,10 +46,25 @@ def daemon_command():
 			return
 		
 		# Start the BLE GATT server (this call is blocking)
+		startup.mark("configuration validated")
+		from gatt_server import main as run_gatt_server
 		run_gatt_server()
 		
 	except Exception as e:
 		logger.error(f"Unexpected error in daemon: {e}")
 
+def parse_args():
+	parser = argparse.ArgumentParser(description="Casanode BLE daemon")
+	parser.add_argument("--profile-imports", action="store_true",
+		help="Print the import-time profile of the GATT server modules and exit")
+	parser.add_argument("--top", type=int, default=20,
+		help="Number of modules listed by --profile-imports")
+	parser.add_argument("--profiling", action="store_true",
+		help="Profile on SIGUSR1 and take heap snapshots on SIGUSR2 (dumps in LOG_DIR)")
+	return parser.parse_args()
+
 if __name__ == '__main__':
-	daemon_command()
+	args = parse_args()
+	if args.profile_imports:
+		sys.exit(startup.print_import_profile(top=args.top))
+	daemon_command(profiling=args.profiling)
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+asyncio engine of the daemon.
+
+dbus-python dispatches D-Bus calls on the GLib main loop, one at a time.
+Characteristic handlers declared with @aio.method are coroutines: the call
+is accepted on the GLib loop, the coroutine runs on the asyncio loop (in its
+own thread) and the reply is sent from the GLib loop once it completes, so
+a slow handler no longer holds up the other characteristics.
+
+Blocking work (HTTP requests through APIClient's pooled session) is awaited
+with to_thread(), which runs it in a bounded executor inside the deadline
+budget of the D-Bus call.
+
+asyncio (several MB of RSS) is imported when the first coroutine runs, not
+when the characteristics are defined.
+"""
+import contextvars
+import inspect
+import threading
+import time
+from utils import config, deadline, logger, metrics
+
+_lock = threading.Lock()
+_loop = None
+_in_flight = 0
+# (monotonic deadline, owner) of the D-Bus call the current task serves
+_budget = contextvars.ContextVar("budget", default=None)
+
+def _workers():
+    return int(config.get_config().get("AIO_WORKERS", 8))
+
+def get_loop():
+    """
+    Returns the asyncio loop, started in a background thread on first use.
+    """
+    global _loop
+    with _lock:
+        if _loop is None:
+            import asyncio
+            from concurrent.futures import ThreadPoolExecutor
+            loop = asyncio.new_event_loop()
+            loop.set_default_executor(ThreadPoolExecutor(max_workers=_workers(), thread_name_prefix="aio"))
+            threading.Thread(target=loop.run_forever, name="aio", daemon=True).start()
+            _loop = loop
+    return _loop
+
+def submit(coroutine):
+    """
+    Schedules `coroutine` on the asyncio loop from any thread.
+    Returns a concurrent.futures.Future of its result.
+    """
+    import asyncio
+    return asyncio.run_coroutine_threadsafe(coroutine, get_loop())
+
+async def to_thread(function, *args, **kwargs):
+    """
+    Runs the blocking `function(*args, **kwargs)` in the executor, within the
+    deadline budget of the current D-Bus call if any.
+    """
+    import asyncio
+    current = _budget.get()
+
+    def call():
+        if current is None:
+            return function(*args, **kwargs)
+        with deadline.budget(max(current[0] - time.monotonic(), 0.0), owner=current[1]):
+            return function(*args, **kwargs)
+    return await asyncio.get_running_loop().run_in_executor(None, call)
+
+def _count_in_flight(delta):
+    global _in_flight
+    with _lock:
+        _in_flight += delta
+        metrics.set_gauge("aio.in_flight", _in_flight)
+
+def _reply(future, reply_handler, error_handler):
+    _count_in_flight(-1)
+    try:
+        reply_handler(future.result())
+    except Exception as e:
+        error_handler(e)
+    return False
+
+def method(interface, in_signature="", out_signature=""):
+    """
+    dbus.service.method for coroutine handlers:
+
+        @aio.method("org.bluez.GattCharacteristic1", in_signature="a{sv}", out_signature="ay")
+        async def ReadValue(self, options):
+            data = await self.api_client.get_json_cached_async("api/v1/status")
+            ...
+
+    The coroutine is cancelled when the deadline budget of the call expires,
+    and the call fails with org.bluez.Error.Failed.
+    """
+    import dbus
+    import dbus.service
+    from gi.repository import GLib
+
+    def decorator(coroutine_function):
+        def handler(self, *args, reply_handler, error_handler):
+            left = deadline.remaining()
+            expires_at = time.monotonic() + (deadline.DEFAULT_BUDGET if left is None else left)
+            owner = deadline.owner() or f"{type(self).__name__}.{coroutine_function.__name__}"
+
+            async def run():
+                import asyncio
+                _budget.set((expires_at, owner))
+                try:
+                    return await asyncio.wait_for(
+                        coroutine_function(self, *args),
+                        timeout=max(expires_at - time.monotonic(), 0.0),
+                    )
+                except asyncio.TimeoutError:
+                    metrics.increment("deadline.exceeded")
+                    metrics.increment(f"deadline.exceeded.{owner}")
+                    logger.error(f"Deadline budget exceeded in {owner}: coroutine cancelled")
+                    raise dbus.DBusException("org.bluez.Error.Failed")
+
+            metrics.increment("aio.calls")
+            _count_in_flight(1)
+            submit(run()).add_done_callback(
+                lambda future: GLib.idle_add(_reply, future, reply_handler, error_handler)
+            )
+
+        # dbus-python reads the argument names from the signature
+        parameters = list(inspect.signature(coroutine_function).parameters.values())
+        parameters += [
+            inspect.Parameter("reply_handler", inspect.Parameter.POSITIONAL_OR_KEYWORD),
+            inspect.Parameter("error_handler", inspect.Parameter.POSITIONAL_OR_KEYWORD),
+        ]
+        handler.__signature__ = inspect.Signature(parameters)
+        handler.__name__ = coroutine_function.__name__
+        handler.__qualname__ = coroutine_function.__qualname__
+        handler.__doc__ = coroutine_function.__doc__
+        return dbus.service.method(
+            interface,
+            in_signature=in_signature,
+            out_signature=out_signature,
+            async_callbacks=("reply_handler", "error_handler"),
+        )(handler)
+    return decorator
@@ -1,8 +1,13 @@
 #!/usr/bin/env python3
 import copy
-import requests
+import json
+import random
+import threading
+import time
 from urllib.parse import urljoin
-from utils import config, logger
+from utils import aio, config, logger, metrics, deadline
+from utils.cache import StaleWhileRevalidateCache
+from utils.circuit_breaker import CircuitBreaker
 from utils.network import get_local_ip_address
 
 def sanitize_kwargs(kwargs: dict) -> dict:
@@ -18,6 +23,20 @@ def sanitize_kwargs(kwargs: dict) -> dict:
             sanitized['json']['passphrase'] = "[CENSORED]"
     return sanitized
 
+# Cached GET paths made outdated by a successful write under a path prefix,
+# in addition to the written path itself
+INVALIDATED_BY_WRITE = {
+    "api/v1/wallet/": ["api/v1/wallet/address", "api/v1/node/address", "api/v1/node/balance"],
+    "api/v1/install/configuration": ["api/v1/node/configuration"],
+}
+
+# GET paths that trigger work or must reflect the current state: never answered
+# with an earlier response while the breaker is open
+NO_STALE_FALLBACK = (
+    "api/v1/check/",
+    "api/v1/node/balance",
+)
+
 class APIClient:
     _instance = None
     
@@ -43,15 +62,68 @@ class APIClient:
         # Define the CA certificate path
         certs_dir = self.config.get("CERTS_DIR")
         self.ca_cert = f"{certs_dir}/ca.crt"
+        
+        # Circuit breaker shared by all requests: while casanode.service is down,
+        # calls fail fast instead of waiting out their timeout.
+        self.breaker = CircuitBreaker(
+            "api",
+            failure_threshold=int(self.config.get("API_BREAKER_THRESHOLD", 3)),
+            probe_interval=float(self.config.get("API_BREAKER_PROBE_INTERVAL", 15)),
+        )
+        # Retries (with jittered backoff) for idempotent GET requests only
+        self.get_retries = int(self.config.get("API_GET_RETRIES", 2))
+        self.retry_backoff = 0.25
+        # Last successful GET response per path and its monotonic time, served
+        # while the breaker is open if younger than last_good_max_age
+        self._last_good = {}
+        self.last_good_max_age = float(self.config.get("API_CACHE_STALE_IF_ERROR", 3600))
+        self._last_good_lock = threading.Lock()
+        # Connection pool shared by all requests (see _get_session())
+        self._session = None
+        self._session_lock = threading.Lock()
+        self.pool_size = int(self.config.get("API_POOL_SIZE", 8))
+        # Parsed JSON of read-mostly GET endpoints (see get_json_cached())
+        self.cache = StaleWhileRevalidateCache(
+            "api",
+            ttl=float(self.config.get("API_CACHE_TTL", 5)),
+            max_stale=float(self.config.get("API_CACHE_MAX_STALE", 300)),
+            stale_if_error=float(self.config.get("API_CACHE_STALE_IF_ERROR", 3600)),
+        )
+    
+    def _get_session(self):
+        """
+        Returns the requests session, created on first use. Its connections
+        are kept alive, so that requests after the first skip the TCP and TLS
+        handshakes; up to `pool_size` requests can run at once.
+        """
+        with self._session_lock:
+            if self._session is None:
+                import requests
+                from requests.adapters import HTTPAdapter
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_size)
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                self._session = session
+            return self._session
     
     def _build_url(self, path=""):
         local_ip = get_local_ip_address() or "127.0.0.1"
         base_url = f"https://{local_ip}:{self.port}"
         return urljoin(base_url + "/", path)
     
-    def request(self, method, path="", hide_sensitive=False, **kwargs):
+    def request(self, method, path="", hide_sensitive=False, allow_stale=True, **kwargs):
+        """
+        Sends a request to the Node API. Returns the response, or None if the
+        API could not be reached or answered with an error status.
+        Raises deadline.DeadlineExceeded when the budget of the D-Bus call in
+        progress runs out before an answer.
+        """
+        # Imported on first request: requests is slow to import on small boards
+        import requests
         url = self._build_url(path.lstrip('/'))
         timeout = kwargs.pop("timeout", 10)
+        cache_key = (path.lstrip('/'), repr(kwargs.get("params")))
         
         # Retrieve a sanitized copy for logging.
         sanitized_kwargs = sanitize_kwargs(kwargs)
@@ -60,28 +132,229 @@ class APIClient:
             log_data = "[CENSORED]"
         else:
             log_data = sanitized_kwargs
+        
+        attempts = 1 + (self.get_retries if method == "GET" else 0)
+        for attempt in range(attempts):
+            # Inside a D-Bus handler, the request must end before the handler's deadline
+            attempt_timeout, clamped = deadline.clamp(timeout)
+            if clamped and attempt_timeout < deadline.MIN_REQUEST_TIME:
+                raise deadline.exceeded(f"{method} {url} not sent, budget exhausted")
+            
+            if not self.breaker.allow_request():
+                return self._fail_fast(method, url, cache_key, allow_stale)
+            
+            logger.info(f"request() -> {method} {url}, kwargs={log_data}, timeout={attempt_timeout}")
             
-        logger.info(f"request() -> {method} {url}, headers={self.headers} kwargs={log_data}, timeout={timeout}")
+            try:
+                response = self._get_session().request(
+                    method,
+                    url,
+                    headers=self.headers,
+                    verify=self.ca_cert,
+                    timeout=attempt_timeout,
+                    **kwargs
+                )
+            except requests.exceptions.Timeout as e:
+                if clamped:
+                    # Cut short by the handler's budget, not a sign that the API is down
+                    self.breaker.record_abandoned()
+                    raise deadline.exceeded(f"{method} {url} timed out after {attempt_timeout:.1f}s")
+                if not isinstance(e, requests.exceptions.ReadTimeout):
+                    # Connection timeouts are handled like other connection errors
+                    self.breaker.record_failure()
+                    metrics.increment("api.connection_errors")
+                    logger.error(f"Error during {method} request to {url}: {e}")
+                    if attempt + 1 < attempts:
+                        time.sleep(self._backoff(attempt))
+                        metrics.increment("api.retries")
+                        continue
+                    return None
+                # Read timeouts are not retried: the API is slow, retrying would only add to the wait
+                self.breaker.record_failure()
+                metrics.increment("api.timeouts")
+                logger.error(f"Error during {method} request to {url}: {e}")
+                return None
+            except requests.exceptions.ConnectionError as e:
+                # The API could not be reached: counts towards opening the breaker
+                self.breaker.record_failure()
+                metrics.increment("api.connection_errors")
+                logger.error(f"Error during {method} request to {url}: {e}")
+                if attempt + 1 < attempts:
+                    time.sleep(self._backoff(attempt))
+                    metrics.increment("api.retries")
+                    continue
+                return None
+            except requests.exceptions.RequestException as e:
+                self.breaker.record_failure()
+                logger.error(f"Error during {method} request to {url}: {e}")
+                return None
+            
+            # The API answered, even if with an error status
+            self.breaker.record_success()
+            logger.info(f"HTTP call done, status_code={response.status_code}")
+            try:
+                response.raise_for_status()
+            except requests.exceptions.HTTPError as e:
+                metrics.increment("api.http_errors")
+                logger.error(f"Error during {method} request to {url}: {e}")
+                return None
+            logger.info(f"{method} request to {url} succeeded with status {response.status_code}")
+            if method == "GET":
+                with self._last_good_lock:
+                    self._last_good[cache_key] = (response, time.monotonic())
+            else:
+                self._invalidate_after_write(path.lstrip('/'))
+            return response
+        return None
+    
+    def _invalidate_after_write(self, path):
+        """
+        A successful write makes the cached reads of the same resource outdated.
+        """
+        self.cache.invalidate(path)
+        for prefix, paths in INVALIDATED_BY_WRITE.items():
+            if path.startswith(prefix):
+                for cached_path in paths:
+                    self.cache.invalidate(cached_path)
+    
+    def _backoff(self, attempt):
+        """
+        Full jitter: a random delay up to the exponential backoff, within the handler's budget.
+        """
+        delay, _ = deadline.clamp(random.uniform(0, self.retry_backoff * (2 ** attempt)))
+        return delay
+    
+    def _fail_fast(self, method, url, cache_key, allow_stale=True):
+        """
+        Called when the circuit breaker rejects a request.
+        GET requests return the last successful response for the same path if
+        any, younger than last_good_max_age, unless `allow_stale` is False or
+        the path is in NO_STALE_FALLBACK; other requests return None.
+        """
+        status = self.breaker.status()
+        if method == "GET" and allow_stale and not cache_key[0].startswith(NO_STALE_FALLBACK):
+            with self._last_good_lock:
+                cached = self._last_good.get(cache_key)
+            age = time.monotonic() - cached[1] if cached is not None else None
+            if cached is not None and age < self.last_good_max_age:
+                metrics.increment("api.breaker.served_cached")
+                logger.info(f"{method} {url} skipped (API unavailable, breaker {status['state']}), serving response from {age:.0f}s ago")
+                return cached[0]
+        logger.error(f"{method} {url} skipped (API unavailable, breaker {status['state']}, retry in {status['retry_in']}s)")
+        return None
+    
+    def get(self, path="", params=None, timeout=10, hide_sensitive=False, allow_stale=True):
+        """
+        GET request. While the breaker is open, the last successful response
+        for the path may be returned instead (see _fail_fast()); `allow_stale`
+        False returns None then.
+        """
+        return self.request("GET", path, hide_sensitive=hide_sensitive, allow_stale=allow_stale, params=params, timeout=timeout)
+    
+    def get_json_cached(self, path, fresh=False, timeout=10):
+        """
+        Returns the decoded JSON body of a GET request, served from the
+        stale-while-revalidate cache. `fresh` bypasses the cached value
+        (but still falls back to it if the API cannot be reached).
+        Returns None if no value is available.
+        """
+        def load():
+            # Not the breaker's last response: it would be cached as a fresh value,
+            # the cache applies its own stale-if-error bound instead
+            response = self.get(path, timeout=timeout, allow_stale=False)
+            if response is None:
+                return None
+            try:
+                return response.json()
+            except ValueError as e:
+                logger.error(f"Invalid JSON from {path}: {e}")
+                return None
+        return self.cache.get(path.lstrip('/'), load, fresh=fresh)
+    
+    async def get_async(self, path="", params=None, timeout=10, hide_sensitive=False):
+        """
+        get() for coroutine handlers (see utils/aio.py).
+        """
+        return await aio.to_thread(self.get, path, params=params, timeout=timeout, hide_sensitive=hide_sensitive)
+    
+    async def get_json_cached_async(self, path, fresh=False, timeout=10):
+        """
+        get_json_cached() for coroutine handlers. A cache hit is served
+        without leaving the asyncio loop.
+        """
+        if not fresh:
+            data = self.cache.peek(path.lstrip('/'))
+            if data is not None:
+                return data
+        return await aio.to_thread(self.get_json_cached, path, fresh=fresh, timeout=timeout)
+    
+    def expire(self, path=None):
+        """
+        Forces the next cached read of `path` (or of every path) to query the API,
+        still falling back to the cached value if the API cannot be reached.
+        """
+        self.cache.expire(path.lstrip('/') if path is not None else None)
+    
+    def invalidate(self, path=None):
+        """
+        Forces the next cached read of `path` (or of every path) to query the API.
+        """
+        self.cache.invalidate(path.lstrip('/') if path is not None else None)
+    
+    def stream_json(self, method, path, on_event, idle_timeout=120, connect_timeout=10, **kwargs):
+        """
+        Sends a request answered with a stream of JSON lines (or Server-Sent
+        Events with JSON data) and calls `on_event(event)` for each one as it arrives.
+        There is no overall timeout: the request is only aborted after
+        `idle_timeout` seconds without data.
+        Returns True if the stream was read to its end, False otherwise.
+        """
+        import requests
         
+        url = self._build_url(path)
+        if not self.breaker.allow_request():
+            status = self.breaker.status()
+            logger.error(f"{method} {url} skipped (API unavailable, breaker {status['state']}, retry in {status['retry_in']}s)")
+            return False
+        
+        logger.info(f"stream_json() -> {method} {url}, idle_timeout={idle_timeout}")
         try:
-            response = requests.request(
+            with self._get_session().request(
                 method,
                 url,
                 headers=self.headers,
                 verify=self.ca_cert,
-                timeout=timeout,
+                timeout=(connect_timeout, idle_timeout),
+                stream=True,
                 **kwargs
-            )
-            logger.info(f"HTTP call done, status_code={response.status_code}")
-            response.raise_for_status()
-            logger.info(f"{method} request to {url} succeeded with status {response.status_code}")
-            return response
-        except requests.exceptions.RequestException as e:
+            ) as response:
+                self.breaker.record_success()
+                response.raise_for_status()
+                for line in response.iter_lines():
+                    if not line or line.startswith(b":"):
+                        continue
+                    # text/event-stream: only the data field carries the JSON
+                    if line.startswith(b"data:"):
+                        line = line[5:].strip()
+                    elif line.startswith((b"event:", b"id:", b"retry:")):
+                        continue
+                    try:
+                        event = json.loads(line)
+                    except ValueError:
+                        logger.error(f"Invalid JSON line from {url}: {line[:100]!r}")
+                        continue
+                    on_event(event)
+        except requests.exceptions.HTTPError as e:
+            metrics.increment("api.http_errors")
             logger.error(f"Error during {method} request to {url}: {e}")
-            return None
-    
-    def get(self, path="", params=None, timeout=10, hide_sensitive=False):
-        return self.request("GET", path, hide_sensitive=hide_sensitive, params=params, timeout=timeout)
+            return False
+        except requests.exceptions.RequestException as e:
+            self.breaker.record_failure()
+            metrics.increment("api.stream_errors")
+            logger.error(f"Error during {method} stream from {url}: {e}")
+            return False
+        logger.info(f"{method} stream from {url} completed")
+        return True
     
     def post(self, path="", data=None, json=None, timeout=10, hide_sensitive=False):
         return self.request("POST", path, hide_sensitive=hide_sensitive, data=data, json=json, timeout=timeout)
@@ -0,0 +1,299 @@
+#!/usr/bin/env python3
+"""
+Bluetooth controller configuration.
+
+The preferred backend talks to the kernel Bluetooth management interface
+(HCI_CHANNEL_CONTROL) directly from this process, which avoids spawning
+`sudo btmgmt` / `hciconfig` at startup and shutdown. It needs CAP_NET_ADMIN;
+when the socket cannot be opened or a command is rejected, the controller
+falls back to the original subprocess commands.
+"""
+import ctypes
+import ctypes.util
+import os
+import select
+import socket
+import struct
+import subprocess
+import time
+from utils import logger
+
+AF_BLUETOOTH = 31
+BTPROTO_HCI = 1
+HCI_CHANNEL_CONTROL = 3
+MGMT_INDEX_NONE = 0xFFFF
+
+# Management commands (see doc/mgmt-api.txt in the BlueZ sources)
+MGMT_OP_SET_POWERED = 0x0005
+MGMT_OP_SET_BONDABLE = 0x0009
+MGMT_OP_SET_ADVERTISING = 0x0029
+MGMT_OP_READ_DEF_SYSTEM_CONFIG = 0x004B
+MGMT_OP_SET_DEF_SYSTEM_CONFIG = 0x004C
+
+# Management events
+MGMT_EV_CMD_COMPLETE = 0x0001
+MGMT_EV_CMD_STATUS = 0x0002
+
+# Default system configuration TLV types for LE connection parameters
+MGMT_TLV_LE_MIN_CONN_INTERVAL = 0x0017
+MGMT_TLV_LE_MAX_CONN_INTERVAL = 0x0018
+MGMT_TLV_LE_CONN_LATENCY = 0x0019
+MGMT_TLV_LE_SUPERVISION_TIMEOUT = 0x001A
+
+MGMT_HEADER = struct.Struct("<HHH")
+
+class ControllerError(Exception):
+    """Raised when a controller command cannot be applied."""
+
+def adapter_index(adapter: str) -> int:
+    """
+    Convert an adapter name such as "hci0" to its controller index.
+    """
+    if adapter.startswith("hci") and adapter[3:].isdigit():
+        return int(adapter[3:])
+    raise ValueError(f"Invalid adapter name '{adapter}'")
+
+class ControllerBackend:
+    """
+    Interface implemented by every controller backend.
+    Connection parameters use controller units: intervals in 1.25 ms,
+    supervision timeout in 10 ms.
+    """
+    name = "base"
+
+    def set_bondable(self, enabled: bool) -> None:
+        raise NotImplementedError
+
+    def set_connection_parameters(self, min_interval: int, max_interval: int, latency: int, timeout: int) -> None:
+        raise NotImplementedError
+
+    def set_advertising(self, enabled: bool) -> None:
+        raise NotImplementedError
+
+    def reset(self) -> None:
+        raise NotImplementedError
+
+    def close(self) -> None:
+        pass
+
+class MgmtSocketBackend(ControllerBackend):
+    """
+    Minimal in-process client for the kernel management socket.
+    """
+    name = "mgmt"
+
+    def __init__(self, adapter="hci0", timeout=2.0):
+        self.index = adapter_index(adapter)
+        self.timeout = timeout
+        self._sock = None
+
+    def _open(self):
+        if self._sock is not None:
+            return self._sock
+        # Python's socket module cannot bind an HCI socket to a channel,
+        # so the socket is created and bound through libc.
+        libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        fd = libc.socket(AF_BLUETOOTH, socket.SOCK_RAW | socket.SOCK_CLOEXEC, BTPROTO_HCI)
+        if fd < 0:
+            err = ctypes.get_errno()
+            raise ControllerError(f"mgmt socket() failed: {os.strerror(err)}")
+        addr = struct.pack("<HHH", AF_BLUETOOTH, MGMT_INDEX_NONE, HCI_CHANNEL_CONTROL)
+        if libc.bind(fd, ctypes.c_char_p(addr), len(addr)) < 0:
+            err = ctypes.get_errno()
+            os.close(fd)
+            raise ControllerError(f"mgmt bind() failed: {os.strerror(err)}")
+        self._sock = socket.socket(fileno=fd)
+        return self._sock
+
+    def close(self):
+        if self._sock is not None:
+            self._sock.close()
+            self._sock = None
+
+    def _command(self, opcode: int, params: bytes = b"") -> bytes:
+        """
+        Send a command and wait for its Command Complete / Command Status event.
+        Returns the command return parameters.
+        """
+        sock = self._open()
+        try:
+            sock.send(MGMT_HEADER.pack(opcode, self.index, len(params)) + params)
+        except OSError as e:
+            raise ControllerError(f"mgmt command 0x{opcode:04x} send failed: {e}") from e
+
+        deadline = time.monotonic() + self.timeout
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise ControllerError(f"mgmt command 0x{opcode:04x} timed out")
+            readable, _, _ = select.select([sock], [], [], remaining)
+            if not readable:
+                continue
+            packet = sock.recv(512)
+            if len(packet) < MGMT_HEADER.size + 3:
+                continue
+            event, index, _length = MGMT_HEADER.unpack_from(packet)
+            if event not in (MGMT_EV_CMD_COMPLETE, MGMT_EV_CMD_STATUS) or index != self.index:
+                # Unrelated event broadcast on the control channel
+                continue
+            ev_opcode, status = struct.unpack_from("<HB", packet, MGMT_HEADER.size)
+            if ev_opcode != opcode:
+                continue
+            if status != 0:
+                raise ControllerError(f"mgmt command 0x{opcode:04x} failed with status 0x{status:02x}")
+            return packet[MGMT_HEADER.size + 3:]
+
+    def set_bondable(self, enabled):
+        self._command(MGMT_OP_SET_BONDABLE, struct.pack("<B", 1 if enabled else 0))
+
+    def set_connection_parameters(self, min_interval, max_interval, latency, timeout):
+        tlvs = b"".join(
+            struct.pack("<HBH", tlv_type, 2, value)
+            for tlv_type, value in (
+                (MGMT_TLV_LE_MIN_CONN_INTERVAL, min_interval),
+                (MGMT_TLV_LE_MAX_CONN_INTERVAL, max_interval),
+                (MGMT_TLV_LE_CONN_LATENCY, latency),
+                (MGMT_TLV_LE_SUPERVISION_TIMEOUT, timeout),
+            )
+        )
+        self._command(MGMT_OP_SET_DEF_SYSTEM_CONFIG, tlvs)
+
+    def set_advertising(self, enabled):
+        self._command(MGMT_OP_SET_ADVERTISING, struct.pack("<B", 1 if enabled else 0))
+
+    def reset(self):
+        # A power cycle is the management-interface equivalent of `hciconfig reset`
+        self._command(MGMT_OP_SET_POWERED, struct.pack("<B", 0))
+        self._command(MGMT_OP_SET_POWERED, struct.pack("<B", 1))
+
+class BtmgmtSubprocessBackend(ControllerBackend):
+    """
+    Original implementation based on the btmgmt / hciconfig command line tools.
+    `sudo -n` makes the commands fail instead of hanging on a password prompt.
+    """
+    name = "btmgmt"
+
+    def __init__(self, adapter="hci0"):
+        self.adapter = adapter
+        self.index = adapter_index(adapter)
+
+    def _run(self, argv, script=None):
+        try:
+            subprocess.run(
+                ["sudo", "-n"] + argv,
+                input=script,
+                text=True,
+                check=True,
+                capture_output=True,
+            )
+        except (OSError, subprocess.CalledProcessError) as e:
+            stderr = getattr(e, "stderr", None)
+            raise ControllerError(f"{' '.join(argv)} failed: {stderr.strip() if stderr else e}") from e
+
+    def _run_script(self, lines):
+        script = "\n".join(lines + ["exit"]) + "\n"
+        self._run(["btmgmt", "--index", str(self.index)], script=script)
+
+    def set_bondable(self, enabled):
+        self._run_script([f"bondable {'on' if enabled else 'off'}"])
+
+    def set_connection_parameters(self, min_interval, max_interval, latency, timeout):
+        self._run_script([
+            "menu le",
+            f"connection-parameters {min_interval} {max_interval} {latency} {timeout}",
+            "back",
+        ])
+
+    def set_advertising(self, enabled):
+        self._run(["btmgmt", "--index", str(self.index), "advertising", "on" if enabled else "off"])
+
+    def reset(self):
+        self._run(["hciconfig", self.adapter, "reset"])
+
+class FakeControllerBackend(ControllerBackend):
+    """
+    In-memory backend used by tests and dry runs.
+    Records every call; operations listed in `failing` raise ControllerError.
+    """
+    name = "fake"
+
+    def __init__(self, adapter="hci0", failing=()):
+        self.adapter = adapter
+        self.failing = set(failing)
+        self.calls = []
+        self.state = {}
+
+    def _record(self, operation, *args):
+        self.calls.append((operation,) + args)
+        if operation in self.failing:
+            raise ControllerError(f"fake failure for '{operation}'")
+
+    def set_bondable(self, enabled):
+        self._record("set_bondable", enabled)
+        self.state["bondable"] = enabled
+
+    def set_connection_parameters(self, min_interval, max_interval, latency, timeout):
+        self._record("set_connection_parameters", min_interval, max_interval, latency, timeout)
+        self.state["connection_parameters"] = (min_interval, max_interval, latency, timeout)
+
+    def set_advertising(self, enabled):
+        self._record("set_advertising", enabled)
+        self.state["advertising"] = enabled
+
+    def reset(self):
+        self._record("reset")
+        self.state["resets"] = self.state.get("resets", 0) + 1
+
+class ControllerConfigurator:
+    """
+    Applies controller settings through a primary backend, falling back to
+    a secondary backend for any operation the primary one rejects.
+    """
+
+    def __init__(self, primary: ControllerBackend, fallback: ControllerBackend = None):
+        self.primary = primary
+        self.fallback = fallback
+
+    def _apply(self, operation, *args):
+        try:
+            getattr(self.primary, operation)(*args)
+            return self.primary.name
+        except ControllerError as e:
+            if self.fallback is None:
+                raise
+            logger.warning(f"Controller {operation} via {self.primary.name} failed ({e}), falling back to {self.fallback.name}")
+        getattr(self.fallback, operation)(*args)
+        return self.fallback.name
+
+    def set_bondable(self, enabled):
+        return self._apply("set_bondable", enabled)
+
+    def set_connection_parameters(self, min_interval, max_interval, latency, timeout):
+        return self._apply("set_connection_parameters", min_interval, max_interval, latency, timeout)
+
+    def set_advertising(self, enabled):
+        return self._apply("set_advertising", enabled)
+
+    def reset(self):
+        return self._apply("reset")
+
+    def close(self):
+        self.primary.close()
+        if self.fallback is not None:
+            self.fallback.close()
+
+def get_controller(adapter="hci0", backend="auto") -> ControllerConfigurator:
+    """
+    Build the controller configurator for the given backend name:
+      - "auto": management socket with btmgmt fallback
+      - "mgmt": management socket only
+      - "btmgmt": subprocess commands only
+      - "fake": in-memory backend
+    """
+    if backend == "mgmt":
+        return ControllerConfigurator(MgmtSocketBackend(adapter))
+    if backend == "btmgmt":
+        return ControllerConfigurator(BtmgmtSubprocessBackend(adapter))
+    if backend == "fake":
+        return ControllerConfigurator(FakeControllerBackend(adapter))
+    return ControllerConfigurator(MgmtSocketBackend(adapter), BtmgmtSubprocessBackend(adapter))
@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Stale-while-revalidate cache for values loaded from the Node API.
+
+Each entry is served according to its age:
+
+- younger than `ttl`: served as is;
+- younger than `max_stale`: served immediately while a single background
+  refresh replaces it;
+- older than `max_stale` (or missing, or expired by expire()): loaded
+  synchronously. If that load fails, an entry younger than `stale_if_error`
+  is served rather than an error.
+"""
+import threading
+import time
+from utils import logger, metrics
+
+class StaleWhileRevalidateCache:
+    def __init__(self, name, ttl=5.0, max_stale=300.0, stale_if_error=3600.0):
+        self.name = name
+        self.ttl = ttl
+        self.max_stale = max_stale
+        self.stale_if_error = stale_if_error
+        self._lock = threading.Lock()
+        # key -> (value, monotonic time it was loaded)
+        self._entries = {}
+        self._refreshing = set()
+        # Keys whose next read must query the API (see expire())
+        self._expired = set()
+        # Bumped on invalidation so that a refresh started before it is discarded
+        self._generation = {}
+        # key -> ttl overriding the default one (see set_ttl())
+        self._ttl = {}
+
+    def get(self, key, loader, fresh=False):
+        """
+        Returns the value for `key`, calling `loader()` to (re)load it.
+        The loader returns None when the value could not be loaded; if it
+        raises, the exception propagates unless a value within stale_if_error
+        can be served.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            fresh = fresh or key in self._expired
+            ttl = self._ttl.get(key, self.ttl)
+        age = time.monotonic() - entry[1] if entry is not None else None
+
+        if entry is not None and not fresh:
+            if age < ttl:
+                metrics.increment(f"{self.name}.cache.hit")
+                return entry[0]
+            if age < self.max_stale:
+                metrics.increment(f"{self.name}.cache.stale")
+                self._refresh_in_background(key, loader)
+                return entry[0]
+
+        metrics.increment(f"{self.name}.cache.miss")
+        try:
+            value = self._load(key, loader)
+        except Exception:
+            # e.g. deadline.DeadlineExceeded: a value within stale_if_error still answers
+            if entry is None or age >= self.stale_if_error:
+                raise
+            value = None
+        if value is not None:
+            return value
+        if entry is not None and age < self.stale_if_error:
+            metrics.increment(f"{self.name}.cache.stale_if_error")
+            logger.info(f"Cache[{self.name}]: {key} unavailable, serving value from {age:.0f}s ago")
+            return entry[0]
+        return None
+
+    def peek(self, key):
+        """
+        Returns the value for `key` if it can be served as is (younger than the
+        ttl and not expired), None otherwise. Never loads.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or key in self._expired:
+                return None
+            if time.monotonic() - entry[1] >= self._ttl.get(key, self.ttl):
+                return None
+        metrics.increment(f"{self.name}.cache.hit")
+        return entry[0]
+
+    def set_ttl(self, key, ttl):
+        """
+        Overrides the ttl of `key`, or restores the default one when `ttl` is None.
+        """
+        with self._lock:
+            if ttl is None:
+                self._ttl.pop(key, None)
+            else:
+                self._ttl[key] = ttl
+
+    def invalidate(self, key=None):
+        """
+        Drops `key`, or every entry when `key` is None, so that the next read loads it again.
+        """
+        with self._lock:
+            keys = list(self._entries) if key is None else [key]
+            for k in keys:
+                self._entries.pop(k, None)
+                self._expired.discard(k)
+                self._generation[k] = self._generation.get(k, 0) + 1
+
+    def expire(self, key=None):
+        """
+        Forces the next read of `key` (or of every entry) to load the value,
+        keeping the current one as a fallback if the load fails.
+        """
+        with self._lock:
+            self._expired.update(self._entries if key is None else [key])
+
+    def keys(self):
+        with self._lock:
+            return list(self._entries)
+
+    def ages(self) -> dict:
+        """
+        Returns the age in seconds of every entry.
+        """
+        now = time.monotonic()
+        with self._lock:
+            return {key: round(now - loaded_at, 1) for key, (_, loaded_at) in self._entries.items()}
+
+    def _load(self, key, loader):
+        with self._lock:
+            generation = self._generation.get(key, 0)
+        value = loader()
+        if value is not None:
+            with self._lock:
+                # An invalidation during the load means the value may predate a write
+                if self._generation.get(key, 0) == generation:
+                    self._entries[key] = (value, time.monotonic())
+                    self._expired.discard(key)
+        return value
+
+    def _refresh_in_background(self, key, loader):
+        with self._lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+
+        def refresh():
+            try:
+                if self._load(key, loader) is None:
+                    metrics.increment(f"{self.name}.cache.refresh_failed")
+            except Exception as e:
+                logger.error(f"Cache[{self.name}]: background refresh of {key} failed: {e}")
+            finally:
+                with self._lock:
+                    self._refreshing.discard(key)
+
+        threading.Thread(target=refresh, daemon=True).start()
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+import threading
+import time
+from utils import logger, metrics
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker.
+
+    - closed: requests go through; `failure_threshold` consecutive failures open it.
+    - open: requests are rejected until `probe_interval` seconds have passed.
+    - half_open: a single probe request is let through; success closes the
+      breaker, failure opens it again for another probe interval.
+    """
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    STATE_CODES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+    def __init__(self, name, failure_threshold=3, probe_interval=15.0):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.probe_interval = probe_interval
+        self._lock = threading.Lock()
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self._report()
+
+    def _report(self):
+        metrics.set_gauge(f"{self.name}.breaker.state", self.STATE_CODES[self._state])
+        metrics.set_gauge(f"{self.name}.breaker.failures", self._failures)
+
+    def _transition(self, state):
+        if state != self._state:
+            logger.info(f"CircuitBreaker[{self.name}]: {self._state} -> {state}")
+            self._state = state
+            if state == self.OPEN:
+                self._opened_at = time.monotonic()
+                metrics.increment(f"{self.name}.breaker.opened")
+        self._report()
+
+    def allow_request(self) -> bool:
+        """
+        Returns True if a request may be sent now.
+        In half-open state only one probe is allowed at a time.
+        """
+        with self._lock:
+            if self._state == self.CLOSED:
+                return True
+            if self._state == self.OPEN:
+                if time.monotonic() - self._opened_at < self.probe_interval:
+                    metrics.increment(f"{self.name}.breaker.rejected")
+                    return False
+                self._transition(self.HALF_OPEN)
+            if self._probe_in_flight:
+                metrics.increment(f"{self.name}.breaker.rejected")
+                return False
+            self._probe_in_flight = True
+            return True
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._probe_in_flight = False
+            self._transition(self.CLOSED)
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            self._probe_in_flight = False
+            if self._state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                self._transition(self.OPEN)
+            else:
+                self._report()
+
+    def record_abandoned(self):
+        """
+        The request was given up by the caller before the API answered:
+        neither a success nor a failure, but a half-open probe slot is released.
+        """
+        with self._lock:
+            self._probe_in_flight = False
+
+    def status(self) -> dict:
+        """
+        Returns the breaker state, the consecutive failure count and the
+        number of seconds before the next probe (0 when not open).
+        """
+        with self._lock:
+            retry_in = 0.0
+            if self._state == self.OPEN:
+                retry_in = max(0.0, self.probe_interval - (time.monotonic() - self._opened_at))
+            return {
+                "state": self._state,
+                "failures": self._failures,
+                "retry_in": round(retry_in, 1),
+            }
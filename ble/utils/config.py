@@ -1,33 +1,75 @@
 #!/usr/bin/env python3
 import os
 import pathlib
-import dotenv
 import uuid
 
 CONFIG_FILE = '/etc/casanode.conf'
 
-# Load configuration from file if it exists; otherwise, use default values.
-if pathlib.Path(CONFIG_FILE).exists():
-    dotenv.load_dotenv(CONFIG_FILE)
-else:
-    print(f"Configuration file {CONFIG_FILE} not found. Using default values.")
+# The configuration is loaded on first use so that importing this module
+# does not touch the filesystem (see get_config()).
+config = None
 
-config = {
-    'BLENO_DEVICE_NAME': os.getenv('BLENO_DEVICE_NAME', 'Casanode'),
-    'DOCKER_IMAGE_NAME': os.getenv('DOCKER_IMAGE_NAME', 'wajatmaka/sentinel-aarch64-alpine:v0.7.1'),
-    'DOCKER_CONTAINER_NAME': os.getenv('DOCKER_CONTAINER_NAME', 'sentinel-dvpn-node'),
-    'CONFIG_DIR': os.getenv('CONFIG_DIR', os.path.join(os.environ.get('HOME', '/opt/casanode'), '.sentinelnode')),
-    'LOG_DIR': os.getenv('LOG_DIR', '/var/log/casanode'),
-    'CERTS_DIR': os.getenv('CERTS_DIR', '/opt/casanode/app/certs'),
-    'DOCKER_SOCKET': os.getenv('DOCKER_SOCKET', f"/run/user/{os.getuid()}/docker.sock"),
-    'BLE_ENABLED': os.getenv('BLE_ENABLED', 'true'),
-    'BLE_UUID': os.getenv('BLE_UUID', '00001820-0000-1000-8000-00805f9b34fb'),
-    'BLE_DISCOVERY_UUID': os.getenv('BLE_DISCOVERY_UUID', '0000a2d4-0000-1000-8000-00805f9b34fb'),
-    'BLE_CHARACTERISTIC_SEED': os.getenv('BLE_CHARACTERISTIC_SEED', str(uuid.uuid4())),
-    'WEB_LISTEN': os.getenv('WEB_LISTEN', '0.0.0.0:8080'),
-    'API_LISTEN': os.getenv('API_LISTEN', '0.0.0.0:8081'),
-    'API_AUTH': os.getenv('API_AUTH', str(uuid.uuid4())),
-}
+def load_config():
+    # Load configuration from file if it exists; otherwise, use default values.
+    if pathlib.Path(CONFIG_FILE).exists():
+        import dotenv
+        dotenv.load_dotenv(CONFIG_FILE)
+    else:
+        print(f"Configuration file {CONFIG_FILE} not found. Using default values.")
+
+    return {
+        'BLENO_DEVICE_NAME': os.getenv('BLENO_DEVICE_NAME', 'Casanode'),
+        'DOCKER_IMAGE_NAME': os.getenv('DOCKER_IMAGE_NAME', 'wajatmaka/sentinel-aarch64-alpine:v0.7.1'),
+        'DOCKER_CONTAINER_NAME': os.getenv('DOCKER_CONTAINER_NAME', 'sentinel-dvpn-node'),
+        'CONFIG_DIR': os.getenv('CONFIG_DIR', os.path.join(os.environ.get('HOME', '/opt/casanode'), '.sentinelnode')),
+        'LOG_DIR': os.getenv('LOG_DIR', '/var/log/casanode'),
+        'STATE_DIR': os.getenv('STATE_DIR', '/var/lib/casanode-ble'),
+        'CERTS_DIR': os.getenv('CERTS_DIR', '/opt/casanode/app/certs'),
+        'DOCKER_SOCKET': os.getenv('DOCKER_SOCKET', f"/run/user/{os.getuid()}/docker.sock"),
+        'BLE_ENABLED': os.getenv('BLE_ENABLED', 'true'),
+        'BLE_UUID': os.getenv('BLE_UUID', '00001820-0000-1000-8000-00805f9b34fb'),
+        'BLE_DISCOVERY_UUID': os.getenv('BLE_DISCOVERY_UUID', '0000a2d4-0000-1000-8000-00805f9b34fb'),
+        'BLE_CHARACTERISTIC_SEED': os.getenv('BLE_CHARACTERISTIC_SEED', str(uuid.uuid4())),
+        'BLE_CONTROLLER_BACKEND': os.getenv('BLE_CONTROLLER_BACKEND', 'auto'),
+        'WEB_LISTEN': os.getenv('WEB_LISTEN', '0.0.0.0:8080'),
+        'API_LISTEN': os.getenv('API_LISTEN', '0.0.0.0:8081'),
+        'API_AUTH': os.getenv('API_AUTH', str(uuid.uuid4())),
+        'API_BREAKER_THRESHOLD': os.getenv('API_BREAKER_THRESHOLD', '3'),
+        'API_BREAKER_PROBE_INTERVAL': os.getenv('API_BREAKER_PROBE_INTERVAL', '15'),
+        'API_GET_RETRIES': os.getenv('API_GET_RETRIES', '2'),
+        'API_CACHE_TTL': os.getenv('API_CACHE_TTL', '5'),
+        'API_CACHE_MAX_STALE': os.getenv('API_CACHE_MAX_STALE', '300'),
+        'API_CACHE_STALE_IF_ERROR': os.getenv('API_CACHE_STALE_IF_ERROR', '3600'),
+        'CASANODE_VERSION': os.getenv('CASANODE_VERSION', ''),
+        'FACTS_REFRESH_INTERVAL': os.getenv('FACTS_REFRESH_INTERVAL', '300'),
+        'CONFIG_WRITE_WINDOW': os.getenv('CONFIG_WRITE_WINDOW', '0.5'),
+        'DNS_RESOLVE_TIMEOUT': os.getenv('DNS_RESOLVE_TIMEOUT', '3'),
+        'DNS_POSITIVE_TTL': os.getenv('DNS_POSITIVE_TTL', '300'),
+        'DNS_NEGATIVE_TTL': os.getenv('DNS_NEGATIVE_TTL', '30'),
+        'JOB_NOTIFY_INTERVAL': os.getenv('JOB_NOTIFY_INTERVAL', '0.5'),
+        'NOTIFY_RATE': os.getenv('NOTIFY_RATE', '10'),
+        'NOTIFY_BURST': os.getenv('NOTIFY_BURST', '5'),
+        'EVENTS_CACHE_TTL': os.getenv('EVENTS_CACHE_TTL', '300'),
+        'AIO_WORKERS': os.getenv('AIO_WORKERS', '8'),
+        'API_POOL_SIZE': os.getenv('API_POOL_SIZE', '8'),
+        'PROFILING': os.getenv('PROFILING', 'false'),
+        'PROFILING_INTERVAL': os.getenv('PROFILING_INTERVAL', '0.01'),
+        'LOOP_LAG_INTERVAL': os.getenv('LOOP_LAG_INTERVAL', '0.5'),
+        'LOOP_LAG_THRESHOLD': os.getenv('LOOP_LAG_THRESHOLD', '0.25'),
+        'LOOP_STALL_TIMEOUT': os.getenv('LOOP_STALL_TIMEOUT', '10'),
+        'BALANCE_CACHE_TTL': os.getenv('BALANCE_CACHE_TTL', '60'),
+        'BALANCE_REFRESH_INTERVAL': os.getenv('BALANCE_REFRESH_INTERVAL', '60'),
+        'PORT_CHECK_TTL': os.getenv('PORT_CHECK_TTL', '60'),
+        'INSTALLATION_VERIFY_INTERVAL': os.getenv('INSTALLATION_VERIFY_INTERVAL', '300'),
+        'LOG_BUFFER_BYTES': os.getenv('LOG_BUFFER_BYTES', '262144'),
+        'LOG_TAIL_MAX_BYTES': os.getenv('LOG_TAIL_MAX_BYTES', '65536'),
+        'SYSTEM_SAMPLE_INTERVAL': os.getenv('SYSTEM_SAMPLE_INTERVAL', '1'),
+        'NODE_HISTORY_INTERVAL': os.getenv('NODE_HISTORY_INTERVAL', '10'),
+        'NODE_HISTORY_SAVE_INTERVAL': os.getenv('NODE_HISTORY_SAVE_INTERVAL', '600'),
+    }
 
 def get_config():
+    global config
+    if config is None:
+        config = load_config()
     return config
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Coalescing writer for the node configuration.
+
+Fields written within CONFIG_WRITE_WINDOW seconds of each other are merged
+into a single PUT api/v1/node/configuration. Writes are acknowledged at once:
+until the PUT completes, read_configuration() returns the cached configuration
+with the unconfirmed fields applied. When the PUT completes, the callback of
+every merged write is called with the result; on failure the cached
+configuration is expired so that the next read shows the actual values.
+
+commit() sends a set of fields as a PUT of their own (the configuration
+transaction), after the pending writes.
+"""
+import threading
+from utils import config, logger, metrics, port_check
+from utils.api import APIClient
+
+CONFIG_PATH = "api/v1/node/configuration"
+# A vpnType change regenerates the VPN configuration on the Node side
+PUT_TIMEOUT = 60
+
+_lock = threading.Lock()
+# Only one PUT at a time, so that merged writes are applied in order
+_flush_lock = threading.Lock()
+_pending = {}
+_callbacks = []
+_timer = None
+# Fields written but not confirmed by the API yet (pending or in flight)
+_unconfirmed = {}
+
+def _window():
+    return float(config.get_config().get("CONFIG_WRITE_WINDOW", 0.5))
+
+def submit(fields: dict, on_done=None):
+    """
+    Queue validated configuration fields for the next PUT.
+    `on_done(success, fields)` is called from the writer thread once the PUT
+    carrying them completes.
+    """
+    global _timer
+    with _lock:
+        _pending.update(fields)
+        _unconfirmed.update(fields)
+        if on_done is not None:
+            _callbacks.append((on_done, dict(fields)))
+        metrics.increment("config_writer.writes")
+        if _timer is not None:
+            metrics.increment("config_writer.coalesced")
+            return
+        _timer = threading.Timer(_window(), _flush)
+        _timer.daemon = True
+        _timer.start()
+
+def commit(fields: dict, on_done):
+    """
+    Sends `fields` at once in a PUT of their own: the pending writes are sent
+    first, in their own PUT, so that the result of this one is only theirs.
+    `on_done(success, fields)` is called from the writer thread.
+    """
+    global _timer
+    with _lock:
+        _unconfirmed.update(fields)
+        if _timer is not None:
+            _timer.cancel()
+            _timer = None
+    metrics.increment("config_writer.commits")
+
+    def run():
+        with _flush_lock:
+            results = [_send_pending(), _send(dict(fields), [(on_done, dict(fields))])]
+        for success, callbacks in results:
+            _call(callbacks, success)
+
+    threading.Thread(target=run, name="config-commit", daemon=True).start()
+
+def read_configuration(fresh=False):
+    """
+    Returns the node configuration with the unconfirmed writes applied,
+    or None if it is not available.
+    """
+    data = APIClient().get_json_cached(CONFIG_PATH, fresh=fresh)
+    if data is None:
+        return None
+    with _lock:
+        if not _unconfirmed:
+            return data
+        merged = dict(data)
+        merged.update(_unconfirmed)
+    return merged
+
+def _flush():
+    with _flush_lock:
+        success, callbacks = _send_pending()
+    _call(callbacks, success)
+
+def _send_pending():
+    """
+    Sends the pending writes (_flush_lock held). Returns (success, callbacks).
+    """
+    global _timer
+    with _lock:
+        _timer = None
+        batch = dict(_pending)
+        callbacks = list(_callbacks)
+        _pending.clear()
+        _callbacks.clear()
+    if not batch:
+        return True, []
+    return _send(batch, callbacks)
+
+def _send(batch, callbacks):
+    """
+    PUTs `batch` (_flush_lock held). Returns (success, callbacks).
+    """
+    api_client = APIClient()
+    try:
+        response = api_client.put(CONFIG_PATH, json=batch, timeout=PUT_TIMEOUT)
+        success = response is not None and response.status_code == 200
+    except Exception as e:
+        logger.error(f"Configuration write failed: {e}")
+        success = False
+
+    with _lock:
+        for field, value in batch.items():
+            # A newer write of the same field stays unconfirmed
+            if _unconfirmed.get(field) == value:
+                del _unconfirmed[field]
+    if success:
+        metrics.increment("config_writer.puts")
+        logger.info(f"Configuration updated: {', '.join(batch)}")
+        # A port check of the previous port says nothing about the new one
+        port_check.invalidate_fields(batch)
+    else:
+        metrics.increment("config_writer.failed")
+        logger.error(f"Failed to update configuration fields: {', '.join(batch)}")
+        # The optimistic values were wrong: read the actual ones next time
+        api_client.expire(CONFIG_PATH)
+    return success, callbacks
+
+def _call(callbacks, success):
+    for on_done, fields in callbacks:
+        try:
+            on_done(success, fields)
+        except Exception as e:
+            logger.error(f"Configuration write callback failed: {e}")
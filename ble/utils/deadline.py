@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Per-handler deadline budgets.
+
+BLE centrals abort an ATT request after about 30 seconds. Each D-Bus handler
+runs inside a budget (see BaseCharacteristic.DEADLINE) and APIClient clamps
+its timeouts to the remaining time, so a handler always answers before the
+central gives up on the link. When the budget runs out, APIClient raises
+DeadlineExceeded, and the call fails with org.bluez.Error.Failed
+("deadline exceeded: ..."), distinct from the values reported on API errors.
+
+The budget is thread-local: work started in background threads is not bounded.
+"""
+import threading
+import time
+from contextlib import contextmanager
+from utils import logger, metrics
+
+ATT_TRANSACTION_TIMEOUT = 30.0
+DEFAULT_BUDGET = 25.0
+# Below this many seconds a request is not worth starting
+MIN_REQUEST_TIME = 0.5
+
+_local = threading.local()
+
+class DeadlineExceeded(Exception):
+    """
+    Raised when the budget of the current D-Bus call runs out.
+    """
+    # dbus-python replies to the call with this error name and the message
+    _dbus_error_name = "org.bluez.Error.Failed"
+
+    def __init__(self, reason):
+        super().__init__(f"deadline exceeded: {reason}")
+
+@contextmanager
+def budget(seconds: float, owner: str = ""):
+    """
+    Run the enclosed block with a deadline of `seconds` from now.
+    Nested budgets can only shorten the enclosing deadline.
+    """
+    previous = getattr(_local, "current", None)
+    deadline = time.monotonic() + seconds
+    if previous is not None:
+        deadline = min(deadline, previous[0])
+    _local.current = (deadline, owner)
+    try:
+        yield
+    finally:
+        _local.current = previous
+
+def remaining():
+    """
+    Seconds left in the current budget, or None outside of a budget.
+    """
+    current = getattr(_local, "current", None)
+    if current is None:
+        return None
+    return current[0] - time.monotonic()
+
+def owner() -> str:
+    current = getattr(_local, "current", None)
+    return current[1] if current is not None else ""
+
+def clamp(timeout: float):
+    """
+    Returns (timeout, clamped): the timeout shortened to the remaining budget,
+    and whether it was shortened.
+    """
+    left = remaining()
+    if left is None or left >= timeout:
+        return timeout, False
+    return max(left, 0.0), True
+
+def exceeded(reason: str) -> DeadlineExceeded:
+    """
+    Count and log a budget-exceeded event for the current handler.
+    Returns the DeadlineExceeded to raise.
+    """
+    name = owner() or "unknown"
+    metrics.increment("deadline.exceeded")
+    metrics.increment(f"deadline.exceeded.{name}")
+    logger.error(f"Deadline budget exceeded in {name}: {reason}")
+    return DeadlineExceeded(reason)
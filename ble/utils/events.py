@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Subscriber of the Node API event stream (GET api/v1/events).
+
+A background thread keeps the stream open, reconnecting with backoff when it
+drops. For each event, the cached API responses and facts made outdated by it
+are dropped, then the listeners registered for its type are called.
+
+While the stream is connected, the responses kept up to date by the events
+are cached for EVENTS_CACHE_TTL seconds instead of API_CACHE_TTL. On each
+(re)connection every cached response is expired, since events may have been
+missed while disconnected.
+"""
+import random
+import threading
+import time
+from utils import config, logger, metrics, facts
+from utils.api import APIClient
+
+EVENTS_PATH = "api/v1/events"
+# Three missed keepalives (sent every 15 s) mean the connection is dead
+IDLE_TIMEOUT = 45
+RECONNECT_MIN = 1.0
+RECONNECT_MAX = 60.0
+
+# Event type -> cached API paths it makes outdated
+INVALIDATES = {
+    "node.status": ["api/v1/node/status", "api/v1/status"],
+    "node.peers": ["api/v1/status"],
+    "node.configuration": ["api/v1/node/configuration"],
+    "node.passphrase": ["api/v1/node/passphrase", "api/v1/node/status"],
+    "wallet": ["api/v1/wallet/address", "api/v1/node/address", "api/v1/node/balance"],
+    "certificate": ["api/v1/status"],
+    "install.configuration": ["api/v1/node/configuration", "api/v1/status"],
+    "install.docker-image": ["api/v1/node/configuration"],
+}
+# Event type -> facts it makes outdated
+FORGETS = {
+    "wallet": facts.WALLET_FACTS,
+}
+# Paths that only change through an event: cached longer while connected
+PUSHED_PATHS = (
+    "api/v1/node/status",
+    "api/v1/node/configuration",
+    "api/v1/node/passphrase",
+    "api/v1/node/address",
+    "api/v1/wallet/address",
+)
+
+_lock = threading.Lock()
+# event type -> callbacks
+_listeners = {}
+_thread = None
+_connected = threading.Event()
+
+def add_listener(event_type, callback):
+    """
+    Register `callback(event)` for events of `event_type`, called from the
+    subscriber thread once the caches have been updated.
+    """
+    with _lock:
+        _listeners.setdefault(event_type, []).append(callback)
+
+def connected() -> bool:
+    """
+    Returns True while the event stream is open.
+    """
+    return _connected.is_set()
+
+def start():
+    """
+    Starts the subscriber thread (once).
+    """
+    global _thread
+    with _lock:
+        if _thread is not None:
+            return
+        _thread = threading.Thread(target=_run, name="events", daemon=True)
+    _thread.start()
+
+def _set_connected(api_client, is_connected):
+    if is_connected == _connected.is_set():
+        return
+    ttl = float(config.get_config().get("EVENTS_CACHE_TTL", 300)) if is_connected else None
+    for path in PUSHED_PATHS:
+        api_client.cache.set_ttl(path, ttl)
+    if is_connected:
+        _connected.set()
+    else:
+        _connected.clear()
+
+def _dispatch(api_client, event):
+    event_type = event.get("type")
+    if event_type == "hello":
+        logger.info("Events: subscribed to the Node API")
+        api_client.expire()
+        _set_connected(api_client, True)
+        return
+
+    metrics.increment(f"events.{event_type}")
+    logger.info(f"Events: {event_type} {event.get('data') or ''}")
+    for path in INVALIDATES.get(event_type, ()):
+        api_client.invalidate(path)
+    if event_type in FORGETS:
+        facts.forget(*FORGETS[event_type])
+
+    with _lock:
+        callbacks = list(_listeners.get(event_type, ()))
+    for callback in callbacks:
+        try:
+            callback(event)
+        except Exception as e:
+            logger.error(f"Events: listener for {event_type} failed: {e}")
+
+def _run():
+    api_client = APIClient()
+    delay = RECONNECT_MIN
+    while True:
+        api_client.stream_json(
+            "GET",
+            EVENTS_PATH,
+            lambda event: _dispatch(api_client, event),
+            idle_timeout=IDLE_TIMEOUT,
+        )
+        if connected():
+            # The stream was up: start the backoff over
+            delay = RECONNECT_MIN
+        _set_connected(api_client, False)
+        metrics.increment("events.disconnected")
+        wait = random.uniform(delay / 2, delay)
+        logger.info(f"Events: stream closed, reconnecting in {wait:.1f}s")
+        time.sleep(wait)
+        delay = min(delay * 2, RECONNECT_MAX)
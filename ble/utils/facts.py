@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Persistent store of node facts that almost never change (system arch,
+kernel, OS, casanode version, node and wallet addresses).
+
+Facts are kept in a JSON file under STATE_DIR, so that after a restart the
+characteristics answer from disk even if casanode.service is not up yet.
+A fact served from the store is refreshed in the background at most once per
+FACTS_REFRESH_INTERVAL seconds. The whole store is dropped when the casanode
+version (from the configuration or reported by the API) changes.
+"""
+import json
+import os
+import tempfile
+import threading
+import time
+from utils import config, logger, metrics
+
+STATE_FILE = "facts.json"
+VERSION_KEY = "casanode-version"
+# Facts changed by creating, restoring or removing the wallet
+WALLET_FACTS = ("node-address", "wallet-address")
+
+_lock = threading.Lock()
+_facts = None
+_version = None
+_refreshed_at = {}
+_refreshing = set()
+
+def _path():
+    return os.path.join(config.get_config().get("STATE_DIR"), STATE_FILE)
+
+def _load():
+    """
+    Load the store on first use. Must be called with _lock held.
+    """
+    global _facts, _version
+    if _facts is not None:
+        return
+    _facts = {}
+    _version = config.get_config().get("CASANODE_VERSION", "")
+    try:
+        with open(_path(), "r") as f:
+            stored = json.load(f)
+    except FileNotFoundError:
+        return
+    except (OSError, ValueError) as e:
+        logger.warning(f"Facts store {_path()} unreadable, starting empty: {e}")
+        return
+    if stored.get("version") != _version:
+        logger.info(f"Facts store written by version '{stored.get('version')}', now '{_version}': discarded")
+        return
+    _facts = dict(stored.get("facts", {}))
+
+def _save():
+    """
+    Write the store atomically (temporary file + rename). Must be called with _lock held.
+    """
+    path = _path()
+    directory = os.path.dirname(path)
+    try:
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(prefix=".facts-", dir=directory)
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump({"version": _version, "facts": _facts}, f)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+        dir_fd = os.open(directory, os.O_RDONLY)
+        try:
+            os.fsync(dir_fd)
+        finally:
+            os.close(dir_fd)
+    except OSError as e:
+        # The facts stay available in memory until the next restart
+        logger.warning(f"Unable to save facts store {path}: {e}")
+
+def _store(key, value):
+    with _lock:
+        _load()
+        if _facts.get(key) == value:
+            return
+        if key == VERSION_KEY and key in _facts:
+            # Another version may report different facts
+            logger.info(f"Casanode version changed from '{_facts[key]}' to '{value}', dropping stored facts")
+            _facts.clear()
+        _facts[key] = value
+        _save()
+
+def read(key, loader):
+    """
+    Returns the fact `key`, from the store if known, else from `loader()`.
+    The loader returns None when the value is unavailable; nothing is stored then.
+    """
+    with _lock:
+        _load()
+        value = _facts.get(key)
+    if value is None:
+        metrics.increment("facts.miss")
+        value = loader()
+        if value is not None:
+            _store(key, value)
+            _refreshed_at[key] = time.monotonic()
+        return value
+    metrics.increment("facts.hit")
+    _refresh_in_background(key, loader)
+    return value
+
+def forget(*keys):
+    """
+    Drops facts known to have changed (e.g. the addresses after a wallet change).
+    """
+    with _lock:
+        _load()
+        changed = False
+        for key in keys:
+            changed = _facts.pop(key, None) is not None or changed
+            _refreshed_at.pop(key, None)
+        if changed:
+            _save()
+
+def _refresh_in_background(key, loader):
+    interval = float(config.get_config().get("FACTS_REFRESH_INTERVAL", 300))
+    with _lock:
+        last = _refreshed_at.get(key)
+        if key in _refreshing or (last is not None and time.monotonic() - last < interval):
+            return
+        _refreshing.add(key)
+
+    def refresh():
+        try:
+            value = loader()
+            if value is not None:
+                _store(key, value)
+                _refreshed_at[key] = time.monotonic()
+        except Exception as e:
+            logger.error(f"Background refresh of fact '{key}' failed: {e}")
+        finally:
+            with _lock:
+                _refreshing.discard(key)
+
+    threading.Thread(target=refresh, daemon=True).start()
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Installation state of the node: the six flags of GET api/v1/check/installation
+(image, containerExists, nodeConfig, vpnConfig, certificateKey, wallet).
+
+The state is seeded from the API once (start()), then kept in memory:
+
+- the install, wallet, certificate and node characteristics update it with
+  update() as their jobs complete;
+- Node API events (install.*, wallet, certificate, node.status) update it
+  the same way when the change is made outside of the BLE daemon;
+- it is re-verified against the API every INSTALLATION_VERIFY_INTERVAL
+  seconds, and after changes whose effect is not known (verify_later()).
+
+Listeners (add_listener()) receive the flags string, e.g. "111101", when it
+changes.
+"""
+import threading
+from utils import config, events, logger, metrics
+from utils.api import APIClient
+
+CHECK_PATH = "api/v1/check/installation"
+FLAGS = ("image", "containerExists", "nodeConfig", "vpnConfig", "certificateKey", "wallet")
+
+_lock = threading.Lock()
+# flag -> bool, None until seeded
+_state = None
+_listeners = []
+_started = False
+_verify_now = threading.Event()
+
+def add_listener(callback):
+    """
+    Register `callback(flags)`, called when the flags string changes.
+    """
+    with _lock:
+        _listeners.append(callback)
+
+def _encode(state):
+    return "".join("1" if state.get(flag) else "0" for flag in FLAGS)
+
+def flags():
+    """
+    Returns the flags string, or None if the state has not been seeded yet.
+    """
+    with _lock:
+        return _encode(_state) if _state is not None else None
+
+def _apply(changes, replace=False):
+    global _state
+    with _lock:
+        before = _encode(_state) if _state is not None else None
+        if _state is None and not replace:
+            # Partial knowledge only: wait for the seed
+            return
+        state = {} if replace else dict(_state)
+        state.update({flag: bool(value) for flag, value in changes.items() if flag in FLAGS})
+        _state = state
+        after = _encode(state)
+        callbacks = list(_listeners)
+    if after == before:
+        return
+    metrics.increment("installation.changed")
+    logger.info(f"Installation state: {before} -> {after}")
+    for callback in callbacks:
+        try:
+            callback(after)
+        except Exception as e:
+            logger.error(f"Installation state listener failed: {e}")
+
+def update(**changes):
+    """
+    Records the flags changed by a completed job, e.g. update(image=True).
+    """
+    _apply(changes)
+
+def verify():
+    """
+    Reads the state from the API and replaces the one in memory.
+    Returns the flags string, or None if the API could not be read.
+    """
+    metrics.increment("installation.verified")
+    response = APIClient().get(CHECK_PATH)
+    if response is None:
+        return None
+    try:
+        data = response.json()
+        if not isinstance(data, dict):
+            raise ValueError(f"unexpected {type(data).__name__}")
+    except ValueError as e:
+        logger.error(f"Installation state: invalid JSON from {CHECK_PATH}: {e}")
+        return None
+    _apply(data, replace=True)
+    return flags()
+
+def verify_later():
+    """
+    Schedules a verification, for changes whose effect on the flags is not known.
+    """
+    _verify_now.set()
+
+def _on_event(event):
+    event_type = event.get("type")
+    data = event.get("data") or {}
+    if event_type == "install.docker-image":
+        if data.get("imagePull"):
+            update(image=True)
+    elif event_type == "install.configuration":
+        update(**{
+            flag: True
+            for flag, key in (("nodeConfig", "nodeConfig"), ("vpnConfig", "vpnConfig"), ("certificateKey", "certificate"))
+            if data.get(key)
+        })
+    elif event_type == "certificate":
+        if data.get("success"):
+            update(certificateKey=data.get("action") != "remove")
+    elif event_type == "wallet":
+        update(wallet=data.get("action") != "remove")
+    else:
+        # node.status: containers created or removed
+        verify_later()
+
+def _run():
+    interval = float(config.get_config().get("INSTALLATION_VERIFY_INTERVAL", 300))
+    while True:
+        try:
+            seeded = verify() is not None
+        except Exception as e:
+            logger.error(f"Installation state: verification failed: {e}")
+            seeded = False
+        # Until seeded, retry sooner
+        _verify_now.wait(interval if seeded else min(interval, 30))
+        _verify_now.clear()
+
+def start():
+    """
+    Seeds the state and starts the periodic verification (once).
+    """
+    global _started
+    with _lock:
+        if _started:
+            return
+        _started = True
+    for event_type in ("install.docker-image", "install.configuration", "certificate", "wallet", "node.status"):
+        events.add_listener(event_type, _on_event)
+    threading.Thread(target=_run, name="installation", daemon=True).start()
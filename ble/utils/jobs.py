@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+"""
+Long-running jobs (image install, configuration install, system actions,
+certificate renewal, balance fetch, port check).
+
+A job runs its function in a thread. The function receives the Job and may
+report progress with job.progress(percent); its return value becomes the
+job result. Jobs made of a single API request (configuration install,
+system actions, certificate renewal, balance) do not report progress:
+their percent stays 255 (unknown) until they succeed. Listeners (see add_listener()) receive the job on every phase
+change and, while it runs, on progress at most every JOB_NOTIFY_INTERVAL
+seconds, with a heartbeat at least every second so that the elapsed time
+keeps moving.
+
+Progress frames (Job.frame()) are little-endian:
+
+    u16 job id | u8 kind | u8 phase | u8 percent (255 = unknown)
+    | u32 elapsed ms | u8 result length | result (UTF-8)
+
+While the job runs, the result field carries the progress detail, if any.
+"""
+import itertools
+import struct
+import threading
+import time
+from utils import config, logger, metrics
+
+PENDING = 0
+RUNNING = 1
+SUCCEEDED = 2
+FAILED = 3
+
+PHASE_NAMES = {PENDING: "pending", RUNNING: "running", SUCCEEDED: "succeeded", FAILED: "failed"}
+
+# Kind codes used in the progress frames
+KINDS = {
+    "docker-image": 1,
+    "configs": 2,
+    "system": 3,
+    "certificate": 4,
+    "balance": 5,
+    # Both ports ("port-check") or one
+    "port-check": 6,
+    "port-check-node": 7,
+    "port-check-vpn": 8,
+}
+
+UNKNOWN_PERCENT = 255
+HEARTBEAT_INTERVAL = 1.0
+FRAME_HEADER = struct.Struct("<HBBBIB")
+MAX_RESULT_LENGTH = 255
+
+class JobFailed(Exception):
+    """
+    Raised by a job function to fail the job, with the message as the job result.
+    """
+    pass
+
+_ids = itertools.count(1)
+_lock = threading.Lock()
+_listeners = []
+_running = {}
+_latest = None
+
+class Job:
+    __slots__ = ("id", "kind", "phase", "percent", "result", "started_at", "finished_at",
+        "_lock", "_dirty", "_last_emit")
+
+    def __init__(self, kind):
+        self.id = next(_ids) & 0xFFFF
+        self.kind = kind
+        self.phase = PENDING
+        self.percent = UNKNOWN_PERCENT
+        self.result = ""
+        self.started_at = time.monotonic()
+        self.finished_at = None
+        self._lock = threading.Lock()
+        self._dirty = False
+        self._last_emit = 0.0
+
+    def elapsed(self) -> float:
+        end = self.finished_at if self.finished_at is not None else time.monotonic()
+        return end - self.started_at
+
+    def progress(self, percent, detail=None):
+        """
+        Report the progress of the job (0-100, None if unknown) and an optional
+        short detail, sent in place of the result while the job runs.
+        Updates are throttled.
+        """
+        with self._lock:
+            if percent is not None:
+                self.percent = max(0, min(100, int(percent)))
+            if detail is not None:
+                self.result = detail
+            self._dirty = True
+        if time.monotonic() - self._last_emit >= _notify_interval():
+            _emit(self)
+
+    def frame(self) -> bytes:
+        with self._lock:
+            result = str(self.result).encode("utf-8")[:MAX_RESULT_LENGTH]
+            header = FRAME_HEADER.pack(
+                self.id,
+                KINDS.get(self.kind, 0),
+                self.phase,
+                self.percent,
+                min(int(self.elapsed() * 1000), 0xFFFFFFFF),
+                len(result),
+            )
+        return header + result
+
+    def status(self) -> dict:
+        with self._lock:
+            return {
+                "id": self.id,
+                "kind": self.kind,
+                "phase": PHASE_NAMES[self.phase],
+                "percent": None if self.percent == UNKNOWN_PERCENT else self.percent,
+                "elapsed": round(self.elapsed(), 1),
+                "result": self.result,
+            }
+
+def _notify_interval():
+    return float(config.get_config().get("JOB_NOTIFY_INTERVAL", 0.5))
+
+def add_listener(callback):
+    """
+    Register `callback(job)`, called from the job threads on each (throttled) update.
+    """
+    with _lock:
+        _listeners.append(callback)
+
+def latest():
+    """
+    Returns the most recently updated job, or None.
+    """
+    return _latest
+
+def running(kind):
+    """
+    Returns the running job of `kind`, or None.
+    """
+    with _lock:
+        return _running.get(kind)
+
+def _emit(job):
+    global _latest
+    with job._lock:
+        job._dirty = False
+        job._last_emit = time.monotonic()
+    with _lock:
+        _latest = job
+        listeners = list(_listeners)
+    for callback in listeners:
+        try:
+            callback(job)
+        except Exception as e:
+            logger.error(f"Job listener failed: {e}")
+
+def _ticker(job, done):
+    """
+    Sends throttled progress and elapsed-time heartbeats while the job runs.
+    """
+    interval = _notify_interval()
+    while not done.wait(interval):
+        if job._dirty or time.monotonic() - job._last_emit >= HEARTBEAT_INTERVAL:
+            _emit(job)
+
+def start(kind, target, *args):
+    """
+    Run `target(job, *args)` in a thread as a job of `kind`.
+    Returns the Job, or None if a job of the same kind is already running.
+    """
+    job = Job(kind)
+    with _lock:
+        if kind in _running:
+            logger.error(f"Job {kind} already running")
+            return None
+        _running[kind] = job
+    metrics.increment(f"jobs.{kind}.started")
+
+    def run():
+        done = threading.Event()
+        with job._lock:
+            job.phase = RUNNING
+        _emit(job)
+        threading.Thread(target=_ticker, args=(job, done), daemon=True).start()
+        try:
+            result = target(job, *args)
+            phase = SUCCEEDED
+        except Exception as e:
+            logger.error(f"Job {kind} #{job.id} failed: {e}")
+            result = str(e)
+            phase = FAILED
+        done.set()
+        with job._lock:
+            job.phase = phase
+            job.result = "" if result is None else result
+            job.finished_at = time.monotonic()
+            if phase == SUCCEEDED:
+                job.percent = 100
+        with _lock:
+            _running.pop(kind, None)
+        metrics.increment(f"jobs.{kind}.{PHASE_NAMES[phase]}")
+        logger.info(f"Job {kind} #{job.id} {PHASE_NAMES[phase]} after {job.elapsed():.1f}s")
+        _emit(job)
+
+    threading.Thread(target=run, daemon=True).start()
+    return job
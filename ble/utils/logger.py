@@ -1,31 +1,146 @@
 #!/usr/bin/env python3
+import collections
 import logging
+import re
 import sys
 import os
 from utils import config
 
-conf = config.get_config()
-log_dir = conf.get("LOG_DIR", "/var/log/casanode")
-log_file = os.path.join(log_dir, "ble.log")
-
 logger = logging.getLogger("CasanodeBle")
 logger.setLevel(logging.INFO)
 
-fh = logging.FileHandler(log_file)
-fh.setLevel(logging.INFO)
+_configured = False
+_ring = None
+
+class RingBufferHandler(logging.Handler):
+    """
+    Keeps the most recent formatted records in memory, up to `capacity`
+    bytes of text; the oldest records are dropped first.
+    """
+    def __init__(self, capacity):
+        super().__init__()
+        self.capacity = capacity
+        self.size = 0
+        # (levelno, line encoded in UTF-8)
+        self._records = collections.deque()
+
+    def emit(self, record):
+        try:
+            line = self.format(record).encode("utf-8", "replace")
+        except Exception:
+            self.handleError(record)
+            return
+        # Called with self.lock held (see logging.Handler.handle())
+        self._records.append((record.levelno, line))
+        self.size += len(line) + 1
+        while self.size > self.capacity and self._records:
+            _, dropped = self._records.popleft()
+            self.size -= len(dropped) + 1
+
+    def tail(self, level=logging.INFO, max_bytes=None):
+        """
+        Returns the buffered lines at `level` or above, oldest first,
+        keeping only the newest `max_bytes` bytes of them.
+        """
+        self.acquire()
+        try:
+            records = list(self._records)
+        finally:
+            self.release()
+        lines = []
+        total = 0
+        for levelno, line in reversed(records):
+            if levelno < level:
+                continue
+            if max_bytes is not None and total + len(line) + 1 > max_bytes:
+                break
+            lines.append(line)
+            total += len(line) + 1
+        lines.reverse()
+        return lines
+
+class RedactFilter(logging.Filter):
+    """
+    Replaces credentials in the message (bearer tokens, Authorization headers,
+    mnemonic and passphrase values) with [CENSORED]. Attached to the handlers
+    whose records leave the device (the ring buffer read over BLE).
+    """
+    PATTERNS = (
+        re.compile(r"(Bearer\s+)[^\s'\",}]+", re.IGNORECASE),
+        re.compile(r"""(['"]?(?:authorization|mnemonic|passphrase|api_auth)['"]?\s*[:=]\s*)(?:'[^']*'|"[^"]*"|[^\s,}]+)""", re.IGNORECASE),
+    )
+
+    def filter(self, record):
+        message = record.getMessage()
+        redacted = message
+        for pattern in self.PATTERNS:
+            redacted = pattern.sub(r"\1[CENSORED]", redacted)
+        if redacted != message:
+            # Only handlers after this one see the censored message: add it last
+            record.msg = redacted
+            record.args = None
+        return True
+
+def _setup():
+    """
+    Attach the file and console handlers on first use, so that importing
+    this module does not open the log file.
+    """
+    global _configured, _ring
+    if _configured:
+        return
+    _configured = True
 
-ch = logging.StreamHandler(sys.stdout)
-ch.setLevel(logging.INFO)
+    conf = config.get_config()
+    log_dir = conf.get("LOG_DIR", "/var/log/casanode")
+    log_file = os.path.join(log_dir, "ble.log")
 
-formatter = logging.Formatter("%(asctime)s [%(levelname)s] %(message)s")
-fh.setFormatter(formatter)
-ch.setFormatter(formatter)
+    fh = logging.FileHandler(log_file)
+    fh.setLevel(logging.INFO)
 
-logger.addHandler(fh)
-logger.addHandler(ch)
+    ch = logging.StreamHandler(sys.stdout)
+    ch.setLevel(logging.INFO)
+
+    formatter = logging.Formatter("%(asctime)s [%(levelname)s] %(message)s")
+    fh.setFormatter(formatter)
+    ch.setFormatter(formatter)
+
+    # Recent records, pulled over BLE by the log-tail characteristic
+    _ring = RingBufferHandler(int(conf.get("LOG_BUFFER_BYTES", 262144)))
+    _ring.setLevel(logging.INFO)
+    _ring.setFormatter(formatter)
+    _ring.addFilter(RedactFilter())
+
+    logger.addHandler(fh)
+    logger.addHandler(ch)
+    logger.addHandler(_ring)
 
 def info(message):
+    _setup()
     logger.info(message)
 
+def warning(message):
+    _setup()
+    logger.warning(message)
+
 def error(message):
+    _setup()
     logger.error(message)
+
+def tail(level=logging.INFO, max_bytes=None):
+    """
+    Returns the most recent log lines (bytes, oldest first) at `level` or above.
+    """
+    _setup()
+    return _ring.tail(level, max_bytes)
+
+def buffer_usage():
+    """
+    Returns (records, bytes, capacity) of the in-memory log buffer.
+    """
+    _setup()
+    _ring.acquire()
+    try:
+        return len(_ring._records), _ring.size, _ring.capacity
+    finally:
+        _ring.release()
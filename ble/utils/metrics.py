@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+In-process metrics registry.
+
+Counters, gauges and histograms are kept in memory, keyed by dotted names
+(e.g. "api.breaker.rejected"), and exposed through snapshot().
+"""
+import bisect
+import threading
+
+_lock = threading.Lock()
+_counters = {}
+_gauges = {}
+# name -> {"buckets": upper bounds, "counts": [...], "sum": ..., "count": ...}
+_histograms = {}
+
+def increment(name: str, value: int = 1) -> None:
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + value
+
+def set_gauge(name: str, value) -> None:
+    with _lock:
+        _gauges[name] = value
+
+def observe(name: str, value: float, buckets) -> None:
+    """
+    Records `value` in the histogram `name`. `buckets` are the ascending upper
+    bounds of the buckets; larger values go to a last, unbounded bucket.
+    The buckets of the first observation are kept.
+    """
+    with _lock:
+        histogram = _histograms.get(name)
+        if histogram is None:
+            histogram = _histograms[name] = {
+                "buckets": list(buckets),
+                "counts": [0] * (len(buckets) + 1),
+                "sum": 0,
+                "count": 0,
+            }
+        histogram["counts"][bisect.bisect_left(histogram["buckets"], value)] += 1
+        histogram["sum"] += value
+        histogram["count"] += 1
+
+def get_counter(name: str) -> int:
+    with _lock:
+        return _counters.get(name, 0)
+
+def snapshot() -> dict:
+    """
+    Returns a copy of all metrics:
+    {"counters": {...}, "gauges": {...}, "histograms": {...}}.
+    """
+    with _lock:
+        return {
+            "counters": dict(_counters),
+            "gauges": dict(_gauges),
+            "histograms": {
+                name: dict(histogram, buckets=list(histogram["buckets"]), counts=list(histogram["counts"]))
+                for name, histogram in _histograms.items()
+            },
+        }
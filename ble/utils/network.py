@@ -1,6 +1,25 @@
 #!/usr/bin/env python3
 import socket
-import psutil
+import struct
+
+# ioctl returning the IPv4 address of an interface (linux/sockios.h)
+SIOCGIFADDR = 0x8915
+
+def _interface_addresses():
+    """
+    Yields the IPv4 address of each interface, in interface order.
+    Uses ioctl() rather than psutil, which costs a few MB of RSS to import.
+    """
+    import fcntl
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+        for _, name in socket.if_nameindex():
+            try:
+                request = struct.pack("256s", name.encode()[:15])
+                address = fcntl.ioctl(sock.fileno(), SIOCGIFADDR, request)[20:24]
+            except OSError:
+                # No IPv4 address on this interface
+                continue
+            yield socket.inet_ntoa(address)
 
 def get_local_ip_address():
     """
@@ -8,6 +27,15 @@ def get_local_ip_address():
     Iterates over all network interfaces and returns the first non-internal IPv4 address.
     Returns None if no valid IP address is found.
     """
+    try:
+        for address in _interface_addresses():
+            if not address.startswith("127."):
+                return address
+        return None
+    except (ImportError, AttributeError, OSError):
+        # Not Linux: fall back to psutil
+        pass
+    import psutil
     interfaces = psutil.net_if_addrs()
     for interface_name, addresses in interfaces.items():
         for addr in addresses:
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+History of the node traffic: download and upload bandwidth and peer count,
+recorded from the status snapshot (GET api/v1/status) every
+NODE_HISTORY_INTERVAL seconds into fixed-size TimeSeries (see
+utils/timeseries.py) at 10 s, 1 min and 1 h resolutions.
+
+The rings are saved to STATE_DIR every NODE_HISTORY_SAVE_INTERVAL seconds
+and when the daemon stops (atomically, like the facts store), and restored
+at startup; a crash loses at most one save interval.
+"""
+import os
+import struct
+import tempfile
+import threading
+import time
+from utils import config, logger, metrics
+from utils.api import APIClient
+from utils.timeseries import TimeSeries
+
+STATE_FILE = "node-history.bin"
+MAGIC = b"CNH1"
+# 1 hour at 10 s, 2 days at 1 min, 31 days at 1 h
+LEVELS = ((10, 360), (60, 2880), (3600, 744))
+
+# Series id (in the packed windows) -> name
+SERIES = {
+    7: "download",  # bytes/s
+    8: "upload",    # bytes/s
+    9: "peers",
+}
+
+_lock = threading.Lock()
+_series = {name: TimeSeries(series_id, LEVELS) for series_id, name in SERIES.items()}
+_started = False
+# Set once the saved history was read: saving before would overwrite it
+_loaded = threading.Event()
+
+def series(name):
+    """
+    Returns the TimeSeries `name` (see SERIES), or None.
+    """
+    return _series.get(name)
+
+def _path():
+    return os.path.join(config.get_config().get("STATE_DIR"), STATE_FILE)
+
+def _load():
+    path = _path()
+    try:
+        with open(path, "rb") as f:
+            data = f.read()
+    except FileNotFoundError:
+        return
+    except OSError as e:
+        logger.warning(f"Unable to read node history {path}: {e}")
+        return
+    if not data.startswith(MAGIC):
+        logger.warning(f"Node history {path}: unknown format, discarded")
+        return
+    offset = len(MAGIC)
+    restored = []
+    try:
+        for series_id in SERIES:
+            rings, size = _series[SERIES[series_id]].read_bytes(data[offset:])
+            restored.append((SERIES[series_id], rings))
+            offset += size
+    except (ValueError, struct.error, KeyError, IndexError) as e:
+        # Levels changed since it was written (or a partial file): all or nothing
+        logger.warning(f"Node history {path} discarded: {e}")
+        return
+    for name, rings in restored:
+        _series[name].restore(rings)
+    logger.info(f"Node history restored from {path}")
+
+def save():
+    """
+    Writes the rings atomically (temporary file + rename). Does nothing before
+    start() restored the saved ones.
+    """
+    if not _loaded.is_set():
+        return
+    path = _path()
+    directory = os.path.dirname(path)
+    data = MAGIC + b"".join(_series[SERIES[series_id]].to_bytes() for series_id in SERIES)
+    try:
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(prefix=".node-history-", dir=directory)
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+    except OSError as e:
+        metrics.increment("node_history.save_failed")
+        logger.warning(f"Unable to save node history {path}: {e}")
+
+def record(status, timestamp=None):
+    """
+    Records a status snapshot ({"bandwidth": {"download", "upload"}, "status": {"peers"}}).
+    """
+    bandwidth = status.get("bandwidth") or {}
+    peers = (status.get("status") or {}).get("peers")
+    for name, value in (("download", bandwidth.get("download")), ("upload", bandwidth.get("upload")), ("peers", peers)):
+        if isinstance(value, (int, float)) and value >= 0:
+            _series[name].add(float(value), timestamp)
+
+def _run():
+    cfg = config.get_config()
+    interval = float(cfg.get("NODE_HISTORY_INTERVAL", 10))
+    save_interval = float(cfg.get("NODE_HISTORY_SAVE_INTERVAL", 600))
+    api_client = APIClient()
+    last_save = time.monotonic()
+    while True:
+        started = time.monotonic()
+        try:
+            # Served from the cache when a characteristic read it recently
+            status = api_client.get_json_cached("api/v1/status")
+            if isinstance(status, dict):
+                record(status)
+                metrics.increment("node_history.samples")
+        except Exception as e:
+            logger.error(f"Node history: {e}")
+        if started - last_save >= save_interval:
+            save()
+            last_save = started
+        time.sleep(max(interval - (time.monotonic() - started), 0.1))
+
+def start():
+    """
+    Restores the saved history and starts the recorder thread (once).
+    """
+    global _started
+    with _lock:
+        if _started:
+            return
+        _started = True
+    try:
+        _load()
+    finally:
+        _loaded.set()
+    threading.Thread(target=_run, name="node-history", daemon=True).start()
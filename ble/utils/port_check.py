@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Reachability checks of the node and VPN ports (GET api/v1/check/port/<type>).
+
+The Node API asks a remote service to connect to the port, which takes
+seconds. Results are cached for PORT_CHECK_TTL seconds per port type, with
+the latency of the check that produced them, and dropped when the port
+changes: on a successful configuration write of nodePort/vpnPort (see
+config_writer) and on a node.configuration event.
+
+A check of a port type already in progress is not started again: callers
+asking for the same port type meanwhile wait for its result.
+
+Statuses are those of the Node API: "2" = open, "3" = closed, "-1" = error.
+"""
+import threading
+import time
+from concurrent.futures import Future
+from utils import aio, config, events, logger, metrics
+from utils.api import APIClient
+
+PORT_TYPES = ("node", "vpn")
+# Configuration field -> port type
+PORT_FIELDS = {"nodePort": "node", "vpnPort": "vpn"}
+
+OPEN = "2"
+CLOSED = "3"
+ERROR = "-1"
+
+_lock = threading.Lock()
+# port type -> (status, latency ms, monotonic time of the check)
+_results = {}
+# Bumped on invalidation so that a check started before it is not cached
+_generation = {}
+# port type -> Future of the check in progress, resolved with (status, latency ms)
+_in_flight = {}
+_listening = False
+
+def _ttl():
+    return float(config.get_config().get("PORT_CHECK_TTL", 60))
+
+def _listen():
+    global _listening
+    with _lock:
+        if _listening:
+            return
+        _listening = True
+    # The ports may have been changed outside of the BLE daemon
+    events.add_listener("node.configuration", lambda event: invalidate())
+
+def _status_from(response):
+    if response is None:
+        return ERROR
+    try:
+        status = response.json().get("status")
+    except (ValueError, AttributeError):
+        # Plain text answer ("open"/"closed")
+        return OPEN if response.text.strip().lower() == "open" else CLOSED
+    if status is None:
+        return ERROR
+    return str(status)
+
+def check(port_type, fresh=False):
+    """
+    Returns (status, latency ms, cached) for `port_type`, served from the
+    cache unless `fresh`. Errors are not cached. Joins the check of
+    `port_type` in progress, if any.
+    """
+    _listen()
+    with _lock:
+        result = _results.get(port_type)
+        generation = _generation.get(port_type, 0)
+        if result is not None and not fresh and time.monotonic() - result[2] < _ttl():
+            metrics.increment("port_check.cache.hit")
+            return result[0], result[1], True
+        future = _in_flight.get(port_type)
+        joined = future is not None
+        if not joined:
+            future = _in_flight[port_type] = Future()
+    if joined:
+        metrics.increment("port_check.joined")
+        status, latency_ms = future.result()
+        return status, latency_ms, False
+
+    metrics.increment("port_check.cache.miss")
+    start = time.monotonic()
+    try:
+        status = _status_from(APIClient().get(f"api/v1/check/port/{port_type}", timeout=60))
+    except Exception as e:
+        logger.error(f"Port check: {port_type} failed: {e}")
+        status = ERROR
+    latency_ms = int((time.monotonic() - start) * 1000)
+    logger.info(f"Port check: {port_type} status '{status}' in {latency_ms} ms")
+    with _lock:
+        if status != ERROR and _generation.get(port_type, 0) == generation:
+            _results[port_type] = (status, latency_ms, time.monotonic())
+        _in_flight.pop(port_type, None)
+    future.set_result((status, latency_ms))
+    return status, latency_ms, False
+
+def check_all(fresh=False, on_result=None):
+    """
+    Checks every port type concurrently.
+    Returns {port type: (status, latency ms, cached)}; `on_result(port type,
+    result)` is called as each check completes.
+    """
+    import asyncio
+
+    def check_one(port_type):
+        result = check(port_type, fresh)
+        if on_result is not None:
+            on_result(port_type, result)
+        return result
+
+    async def run():
+        results = await asyncio.gather(*(aio.to_thread(check_one, port_type) for port_type in PORT_TYPES))
+        return dict(zip(PORT_TYPES, results))
+    return aio.submit(run()).result()
+
+def invalidate(port_type=None):
+    """
+    Drops the cached result of `port_type`, or of every port type.
+    """
+    with _lock:
+        for key in (PORT_TYPES if port_type is None else [port_type]):
+            _results.pop(key, None)
+            _generation[key] = _generation.get(key, 0) + 1
+
+def invalidate_fields(fields):
+    """
+    Drops the cached results of the ports changed by a configuration write.
+    """
+    for field, port_type in PORT_FIELDS.items():
+        if field in fields:
+            logger.info(f"Port check: {field} changed, cached {port_type} result dropped")
+            invalidate(port_type)
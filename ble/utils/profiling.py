@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""
+Runtime profiling of the daemon, controlled with signals (profiling mode:
+`main.py --profiling` or PROFILING=true).
+
+- SIGUSR1 starts the sampling profiler; the next SIGUSR1 stops it and writes
+  LOG_DIR/profile-<time>.folded (collapsed stacks, one line per stack, for
+  flamegraph.pl or speedscope) and LOG_DIR/profile-<time>.txt (summary).
+- SIGUSR2 starts tracemalloc; each following SIGUSR2 writes a heap snapshot
+  to LOG_DIR/heap-<time>.snapshot (tracemalloc.Snapshot.load()) and the top
+  allocations, with the growth since the previous snapshot, to
+  LOG_DIR/heap-<time>.txt.
+
+The profiler samples the stacks of every thread (GLib loop, asyncio loop,
+jobs...) every PROFILING_INTERVAL seconds from its own thread, so the
+daemon keeps serving while it runs. Dumps are written from a background
+thread too.
+
+    kill -USR1 $(systemctl show -p MainPID --value casanode-ble)
+"""
+import collections
+import os
+import signal
+import sys
+import threading
+import time
+from utils import config, logger
+
+MAX_DEPTH = 64
+TOP = 30
+# Frames kept per tracemalloc allocation
+TRACEMALLOC_FRAMES = 10
+
+_lock = threading.Lock()
+_sampler = None
+_previous_snapshot = None
+
+def _dump_path(prefix, extension):
+    log_dir = config.get_config().get("LOG_DIR", "/var/log/casanode")
+    now = time.time()
+    stamp = time.strftime("%Y%m%d-%H%M%S", time.localtime(now)) + f"{now % 1:.3f}"[1:]
+    return os.path.join(log_dir, f"{prefix}-{stamp}.{extension}")
+
+class _Sampler(threading.Thread):
+    def __init__(self, interval):
+        super().__init__(name="profiler", daemon=True)
+        self.interval = interval
+        self.stacks = collections.Counter()
+        self.samples = 0
+        self.started_at = time.monotonic()
+        self.stopped_at = None
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.wait(self.interval):
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == self.ident:
+                    continue
+                stack = []
+                while frame is not None and len(stack) < MAX_DEPTH:
+                    code = frame.f_code
+                    stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)})")
+                    frame = frame.f_back
+                stack.append(names.get(ident, str(ident)))
+                self.stacks[tuple(reversed(stack))] += 1
+            self.samples += 1
+        self.stopped_at = time.monotonic()
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+
+def _write_profile(sampler):
+    folded = _dump_path("profile", "folded")
+    with open(folded, "w") as f:
+        for stack, count in sampler.stacks.most_common():
+            f.write(";".join(part.replace(";", ":") for part in stack) + f" {count}\n")
+
+    own = collections.Counter()
+    inclusive = collections.Counter()
+    threads = collections.Counter()
+    for stack, count in sampler.stacks.items():
+        threads[stack[0]] += count
+        own[stack[-1]] += count
+        for function in set(stack[1:]):
+            inclusive[function] += count
+
+    total = sum(sampler.stacks.values()) or 1
+    summary = os.path.splitext(folded)[0] + ".txt"
+    with open(summary, "w") as f:
+        f.write(f"{sampler.samples} samples over {sampler.stopped_at - sampler.started_at:.1f}s "
+            f"(interval {sampler.interval * 1000:.0f} ms)\n\n")
+        for title, counter in (("Threads", threads), ("Self", own), ("Inclusive", inclusive)):
+            f.write(f"{title}:\n")
+            for name, count in counter.most_common(TOP):
+                f.write(f"{100 * count / total:6.1f}% {count:>8}  {name}\n")
+            f.write("\n")
+    logger.info(f"Profiling: {sampler.samples} samples written to {folded} and {summary}")
+
+def toggle_profiler():
+    """
+    Starts the sampling profiler, or stops it and writes its dumps.
+    """
+    global _sampler
+    with _lock:
+        sampler = _sampler
+        if sampler is None:
+            interval = float(config.get_config().get("PROFILING_INTERVAL", 0.01))
+            _sampler = _Sampler(interval)
+            _sampler.start()
+            logger.info(f"Profiling: sampling profiler started (interval {interval * 1000:.0f} ms)")
+            return
+        _sampler = None
+
+    def finish():
+        sampler.stop()
+        try:
+            _write_profile(sampler)
+        except OSError as e:
+            logger.error(f"Profiling: cannot write the profile: {e}")
+    threading.Thread(target=finish, name="profiler-dump", daemon=True).start()
+
+def heap_snapshot():
+    """
+    Starts tracemalloc, or writes a snapshot of the traced allocations.
+    """
+    import tracemalloc
+    if not tracemalloc.is_tracing():
+        tracemalloc.start(TRACEMALLOC_FRAMES)
+        logger.info("Profiling: tracemalloc started, send SIGUSR2 again to take a heap snapshot")
+        return
+    snapshot = tracemalloc.take_snapshot()
+
+    def write():
+        global _previous_snapshot
+        path = _dump_path("heap", "snapshot")
+        summary = os.path.splitext(path)[0] + ".txt"
+        try:
+            snapshot.dump(path)
+            filtered = snapshot.filter_traces((
+                tracemalloc.Filter(False, tracemalloc.__file__),
+                tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+            ))
+            current, peak = tracemalloc.get_traced_memory()
+            with open(summary, "w") as f:
+                f.write(f"Traced memory: {current / 1024:.0f} KiB (peak {peak / 1024:.0f} KiB)\n\n")
+                f.write("Top allocations:\n")
+                for stat in filtered.statistics("lineno")[:TOP]:
+                    f.write(f"{stat}\n")
+                with _lock:
+                    previous = _previous_snapshot
+                    _previous_snapshot = filtered
+                if previous is not None:
+                    f.write("\nGrowth since the previous snapshot:\n")
+                    for stat in filtered.compare_to(previous, "lineno")[:TOP]:
+                        f.write(f"{stat}\n")
+        except OSError as e:
+            logger.error(f"Profiling: cannot write the heap snapshot: {e}")
+            return
+        logger.info(f"Profiling: heap snapshot written to {path} and {summary}")
+    threading.Thread(target=write, name="heap-dump", daemon=True).start()
+
+def _on_signal(callback):
+    def handler(*args):
+        try:
+            callback()
+        except Exception as e:
+            logger.error(f"Profiling: {e}")
+        # Keep the GLib signal source
+        return True
+    return handler
+
+def install():
+    """
+    Installs the SIGUSR1/SIGUSR2 handlers. With GLib available they run on the
+    main loop, otherwise as Python signal handlers.
+    """
+    try:
+        from gi.repository import GLib
+        GLib.unix_signal_add(GLib.PRIORITY_HIGH, signal.SIGUSR1, _on_signal(toggle_profiler))
+        GLib.unix_signal_add(GLib.PRIORITY_HIGH, signal.SIGUSR2, _on_signal(heap_snapshot))
+    except ImportError:
+        signal.signal(signal.SIGUSR1, _on_signal(toggle_profiler))
+        signal.signal(signal.SIGUSR2, _on_signal(heap_snapshot))
+    logger.info(f"Profiling mode: SIGUSR1 toggles the profiler, SIGUSR2 takes heap snapshots (pid {os.getpid()})")
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+DNS resolver used to validate host names without blocking the GLib loop.
+
+Lookups run in a small thread pool, one at a time per name, and their result
+is cached: resolvable names for DNS_POSITIVE_TTL seconds, unresolvable ones
+for DNS_NEGATIVE_TTL seconds. Callers wait at most DNS_RESOLVE_TIMEOUT
+seconds; a lookup still running after that is reported as unresolvable but
+keeps going, and its result is cached when it completes.
+"""
+import socket
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError
+from utils import config, logger, metrics
+
+_lock = threading.Lock()
+_executor = None
+# name -> (resolvable, monotonic expiry)
+_cache = {}
+# name -> Future of the lookup in progress
+_in_flight = {}
+
+def _setting(key, default):
+    return float(config.get_config().get(key, default))
+
+def resolve_timeout():
+    return _setting("DNS_RESOLVE_TIMEOUT", 3)
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="resolver")
+    return _executor
+
+def _resolve(name):
+    try:
+        socket.getaddrinfo(name, None, proto=socket.IPPROTO_TCP)
+        return True
+    except (socket.gaierror, UnicodeError):
+        return False
+    except OSError as e:
+        logger.warning(f"Resolver: lookup of {name} failed: {e}")
+        return False
+
+def _lookup_done(name, future):
+    try:
+        resolvable = future.result()
+    except Exception:
+        resolvable = False
+    ttl = _setting("DNS_POSITIVE_TTL", 300) if resolvable else _setting("DNS_NEGATIVE_TTL", 30)
+    with _lock:
+        _cache[name] = (resolvable, time.monotonic() + ttl)
+        _in_flight.pop(name, None)
+
+def lookup(name: str) -> Future:
+    """
+    Returns a Future of whether `name` resolves, completed at once if cached.
+    """
+    name = name.strip().lower().rstrip(".")
+    with _lock:
+        cached = _cache.get(name)
+        if cached is not None and cached[1] > time.monotonic():
+            metrics.increment("resolver.cache_hit")
+            future = Future()
+            future.set_result(cached[0])
+            return future
+        future = _in_flight.get(name)
+        if future is not None:
+            return future
+        metrics.increment("resolver.lookups")
+        future = _get_executor().submit(_resolve, name)
+        _in_flight[name] = future
+    future.add_done_callback(lambda f: _lookup_done(name, f))
+    return future
+
+def is_resolvable(name: str, timeout: float = None) -> bool:
+    """
+    Blocking check, bounded by `timeout` (DNS_RESOLVE_TIMEOUT by default).
+    """
+    try:
+        return lookup(name).result(timeout=resolve_timeout() if timeout is None else timeout)
+    except TimeoutError:
+        metrics.increment("resolver.timeouts")
+        logger.error(f"Resolver: lookup of {name} timed out")
+        return False
+
+def resolve_async(name: str, callback, timeout: float = None):
+    """
+    Calls `callback(resolvable)` from a worker thread once the lookup completes,
+    or with False when `timeout` expires first. The callback is called once.
+    """
+    future = lookup(name)
+    called = threading.Lock()
+
+    def finish(resolvable):
+        if called.acquire(blocking=False):
+            callback(resolvable)
+
+    def expired():
+        if not future.done():
+            metrics.increment("resolver.timeouts")
+            logger.error(f"Resolver: lookup of {name} timed out")
+            finish(False)
+
+    timer = threading.Timer(resolve_timeout() if timeout is None else timeout, expired)
+    timer.daemon = True
+    timer.start()
+
+    def done(f):
+        timer.cancel()
+        try:
+            finish(bool(f.result()))
+        except Exception:
+            finish(False)
+
+    future.add_done_callback(done)
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Startup timing helpers.
+
+Milestones are measured from the moment the kernel started the process,
+so interpreter startup and module imports are included in the figures.
+"""
+import os
+import re
+import subprocess
+import sys
+import time
+from utils import logger
+
+_milestones = []
+_module_loaded = time.monotonic()
+
+def process_age() -> float:
+    """
+    Seconds elapsed since the current process was started.
+    Falls back to the time since this module was imported when /proc is unavailable.
+    """
+    try:
+        with open("/proc/self/stat") as f:
+            # The command name may contain spaces: fields start after the closing parenthesis
+            fields = f.read().rsplit(")", 1)[1].split()
+        start_ticks = int(fields[19])
+        with open("/proc/uptime") as f:
+            uptime = float(f.read().split()[0])
+        return max(0.0, uptime - start_ticks / os.sysconf("SC_CLK_TCK"))
+    except (OSError, ValueError, IndexError):
+        return time.monotonic() - _module_loaded
+
+def mark(name: str) -> float:
+    """
+    Record a startup milestone and log it.
+    Returns the process age in milliseconds.
+    """
+    elapsed_ms = process_age() * 1000
+    _milestones.append((name, elapsed_ms))
+    logger.info(f"Startup: {name} after {elapsed_ms:.0f} ms")
+    return elapsed_ms
+
+def milestones():
+    return list(_milestones)
+
+IMPORTTIME_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+def profile_imports(statement="import gatt_server; gatt_server.load_characteristics()", top=20):
+    """
+    Run `statement` in a fresh interpreter with -X importtime and return the
+    total import time and the `top` slowest modules as (cumulative_us, self_us, module).
+    """
+    ble_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        cwd=ble_dir,
+        capture_output=True,
+        text=True,
+    )
+    entries = []
+    total_us = 0
+    for line in result.stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if not match:
+            continue
+        self_us, cumulative_us, indent, module = int(match.group(1)), int(match.group(2)), match.group(3), match.group(4)
+        entries.append((cumulative_us, self_us, module))
+        # Top-level imports are indented by a single space
+        if len(indent) == 1:
+            total_us += cumulative_us
+    entries.sort(reverse=True)
+    return total_us, entries[:top], result.returncode
+
+def print_import_profile(top=20):
+    total_us, entries, returncode = profile_imports(top=top)
+    print(f"Total import time: {total_us / 1000:.1f} ms")
+    print(f"{'cumulative ms':>14} {'self ms':>9}  module")
+    for cumulative_us, self_us, module in entries:
+        print(f"{cumulative_us / 1000:>14.1f} {self_us / 1000:>9.1f}  {module}")
+    if returncode != 0:
+        print(f"Import statement exited with code {returncode}")
+    return returncode
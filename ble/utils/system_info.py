@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+System information read locally instead of through the Node API.
+
+Architecture, kernel and OS do not change while the daemon runs: they are
+read once, on first use. The uptime is derived from /proc/uptime read once
+and the monotonic clock, so later reads do not touch the filesystem.
+Each function returns None when the value cannot be read locally, in which
+case the characteristics fall back to the API.
+"""
+import os
+import threading
+import time
+
+OS_RELEASE_FILES = ("/etc/os-release", "/usr/lib/os-release")
+
+_lock = threading.Lock()
+_static = None
+# (seconds since boot, time.monotonic()) sampled together
+_uptime_baseline = None
+
+def _read_os_release():
+    """
+    Returns the OS as "<name> <version>" (e.g. "Debian 12"), like the
+    `lsb_release -is` / `lsb_release -rs` pair used by the Node API.
+    """
+    for path in OS_RELEASE_FILES:
+        try:
+            with open(path, "r") as f:
+                lines = f.read().splitlines()
+        except OSError:
+            continue
+        fields = {}
+        for line in lines:
+            key, sep, value = line.partition("=")
+            if sep:
+                fields[key.strip()] = value.strip().strip('"\'')
+        name = fields.get("NAME", "").replace(" GNU/Linux", "").strip()
+        if not name:
+            return None
+        version = fields.get("VERSION_ID", "")
+        return f"{name} {version}".strip()
+    return None
+
+def _load_static():
+    global _static
+    with _lock:
+        if _static is None:
+            uname = os.uname()
+            _static = {
+                "arch": uname.machine or None,
+                "kernel": uname.release or None,
+                "os": _read_os_release(),
+            }
+    return _static
+
+def arch():
+    return _load_static()["arch"]
+
+def kernel():
+    return _load_static()["kernel"]
+
+def os_name():
+    return _load_static()["os"]
+
+def uptime():
+    """
+    Returns the number of seconds since boot, or None if /proc/uptime is unreadable.
+    """
+    global _uptime_baseline
+    with _lock:
+        if _uptime_baseline is None:
+            try:
+                with open("/proc/uptime", "r") as f:
+                    _uptime_baseline = (float(f.read().split()[0]), time.monotonic())
+            except (OSError, ValueError, IndexError):
+                return None
+        seconds, monotonic_at = _uptime_baseline
+    return seconds + (time.monotonic() - monotonic_at)
+
+def boot_time():
+    """
+    Returns the boot time as a Unix timestamp (the format of the API "uptime" field).
+    """
+    seconds = uptime()
+    if seconds is None:
+        return None
+    return int(time.time() - seconds)
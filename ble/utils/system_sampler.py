@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+History of the system load: CPU, memory, temperature, disk usage and
+network throughput, sampled every SYSTEM_SAMPLE_INTERVAL seconds into
+fixed-size TimeSeries (see utils/timeseries.py).
+
+The values are read from /proc, /sys and statvfs(), which psutil reads too;
+psutil (a few MB of RSS) is only imported where /proc is not available.
+"""
+import os
+import threading
+import time
+from utils import config, logger, metrics
+from utils.timeseries import TimeSeries
+
+# Series id (in the packed windows) -> name
+SERIES = {
+    1: "cpu",           # % busy, all cores
+    2: "memory",        # % used (MemTotal - MemAvailable)
+    3: "temperature",   # degrees Celsius, thermal zone 0
+    4: "disk",          # % used of the root filesystem
+    5: "net_rx",        # bytes/s received, all interfaces but loopback
+    6: "net_tx",        # bytes/s sent, all interfaces but loopback
+}
+THERMAL_ZONE = "/sys/class/thermal/thermal_zone0/temp"
+
+_lock = threading.Lock()
+_series = {name: TimeSeries(series_id) for series_id, name in SERIES.items()}
+_started = False
+
+def series(name):
+    """
+    Returns the TimeSeries `name` (see SERIES), or None.
+    """
+    return _series.get(name)
+
+def _cpu_times():
+    """
+    Returns (busy, total) jiffies since boot.
+    """
+    with open("/proc/stat") as f:
+        fields = [int(value) for value in f.readline().split()[1:]]
+    # idle + iowait
+    idle = fields[3] + (fields[4] if len(fields) > 4 else 0)
+    total = sum(fields[:8])
+    return total - idle, total
+
+def _memory_percent():
+    values = {}
+    with open("/proc/meminfo") as f:
+        for line in f:
+            key, _, rest = line.partition(":")
+            if key in ("MemTotal", "MemAvailable"):
+                values[key] = int(rest.split()[0])
+    total = values.get("MemTotal")
+    if not total or "MemAvailable" not in values:
+        return None
+    return 100.0 * (total - values["MemAvailable"]) / total
+
+def _temperature():
+    try:
+        with open(THERMAL_ZONE) as f:
+            return int(f.read().strip()) / 1000.0
+    except (OSError, ValueError):
+        return None
+
+def _disk_percent():
+    st = os.statvfs("/")
+    total = st.f_blocks * st.f_frsize
+    if total == 0:
+        return None
+    # Like df: used / (used + available to unprivileged users)
+    used = (st.f_blocks - st.f_bfree) * st.f_frsize
+    return 100.0 * used / (used + st.f_bavail * st.f_frsize)
+
+def _net_bytes():
+    """
+    Returns (received, sent) bytes since boot on all interfaces but loopback.
+    """
+    received = sent = 0
+    with open("/proc/net/dev") as f:
+        for line in f.readlines()[2:]:
+            name, _, counters = line.partition(":")
+            if name.strip() == "lo":
+                continue
+            fields = counters.split()
+            received += int(fields[0])
+            sent += int(fields[8])
+    return received, sent
+
+def _psutil_reader():
+    import psutil
+
+    def read():
+        temperature = None
+        temperatures = getattr(psutil, "sensors_temperatures", lambda: {})()
+        for entries in temperatures.values():
+            if entries:
+                temperature = entries[0].current
+                break
+        net = psutil.net_io_counters()
+        return {
+            "cpu": psutil.cpu_percent(),
+            "memory": psutil.virtual_memory().percent,
+            "temperature": temperature,
+            "disk": psutil.disk_usage("/").percent,
+        }, (net.bytes_recv, net.bytes_sent)
+    return read
+
+def _run():
+    interval = float(config.get_config().get("SYSTEM_SAMPLE_INTERVAL", 1))
+    psutil_read = None if os.path.exists("/proc/stat") else _psutil_reader()
+    previous_cpu = previous_net = None
+    previous_time = None
+    while True:
+        now = time.time()
+        try:
+            if psutil_read is None:
+                cpu = _cpu_times()
+                values = {
+                    "memory": _memory_percent(),
+                    "temperature": _temperature(),
+                    "disk": _disk_percent(),
+                }
+                if previous_cpu is not None and cpu[1] > previous_cpu[1]:
+                    values["cpu"] = 100.0 * (cpu[0] - previous_cpu[0]) / (cpu[1] - previous_cpu[1])
+                previous_cpu = cpu
+                net = _net_bytes()
+            else:
+                values, net = psutil_read()
+            if previous_net is not None and now > previous_time:
+                elapsed = now - previous_time
+                # Counters reset when an interface goes away
+                values["net_rx"] = max(net[0] - previous_net[0], 0) / elapsed
+                values["net_tx"] = max(net[1] - previous_net[1], 0) / elapsed
+            previous_net, previous_time = net, now
+            for name, value in values.items():
+                if value is not None:
+                    _series[name].add(value, now)
+            metrics.increment("system_sampler.samples")
+        except (OSError, ValueError, IndexError) as e:
+            metrics.increment("system_sampler.failed")
+            logger.error(f"System sampler: {e}")
+        time.sleep(max(interval - (time.time() - now), 0.05))
+
+def start():
+    """
+    Starts the sampler thread (once).
+    """
+    global _started
+    with _lock:
+        if _started:
+            return
+        _started = True
+    threading.Thread(target=_run, name="system-sampler", daemon=True).start()
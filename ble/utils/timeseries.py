@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+"""
+Fixed-size time series at several resolutions.
+
+A TimeSeries keeps one ring per level (e.g. 1 s x 600, 1 min x 1440,
+1 h x 168). Each slot of a ring holds the min, max, sum and count of the
+samples of one bucket (`step` seconds of wall-clock time) in preallocated
+arrays. Every sample updates the current bucket of each level, so the
+coarser levels are the exact min/max/avg downsampling of the finer ones.
+A slot is reused once its bucket falls out of the ring: memory does not
+grow over time.
+
+Windows are packed little-endian for BLE:
+
+    u8 series id | u32 start (unix seconds) | u16 step (seconds)
+    | u16 count | f32 scale | count x (u16 min, u16 max, u16 avg)
+
+Values (non-negative) are value / scale rounded to u16; 0xFFFF marks a
+bucket without samples. The scale is chosen per window so that its largest
+value fits.
+
+to_bytes()/load_bytes() save and restore the rings as is, for series kept
+across restarts (read_bytes()/restore() to restore several series at once,
+only once all of them parsed).
+"""
+import array
+import math
+import struct
+import threading
+import time
+
+# (step seconds, slots)
+DEFAULT_LEVELS = ((1, 600), (60, 1440), (3600, 168))
+
+HEADER = struct.Struct("<BIHHf")
+POINT = struct.Struct("<HHH")
+MISSING = 0xFFFF
+MAX_QUANTUM = MISSING - 1
+# Longest value of an attribute (ATT): a packed window must fit
+MAX_VALUE_LENGTH = 512
+MAX_POINTS = (MAX_VALUE_LENGTH - HEADER.size) // POINT.size
+
+class Level:
+    __slots__ = ("step", "slots", "buckets", "mins", "maxs", "sums", "counts")
+
+    def __init__(self, step, slots):
+        self.step = step
+        self.slots = slots
+        # Bucket number (time // step) held by each slot, -1 when unused
+        self.buckets = array.array("q", [-1]) * slots
+        self.mins = array.array("f", [0.0]) * slots
+        self.maxs = array.array("f", [0.0]) * slots
+        self.sums = array.array("d", [0.0]) * slots
+        self.counts = array.array("I", [0]) * slots
+
+    def add(self, timestamp, value):
+        bucket = int(timestamp // self.step)
+        index = bucket % self.slots
+        if self.buckets[index] != bucket:
+            self.buckets[index] = bucket
+            self.mins[index] = value
+            self.maxs[index] = value
+            self.sums[index] = value
+            self.counts[index] = 1
+            return
+        if value < self.mins[index]:
+            self.mins[index] = value
+        if value > self.maxs[index]:
+            self.maxs[index] = value
+        self.sums[index] += value
+        self.counts[index] += 1
+
+    def window(self, start, end):
+        """
+        Returns (first bucket start time, [(min, max, avg) or None per bucket])
+        for the buckets from `start` to `end`, limited to the ring.
+        """
+        last = int(end // self.step)
+        first = max(int(start // self.step), last - self.slots + 1)
+        points = []
+        for bucket in range(first, last + 1):
+            index = bucket % self.slots
+            if self.buckets[index] != bucket or self.counts[index] == 0:
+                points.append(None)
+            else:
+                points.append((self.mins[index], self.maxs[index], self.sums[index] / self.counts[index]))
+        return first * self.step, points
+
+class TimeSeries:
+    def __init__(self, series_id, levels=DEFAULT_LEVELS):
+        self.series_id = series_id
+        self._lock = threading.Lock()
+        self.levels = [Level(step, slots) for step, slots in levels]
+
+    def add(self, value, timestamp=None):
+        if value is None or math.isnan(value):
+            return
+        timestamp = time.time() if timestamp is None else timestamp
+        with self._lock:
+            for level in self.levels:
+                level.add(timestamp, value)
+
+    def level(self, step):
+        for level in self.levels:
+            if level.step == step:
+                return level
+        raise ValueError(f"no level with a {step}s step")
+
+    def window(self, step, span, end=None, max_points=MAX_POINTS):
+        """
+        Returns (start, [(min, max, avg) or None]) for the last `span` seconds
+        at the `step` resolution, at most `max_points` buckets.
+        """
+        end = time.time() if end is None else end
+        level = self.level(step)
+        span = min(span, max_points * step)
+        with self._lock:
+            return level.window(end - span + step, end)
+
+    def pack(self, step, span, end=None, max_points=MAX_POINTS):
+        """
+        Returns the window packed as described in the module docstring.
+        """
+        start, points = self.window(step, span, end, max_points)
+        largest = max((point[1] for point in points if point is not None), default=0.0)
+        scale = largest / MAX_QUANTUM if largest > 0 else 1.0
+        body = bytearray(HEADER.pack(self.series_id, int(start), step, len(points), scale))
+        for point in points:
+            if point is None:
+                body += POINT.pack(MISSING, MISSING, MISSING)
+            else:
+                body += POINT.pack(*(min(max(int(round(value / scale)), 0), MAX_QUANTUM) for value in point))
+        return bytes(body)
+
+    def to_bytes(self):
+        with self._lock:
+            body = bytearray(struct.pack("<BB", self.series_id, len(self.levels)))
+            for level in self.levels:
+                body += struct.pack("<II", level.step, level.slots)
+                for values in (level.buckets, level.mins, level.maxs, level.sums, level.counts):
+                    body += values.tobytes()
+        return bytes(body)
+
+    def read_bytes(self, data):
+        """
+        Parses rings saved by to_bytes() without restoring them.
+        Returns (rings, number of bytes read), rings to pass to restore().
+        Raises ValueError if they are truncated or do not have the levels of
+        this series.
+        """
+        try:
+            series_id, count = struct.unpack_from("<BB", data)
+        except struct.error:
+            raise ValueError("truncated")
+        if series_id != self.series_id or count != len(self.levels):
+            raise ValueError(f"series {series_id} with {count} levels, expected {self.series_id}")
+        offset = 2
+        loaded = []
+        for level in self.levels:
+            try:
+                step, slots = struct.unpack_from("<II", data, offset)
+            except struct.error:
+                raise ValueError("truncated")
+            offset += 8
+            if (step, slots) != (level.step, level.slots):
+                raise ValueError(f"level {step}s x {slots}, expected {level.step}s x {level.slots}")
+            arrays = []
+            for values in (level.buckets, level.mins, level.maxs, level.sums, level.counts):
+                size = len(values) * values.itemsize
+                if offset + size > len(data):
+                    raise ValueError("truncated")
+                restored = array.array(values.typecode)
+                restored.frombytes(data[offset:offset + size])
+                arrays.append(restored)
+                offset += size
+            loaded.append(arrays)
+        return loaded, offset
+
+    def restore(self, rings):
+        """
+        Replaces the rings with those returned by read_bytes().
+        """
+        with self._lock:
+            for level, arrays in zip(self.levels, rings):
+                level.buckets, level.mins, level.maxs, level.sums, level.counts = arrays
+
+    def load_bytes(self, data):
+        """
+        Restores rings saved by to_bytes(). Returns the number of bytes read.
+        Raises ValueError if they are truncated or do not have the levels of
+        this series; the rings are left as they were then.
+        """
+        rings, offset = self.read_bytes(data)
+        self.restore(rings)
+        return offset
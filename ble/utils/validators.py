@@ -1,6 +1,6 @@
 #!/usr/bin/env python3
 import re
-import socket
+from utils import resolver
 
 # Regular expression for IPv4 and IPv6 addresses
 ipv4_pattern = re.compile(
@@ -36,14 +36,83 @@ def is_valid_ip(ip: str) -> bool:
     """
     return bool(ipv4_pattern.match(ip) or ipv6_pattern.match(ip))
 
+hostname_label_pattern = re.compile(r"^(?!-)[A-Za-z0-9-]{1,63}(?<!-)$")
+
+def is_valid_hostname(name: str) -> bool:
+    """
+    Check the syntax of a DNS name (RFC 1123), without resolving it.
+    """
+    name = name.rstrip(".")
+    if not name or len(name) > 253:
+        return False
+    return all(hostname_label_pattern.match(label) for label in name.split("."))
+
 def is_valid_dns(dns_name: str) -> bool:
     """
     Check if the given string is a valid and resolvable DNS.
-    Attempts to resolve the DNS using socket.gethostbyname.
+    The lookup is cached and bounded by DNS_RESOLVE_TIMEOUT (see utils.resolver).
     Returns True if resolution succeeds, False otherwise.
     """
-    try:
-        socket.gethostbyname(dns_name)
-        return True
-    except Exception:
+    if not is_valid_hostname(dns_name):
         return False
+    return resolver.is_resolvable(dns_name)
+
+def _validate_moniker(value: str):
+    if len(value) < 8:
+        raise ValueError("Moniker must be at least 8 characters long")
+    return value
+
+def _validate_choice(*choices):
+    def validate(value: str):
+        value = value.lower()
+        if value not in choices:
+            raise ValueError(f"Value must be one of {', '.join(choices)}")
+        return value
+    return validate
+
+def _validate_int(minimum: int, maximum: int):
+    def validate(value: str):
+        try:
+            number = int(value)
+        except ValueError:
+            raise ValueError("Value must be an integer")
+        if number < minimum or number > maximum:
+            raise ValueError(f"Value must be between {minimum} and {maximum}")
+        return number
+    return validate
+
+def _validate_host(value: str):
+    # Syntax only: resolving blocks, callers resolve names off the GLib loop (see needs_lookup())
+    if not is_valid_ip(value) and not is_valid_hostname(value):
+        raise ValueError("Invalid IP address or DNS name")
+    return value
+
+# Node configuration fields (names of the PUT api/v1/node/configuration payload)
+# with the same checks as the Node API
+CONFIG_FIELDS = {
+    "moniker": _validate_moniker,
+    "nodeType": _validate_choice("residential", "datacenter"),
+    "nodeIp": _validate_host,
+    "nodePort": _validate_int(1, 65535),
+    "vpnType": _validate_choice("wireguard", "v2ray"),
+    "vpnPort": _validate_int(1, 65535),
+    "maximumPeers": _validate_int(1, 99999),
+    "backend": _validate_choice("test", "file"),
+}
+
+def validate_config_field(field: str, value: str):
+    """
+    Check a node configuration value.
+    Returns the value to send to the API, or raises ValueError.
+    Host names are only checked for syntax: see needs_lookup().
+    """
+    if field not in CONFIG_FIELDS:
+        raise ValueError(f"Unknown configuration field '{field}'")
+    return CONFIG_FIELDS[field](value.strip())
+
+def needs_lookup(field: str, value) -> bool:
+    """
+    Whether a value accepted by validate_config_field() is a host name that
+    must also resolve (with resolver.resolve_async(), off the GLib loop).
+    """
+    return field == "nodeIp" and not is_valid_ip(value)
@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+"""
+GLib loop-lag probe and systemd watchdog.
+
+A GLib timer fires every LOOP_LAG_INTERVAL seconds and records how late it
+runs in the "loop.lag_ms" histogram: the lag is the time the loop spent in
+other handlers. Above LOOP_LAG_THRESHOLD seconds it is logged with the
+slowest D-Bus handler seen since the previous tick.
+
+A monitor thread watches the ticks. When a tick is LOOP_LAG_THRESHOLD
+seconds overdue it logs the handler currently holding the loop, once per
+stall. Under systemd (WatchdogSec=, NOTIFY_SOCKET set) it sends WATCHDOG=1
+only while the loop has ticked within LOOP_STALL_TIMEOUT seconds, so that a
+wedged daemon is killed and restarted instead of advertising a dead BLE
+service.
+"""
+import os
+import socket
+import threading
+import time
+from contextlib import contextmanager
+from utils import config, logger, metrics
+
+# Upper bounds of the loop.lag_ms histogram buckets
+LAG_BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+# The loop is not ticking yet while the GATT server starts (controller
+# setup, BlueZ waits): the watchdog is fed for at most this long meanwhile
+STARTUP_GRACE = 120.0
+
+_lock = threading.Lock()
+_started = False
+_started_at = None
+_last_tick = None
+# (name, monotonic start) of the D-Bus handler running on the GLib loop
+_current = None
+# (name, duration) of the slowest handler since the previous tick
+_slowest = None
+
+def _settings():
+    cfg = config.get_config()
+    return (
+        float(cfg.get("LOOP_LAG_INTERVAL", 0.5)),
+        float(cfg.get("LOOP_LAG_THRESHOLD", 0.25)),
+        float(cfg.get("LOOP_STALL_TIMEOUT", 10)),
+    )
+
+@contextmanager
+def handler(name):
+    """
+    Marks the enclosed block as the handler `name` running on the GLib loop.
+    """
+    global _current, _slowest
+    start = time.monotonic()
+    with _lock:
+        previous = _current
+        _current = (name, start)
+    try:
+        yield
+    finally:
+        duration = time.monotonic() - start
+        with _lock:
+            _current = previous
+            if _slowest is None or duration > _slowest[1]:
+                _slowest = (name, duration)
+
+def sd_notify(state):
+    """
+    Sends `state` (e.g. "WATCHDOG=1") to systemd. Returns False outside of
+    systemd or when the socket is unreachable.
+    """
+    address = os.environ.get("NOTIFY_SOCKET")
+    if not address:
+        return False
+    if address.startswith("@"):
+        # Abstract namespace
+        address = "\0" + address[1:]
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM | socket.SOCK_CLOEXEC) as sock:
+            sock.connect(address)
+            sock.sendall(state.encode())
+        return True
+    except OSError as e:
+        logger.error(f"sd_notify({state}) failed: {e}")
+        return False
+
+def _watchdog_interval():
+    """
+    Seconds between two WATCHDOG=1 pings (half of WatchdogSec), or None when
+    the systemd watchdog is not enabled for this process.
+    """
+    usec = os.environ.get("WATCHDOG_USEC")
+    pid = os.environ.get("WATCHDOG_PID")
+    if not usec or not os.environ.get("NOTIFY_SOCKET"):
+        return None
+    if pid and pid != str(os.getpid()):
+        return None
+    try:
+        return int(usec) / 2_000_000
+    except ValueError:
+        return None
+
+def _tick(expected):
+    global _last_tick, _slowest
+    interval, threshold, _ = _settings()
+    now = time.monotonic()
+    lag = max(now - expected, 0.0)
+    with _lock:
+        _last_tick = now
+        slowest = _slowest
+        _slowest = None
+    metrics.observe("loop.lag_ms", lag * 1000, LAG_BUCKETS_MS)
+    metrics.set_gauge("loop.lag_ms", round(lag * 1000, 1))
+    if lag > threshold:
+        metrics.increment("loop.lagged")
+        culprit = f"{slowest[0]} ({slowest[1] * 1000:.0f} ms)" if slowest is not None else "unknown"
+        logger.warning(f"GLib loop lag {lag * 1000:.0f} ms, slowest handler: {culprit}")
+    _schedule(now + interval, interval)
+    return False
+
+def _schedule(expected, interval):
+    from gi.repository import GLib
+    GLib.timeout_add(max(int(interval * 1000), 1), _tick, expected)
+
+def _first_tick():
+    # Runs when the main loop starts: the probe is measured from there
+    global _last_tick
+    interval = _settings()[0]
+    now = time.monotonic()
+    with _lock:
+        _last_tick = now
+    _schedule(now + interval, interval)
+    return False
+
+def healthy():
+    """
+    Whether the GLib loop ticked recently (or is still starting).
+    """
+    interval, threshold, stall_timeout = _settings()
+    now = time.monotonic()
+    with _lock:
+        last_tick = _last_tick
+        started_at = _started_at
+    if last_tick is None:
+        return started_at is not None and now - started_at < STARTUP_GRACE
+    return now - last_tick < max(stall_timeout, interval + threshold)
+
+def _monitor():
+    interval, threshold, _ = _settings()
+    ping_interval = _watchdog_interval()
+    reported = None
+    last_ping = 0.0
+    suspended = False
+    while True:
+        time.sleep(interval)
+        now = time.monotonic()
+        with _lock:
+            last_tick = _last_tick
+            current = _current
+        # Expected ticks are `interval` apart: beyond that the loop is held
+        stall = 0.0 if last_tick is None else now - last_tick - interval
+        if stall > threshold and reported != last_tick:
+            reported = last_tick
+            metrics.increment("loop.stalled")
+            name = current[0] if current is not None else "unknown"
+            logger.warning(f"GLib loop blocked for {stall:.1f}s in {name}")
+        if ping_interval is not None and now - last_ping >= ping_interval:
+            if healthy():
+                sd_notify("WATCHDOG=1")
+                last_ping = now
+                suspended = False
+            else:
+                metrics.increment("loop.watchdog_skipped")
+                if not suspended:
+                    suspended = True
+                    name = current[0] if current is not None else "unknown"
+                    logger.error(f"GLib loop stalled in {name}: systemd watchdog pings suspended")
+
+def start():
+    """
+    Starts the monitor thread and the probe on the default GLib context.
+    The probe ticks once the main loop runs; until then the watchdog is fed
+    for STARTUP_GRACE seconds.
+    """
+    global _started, _started_at
+    with _lock:
+        if _started:
+            return
+        _started = True
+        _started_at = time.monotonic()
+    from gi.repository import GLib
+    interval, threshold, _ = _settings()
+    GLib.idle_add(_first_tick)
+    threading.Thread(target=_monitor, name="watchdog", daemon=True).start()
+    ping_interval = _watchdog_interval()
+    if ping_interval is not None:
+        logger.info(f"systemd watchdog enabled: WATCHDOG=1 every {ping_interval:.1f}s while the GLib loop ticks")
+    logger.info(f"Loop-lag probe started (interval {interval * 1000:.0f} ms, threshold {threshold * 1000:.0f} ms)")